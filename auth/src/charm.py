@@ -5,7 +5,7 @@
 
 import logging
 import socket
-from typing import Optional
+from typing import Optional, cast
 
 from ops.charm import CharmBase
 
@@ -14,19 +14,27 @@ from charms.tls_certificates_interface.v4.tls_certificates import (
     CertificateRequestAttributes,
 )
 from litmus_auth import LitmusAuth
-from cosl.reconciler import all_events, observe_events
-from ops import ActiveStatus, CollectStatusEvent
+from ops import ActiveStatus, BlockedStatus, CollectStatusEvent, StoredState
 from pydantic_core import ValidationError
 from charms.data_platform_libs.v0.data_interfaces import (
     DatabaseRequires,
 )
 from litmus_libs.interfaces.litmus_auth import LitmusAuthProvider, Endpoint
 from litmus_libs import (
+    ContainerResources,
     DatabaseConfig,
+    GoRuntimeConfig,
+    HookCallAccounting,
     TLSConfigData,
+    TieredReconciler,
     TlsReconciler,
+    dispatch_cached,
+    InvalidResourcesError,
+    StatefulSetResourcesPatch,
     get_app_hostname,
+    get_headless_hostname,
     get_litmus_version,
+    invalidate,
 )
 from litmus_libs.interfaces.http_api import LitmusAuthApiProvider
 from litmus_libs.interfaces.self_monitoring import SelfMonitoring
@@ -46,9 +54,19 @@ logger = logging.getLogger(__name__)
 class LitmusAuthCharm(CharmBase):
     """Charmed Operator for Litmus Authentication server."""
 
+    _stored = StoredState()
+
     def __init__(self, *args):
         super().__init__(*args)
+        self._hook_calls = HookCallAccounting(self)
+        # digest of the container resources last set on the StatefulSet
+        self._stored.set_default(statefulset_resources={})
         self._auth_container = self.unit.get_container(LitmusAuth.container_name)
+        self._resources_patch = StatefulSetResourcesPatch(
+            self.app.name,
+            self.model.name,
+            state=self._stored.statefulset_resources,  # type: ignore[arg-type]
+        )
 
         self._auth_provider = LitmusAuthProvider(
             self.model.get_relation(LITMUS_AUTH_ENDPOINT),
@@ -89,6 +107,7 @@ class LitmusAuthCharm(CharmBase):
             tls_key_path=TLS_KEY_PATH,
             tls_ca_path=TLS_CA_PATH,
             backend_grpc_endpoint=self.backend_grpc_endpoint,
+            go_runtime=self._go_runtime_config,
         )
         self._self_monitoring = SelfMonitoring(self)
 
@@ -96,9 +115,18 @@ class LitmusAuthCharm(CharmBase):
             self.on.collect_unit_status, self._on_collect_unit_status
         )
 
-        observe_events(self, all_events, self._reconcile)
+        self._reconciler = TieredReconciler(
+            self,
+            full=self._reconcile,
+            light=self._reconcile_light,
+            relation_handlers={
+                # these only feed the charm's own telemetry
+                "logging": self._reconcile_self_monitoring,
+                "charm-tracing": self._reconcile_self_monitoring,
+            },
+        )
 
-    @property
+    @dispatch_cached
     def database_config(self) -> Optional[DatabaseConfig]:
         remote_relations_databags = self._database.fetch_relation_data()
         if not remote_relations_databags:
@@ -134,6 +162,9 @@ class LitmusAuthCharm(CharmBase):
         if self._is_missing_tls_certificate:
             required_relations.append(TLS_CERTIFICATES_ENDPOINT)
 
+        if error := self._resources_config_error:
+            e.add_status(BlockedStatus(f"Invalid resources config: {error}"))
+
         StatusManager(
             charm=self,
             block_if_relations_missing=required_relations,
@@ -155,7 +186,7 @@ class LitmusAuthCharm(CharmBase):
     ###################
     # UTILITY METHODS #
     ###################
-    @property
+    @dispatch_cached
     def _tls_config(self) -> Optional[TLSConfigData]:
         """Returns the TLS configuration, including certificates and private key, if available; None otherwise."""
         certificates, private_key = self._tls_certificates.get_assigned_certificate(
@@ -176,23 +207,24 @@ class LitmusAuthCharm(CharmBase):
 
     @property
     def _certificate_request_attributes(self) -> CertificateRequestAttributes:
+        sans_dns = {socket.getfqdn(), get_app_hostname(self.app.name, self.model.name)}
+        if self.config.get("grpc_headless_service"):
+            # gRPC clients dialing the headless service verify this name
+            sans_dns.add(get_headless_hostname())
         return CertificateRequestAttributes(
             common_name=self.app.name,
-            sans_dns=frozenset(
-                (
-                    socket.getfqdn(),
-                    get_app_hostname(self.app.name, self.model.name),
-                )
-            ),
+            sans_dns=frozenset(sans_dns),
         )
 
     def _reconcile(self):
         """Run all logic that is independent of what event we're processing."""
+        # first: changing them restarts the pod anyway
+        self._reconcile_resources()
         self._tls_certificates.sync()
+        # syncing may have changed the assigned certificate
+        invalidate(self, "_tls_config")
         self._tls.reconcile()
-        self._self_monitoring.reconcile(
-            ca_cert=self._tls_config.ca_cert if self._tls_config else None
-        )
+        self._reconcile_self_monitoring()
         self.litmus_auth.reconcile()
         self.unit.set_ports(*self.litmus_auth.litmus_auth_ports)
         self.unit.set_workload_version(get_litmus_version(self._auth_container) or "")
@@ -202,6 +234,9 @@ class LitmusAuthCharm(CharmBase):
                     grpc_server_host=get_app_hostname(self.app.name, self.model.name),
                     grpc_server_port=self._grpc_port,
                     insecure=False if self._tls_ready else True,
+                    grpc_server_headless_host=get_headless_hostname()
+                    if self.config.get("grpc_headless_service")
+                    else None,
                 )
             )
             # only send the auth data once we have a running container.
@@ -210,6 +245,21 @@ class LitmusAuthCharm(CharmBase):
             if self.litmus_auth.is_running:
                 self._send_http_api.publish_endpoint(self._http_api_endpoint)
 
+    def _reconcile_light(self):
+        """Health check for update-status: only fully reconcile if the workload went down."""
+        if (
+            self.database_config
+            and self._hook_calls.can_connect(self._auth_container)
+            and not self.litmus_auth.is_running
+        ):
+            logger.info("auth server is not running; reconciling")
+            self._reconcile()
+
+    def _reconcile_self_monitoring(self):
+        self._self_monitoring.reconcile(
+            ca_cert=self._tls_config.ca_cert if self._tls_config else None
+        )
+
     @property
     def _tls_ready(self) -> bool:
         return bool(self._tls_config)
@@ -226,6 +276,37 @@ class LitmusAuthCharm(CharmBase):
             else self.litmus_auth.http_port
         )
 
+    @property
+    def _container_resources(self) -> dict[str, ContainerResources]:
+        """Resource requests and limits of the workload container, from the charm config.
+
+        Raises:
+            InvalidResourcesError: If the config isn't valid.
+        """
+        return {LitmusAuth.container_name: ContainerResources.from_config(self.config)}
+
+    @property
+    def _resources_config_error(self) -> Optional[str]:
+        try:
+            self._container_resources
+        except InvalidResourcesError as e:
+            return str(e)
+        return None
+
+    def _reconcile_resources(self):
+        """Set the configured resource requests and limits on the workload container."""
+        if not self.unit.is_leader() or self._resources_config_error:
+            return
+        self._resources_patch.reconcile(self._container_resources)
+
+    @property
+    def _go_runtime_config(self) -> GoRuntimeConfig:
+        return GoRuntimeConfig(
+            gomaxprocs=cast(int, self.config.get("gomaxprocs", 0)),
+            gomemlimit_percent=cast(int, self.config.get("gomemlimit_percent", 90)),
+            gogc=cast(int, self.config.get("gogc", 0)),
+        )
+
     @property
     def _grpc_port(self):
         return (
@@ -4,12 +4,20 @@
 
 """Control Litmus Authentication server running in a container under Pebble. Provides a LitmusAuth class."""
 
+import functools
 import logging
 
-from ops import Container
+from ops import Container, ModelError
 from ops.pebble import Layer, CheckDict, ConnectionError
 from typing import Optional, Callable
-from litmus_libs import DatabaseConfig, TLSConfigData
+from litmus_libs import (
+    DatabaseConfig,
+    GoRuntimeConfig,
+    ResourceLimits,
+    TLSConfigData,
+    get_container_resource_limits,
+    go_runtime_env,
+)
 from litmus_libs.interfaces.litmus_auth import Endpoint
 
 logger = logging.getLogger(__name__)
@@ -37,6 +45,7 @@ class LitmusAuth:
         db_config: Optional[DatabaseConfig],
         tls_config_getter: Callable[[], Optional[TLSConfigData]],
         backend_grpc_endpoint: Optional[Endpoint],
+        go_runtime: Optional[GoRuntimeConfig] = None,
     ):
         self._container = container
         self._tls_cert_path = tls_cert_path
@@ -45,6 +54,7 @@ class LitmusAuth:
         self._db_config = db_config
         self._tls_config_getter = tls_config_getter
         self._backend_grpc_endpoint = backend_grpc_endpoint
+        self._go_runtime = go_runtime or GoRuntimeConfig()
 
     def reconcile(self):
         """Unconditional control logic."""
@@ -94,6 +104,10 @@ class LitmusAuth:
             },
         }
 
+    @functools.cached_property
+    def _resource_limits(self) -> ResourceLimits:
+        return get_container_resource_limits(self._container)
+
     def _environment_vars(self, tls_enabled: bool) -> dict:
         env = {
             "ALLOWED_ORIGINS": ".*",
@@ -116,10 +130,11 @@ class LitmusAuth:
         if backend_endpoint := self._backend_grpc_endpoint:
             env.update(
                 {
-                    "LITMUS_GQL_GRPC_ENDPOINT": backend_endpoint.grpc_server_host,
+                    "LITMUS_GQL_GRPC_ENDPOINT": backend_endpoint.grpc_dial_host,
                     "LITMUS_GQL_GRPC_PORT": backend_endpoint.grpc_server_port,
                 }
             )
+        env.update(go_runtime_env(self._go_runtime, self._resource_limits))
         if tls_enabled:
             env.update(
                 {
@@ -147,3 +162,6 @@ class LitmusAuth:
             return self._container.get_service(self.service_name).is_running()
         except ConnectionError:
             return False
+        except ModelError:
+            # the service isn't in the plan (yet)
+            return False
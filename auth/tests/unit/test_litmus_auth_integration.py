@@ -24,6 +24,7 @@ from ops.testing import State, Model, CharmEvents
                 ),
                 "grpc_server_port": json.dumps(3030),
                 "insecure": json.dumps(True),
+                "grpc_server_headless_host": json.dumps(None),
                 "version": json.dumps(0),
             },
         ),
@@ -63,6 +64,7 @@ def test_publish_endpoint_without_tls(
                 ),
                 "grpc_server_port": json.dumps(3031),
                 "insecure": json.dumps(False),
+                "grpc_server_headless_host": json.dumps(None),
                 "version": json.dumps(0),
             },
         ),
@@ -140,6 +142,49 @@ def test_get_backend_grpc_endpoint(
         assert charm.backend_grpc_endpoint == expected
 
 
+def test_publish_headless_endpoint(
+    ctx, auth_relation, database_relation, authserver_container
+):
+    # GIVEN a leader configured to publish its headless service
+    # WHEN a relation_changed event fires
+    state_out = ctx.run(
+        state=State(
+            relations={auth_relation, database_relation},
+            containers={authserver_container},
+            leader=True,
+            model=Model(name="test"),
+            config={"grpc_headless_service": True},
+        ),
+        event=ctx.on.relation_changed(auth_relation),
+    )
+
+    # THEN the headless service, resolving to all units, is published along with the service
+    databag = state_out.get_relation(auth_relation.id).local_app_data
+    assert json.loads(databag["grpc_server_headless_host"]) == (
+        "app-headless.default.svc.cluster.local"
+    )
+    assert json.loads(databag["grpc_server_port"]) == 3030
+
+
+@pytest.mark.parametrize("headless", (False, True))
+def test_headless_service_is_only_a_san_when_published(
+    ctx, auth_relation, database_relation, authserver_container, headless
+):
+    # GIVEN a unit configured to publish its headless service, or not
+    state = State(
+        relations={auth_relation, database_relation},
+        containers={authserver_container},
+        config={"grpc_headless_service": headless},
+    )
+
+    # WHEN we look at the certificate it requests
+    with ctx(ctx.on.update_status(), state) as mgr:
+        sans = mgr.charm._certificate_request_attributes.sans_dns
+
+    # THEN the headless service is only in its SANs if it's published
+    assert ("app-headless.default.svc.cluster.local" in sans) is headless
+
+
 @pytest.mark.parametrize("leader", (False, True))
 @pytest.mark.parametrize("backend_tls", (False, True))
 @pytest.mark.parametrize("local_tls", (False, True))
@@ -1,6 +1,6 @@
 # Copyright 2025 Canonical Ltd.
 # See LICENSE file for licensing details.
-from ops.testing import State
+from ops.testing import Mount, State
 from dataclasses import replace
 
 import pytest
@@ -170,3 +170,54 @@ def test_pebble_checks_plan(
     assert auth_container_out.plan.checks["auth-up"].tcp == {
         "port": (3001 if tls else 3000)
     }
+
+
+def test_update_status_leaves_running_workload_alone(
+    ctx, authserver_container, database_relation
+):
+    # GIVEN a deployment whose workload is up and running
+    state = State(containers=[authserver_container], relations=[database_relation])
+    state = ctx.run(ctx.on.relation_changed(database_relation), state=state)
+    assert state.get_container("auth").services["auth"].is_running()
+    opened_ports = state.opened_ports
+
+    # WHEN update-status fires
+    state_out = ctx.run(ctx.on.update_status(), state=replace(state, opened_ports=[]))
+
+    # THEN nothing is reconciled (e.g. ports aren't re-opened)
+    assert opened_ports
+    assert not state_out.opened_ports
+
+
+def test_update_status_reconciles_stopped_workload(
+    ctx, authserver_container, database_relation
+):
+    # GIVEN a deployment whose workload should run, but doesn't
+    state = State(containers=[authserver_container], relations=[database_relation])
+
+    # WHEN update-status fires
+    state_out = ctx.run(ctx.on.update_status(), state=state)
+
+    # THEN the workload is reconciled, and started
+    assert state_out.get_container("auth").services["auth"].is_running()
+
+
+def test_pebble_plan_tunes_go_runtime_to_limits(ctx, authserver_container, tmp_path):
+    # GIVEN a container limited to 1.5 CPUs and 1GiB of memory
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    (tmp_path / "memory.max").write_text(f"{1024**3}\n")
+    container = replace(
+        authserver_container,
+        mounts={"cgroup": Mount(location="/sys/fs/cgroup", source=tmp_path)},
+    )
+    # AND a custom garbage collection target
+    state = State(containers=[container], config={"gogc": 50})
+
+    # WHEN a workload pebble ready event is fired
+    state_out = ctx.run(ctx.on.pebble_ready(container), state=state)
+
+    # THEN the Go runtime is tuned to the container limits
+    env = state_out.get_container(container.name).plan.services["auth"].environment
+    assert env["GOMAXPROCS"] == "2"
+    assert env["GOMEMLIMIT"] == "921MiB"
+    assert env["GOGC"] == "50"
@@ -161,3 +161,33 @@ def test_pebble_check_failing_blocked_status(
 
     # THEN the unit sets blocked
     assert isinstance(state_out.unit_status, ops.BlockedStatus)
+
+
+@pytest.mark.parametrize(
+    "config",
+    (
+        {"cpu_limit": "two"},
+        {"memory_request": "1Gi", "memory_limit": "512Mi"},
+    ),
+)
+def test_invalid_resources_config_blocked_status(
+    ctx, database_relation, auth_relation, authserver_container, config
+):
+    # GIVEN a unit that would otherwise be active
+    auth_relation = dataclasses.replace(
+        auth_relation, remote_app_data=auth_remote_databag()
+    )
+    # AND invalid resource requests and limits
+    # WHEN any event fires
+    state_out = ctx.run(
+        ctx.on.config_changed(),
+        State(
+            containers={authserver_container},
+            relations={database_relation, auth_relation},
+            leader=True,
+            config=config,
+        ),
+    )
+    # THEN the unit sets blocked, pointing at the config
+    assert isinstance(state_out.unit_status, ops.BlockedStatus)
+    assert "resources" in state_out.unit_status.message
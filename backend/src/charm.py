@@ -13,24 +13,32 @@ from charms.tls_certificates_interface.v4.tls_certificates import (
     CertificateRequestAttributes,
 )
 from litmus_backend import LitmusBackend
-from ops import ActiveStatus, CollectStatusEvent
+from ops import ActiveStatus, BlockedStatus, CollectStatusEvent, StoredState
 
 from litmus_libs.interfaces.litmus_auth import LitmusAuthRequirer, Endpoint
 from litmus_libs import (
+    ContainerResources,
     DatabaseConfig,
+    GoRuntimeConfig,
+    HookCallAccounting,
     TLSConfigData,
+    TieredReconciler,
     TlsReconciler,
+    dispatch_cached,
+    InvalidResourcesError,
+    StatefulSetResourcesPatch,
     get_app_hostname,
+    get_headless_hostname,
     get_litmus_version,
+    invalidate,
 )
-from cosl.reconciler import all_events, observe_events
 
 from pydantic_core import ValidationError
 from charms.data_platform_libs.v0.data_interfaces import (
     DatabaseRequires,
 )
 
-from typing import Optional
+from typing import Optional, cast
 from litmus_libs.interfaces.http_api import LitmusBackendApiProvider
 from litmus_libs.interfaces.self_monitoring import SelfMonitoring
 from litmus_libs.status_manager import StatusManager
@@ -49,9 +57,19 @@ logger = logging.getLogger(__name__)
 class LitmusBackendCharm(CharmBase):
     """Charmed Operator for Litmus Backend server."""
 
+    _stored = StoredState()
+
     def __init__(self, *args):
         super().__init__(*args)
+        self._hook_calls = HookCallAccounting(self)
+        # digest of the container resources last set on the StatefulSet
+        self._stored.set_default(statefulset_resources={})
         self._backend_container = self.unit.get_container(LitmusBackend.container_name)
+        self._resources_patch = StatefulSetResourcesPatch(
+            self.app.name,
+            self.model.name,
+            state=self._stored.statefulset_resources,  # type: ignore[arg-type]
+        )
 
         self._database = DatabaseRequires(
             self,
@@ -92,6 +110,7 @@ class LitmusBackendCharm(CharmBase):
             tls_ca_path=TLS_CA_PATH,
             auth_grpc_endpoint=self.auth_grpc_endpoint,
             frontend_url=self.frontend_url,
+            go_runtime=self._go_runtime_config,
         )
 
         self._self_monitoring = SelfMonitoring(self)
@@ -100,9 +119,18 @@ class LitmusBackendCharm(CharmBase):
             self.on.collect_unit_status, self._on_collect_unit_status
         )
 
-        observe_events(self, all_events, self._reconcile)
+        self._reconciler = TieredReconciler(
+            self,
+            full=self._reconcile,
+            light=self._reconcile_light,
+            relation_handlers={
+                # these only feed the charm's own telemetry
+                "logging": self._reconcile_self_monitoring,
+                "charm-tracing": self._reconcile_self_monitoring,
+            },
+        )
 
-    @property
+    @dispatch_cached
     def database_config(self) -> Optional[DatabaseConfig]:
         """Database configuration."""
         remote_relations_databags = self._database.fetch_relation_data()
@@ -145,6 +173,9 @@ class LitmusBackendCharm(CharmBase):
         if self._is_missing_tls_certificate:
             required_relations.append(TLS_CERTIFICATES_ENDPOINT)
 
+        if error := self._resources_config_error:
+            e.add_status(BlockedStatus(f"Invalid resources config: {error}"))
+
         StatusManager(
             charm=self,
             block_if_relations_missing=required_relations,
@@ -168,7 +199,7 @@ class LitmusBackendCharm(CharmBase):
     ###################
     # UTILITY METHODS #
     ###################
-    @property
+    @dispatch_cached
     def _tls_config(self) -> Optional[TLSConfigData]:
         """Returns the TLS configuration, including certificates and private key, if available; None otherwise."""
         certificates, private_key = self._tls_certificates.get_assigned_certificate(
@@ -189,27 +220,28 @@ class LitmusBackendCharm(CharmBase):
 
     @property
     def _certificate_request_attributes(self) -> CertificateRequestAttributes:
+        sans_dns = {socket.getfqdn(), get_app_hostname(self.app.name, self.model.name)}
+        if self.config.get("grpc_headless_service"):
+            # gRPC clients dialing the headless service verify this name
+            sans_dns.add(get_headless_hostname())
         return CertificateRequestAttributes(
             common_name=self.app.name,
-            sans_dns=frozenset(
-                (
-                    socket.getfqdn(),
-                    get_app_hostname(self.app.name, self.model.name),
-                )
-            ),
+            sans_dns=frozenset(sans_dns),
         )
 
     def _reconcile(self):
         """Run all logic that is independent of what event we're processing."""
+        # first: changing them restarts the pod anyway
+        self._reconcile_resources()
         self.unit.set_ports(*self.litmus_backend.litmus_backend_ports)
         self.unit.set_workload_version(
             get_litmus_version(self._backend_container) or ""
         )
         self._tls_certificates.sync()
+        # syncing may have changed the assigned certificate
+        invalidate(self, "_tls_config")
         self._tls.reconcile()
-        self._self_monitoring.reconcile(
-            ca_cert=self._tls_config.ca_cert if self._tls_config else None
-        )
+        self._reconcile_self_monitoring()
         self.litmus_backend.reconcile()
         if self.unit.is_leader():
             self._auth.publish_endpoint(
@@ -217,6 +249,9 @@ class LitmusBackendCharm(CharmBase):
                     grpc_server_host=get_app_hostname(self.app.name, self.model.name),
                     grpc_server_port=self._grpc_port,
                     insecure=False if self._tls_ready else True,
+                    grpc_server_headless_host=get_headless_hostname()
+                    if self.config.get("grpc_headless_service")
+                    else None,
                 )
             )
             # only send the backend data once we have a running container to indicate that this service is ready to be connected to.
@@ -225,6 +260,21 @@ class LitmusBackendCharm(CharmBase):
             if self.litmus_backend.is_running:
                 self._send_http_api.publish_endpoint(self._http_api_endpoint)
 
+    def _reconcile_light(self):
+        """Health check for update-status: only fully reconcile if the workload went down."""
+        if (
+            self.database_config
+            and self._hook_calls.can_connect(self._backend_container)
+            and not self.litmus_backend.is_running
+        ):
+            logger.info("backend server is not running; reconciling")
+            self._reconcile()
+
+    def _reconcile_self_monitoring(self):
+        self._self_monitoring.reconcile(
+            ca_cert=self._tls_config.ca_cert if self._tls_config else None
+        )
+
     @property
     def _tls_ready(self) -> bool:
         return bool(self._tls_config)
@@ -241,6 +291,39 @@ class LitmusBackendCharm(CharmBase):
             else self.litmus_backend.http_port
         )
 
+    @property
+    def _container_resources(self) -> dict[str, ContainerResources]:
+        """Resource requests and limits of the workload container, from the charm config.
+
+        Raises:
+            InvalidResourcesError: If the config isn't valid.
+        """
+        return {
+            LitmusBackend.container_name: ContainerResources.from_config(self.config)
+        }
+
+    @property
+    def _resources_config_error(self) -> Optional[str]:
+        try:
+            self._container_resources
+        except InvalidResourcesError as e:
+            return str(e)
+        return None
+
+    def _reconcile_resources(self):
+        """Set the configured resource requests and limits on the workload container."""
+        if not self.unit.is_leader() or self._resources_config_error:
+            return
+        self._resources_patch.reconcile(self._container_resources)
+
+    @property
+    def _go_runtime_config(self) -> GoRuntimeConfig:
+        return GoRuntimeConfig(
+            gomaxprocs=cast(int, self.config.get("gomaxprocs", 0)),
+            gomemlimit_percent=cast(int, self.config.get("gomemlimit_percent", 90)),
+            gogc=cast(int, self.config.get("gogc", 0)),
+        )
+
     @property
     def _grpc_port(self):
         return (
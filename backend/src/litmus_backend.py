@@ -5,12 +5,21 @@
 """Control Litmus Backend server running in a container under Pebble. Provides a LitmusBackend class."""
 
 import json
+import functools
 import logging
 
-from ops import Container
+from ops import Container, ModelError
 from ops.pebble import Layer, CheckDict, ConnectionError
 from typing import Optional, Callable
-from litmus_libs import DatabaseConfig, TLSConfigData, get_litmus_version
+from litmus_libs import (
+    DatabaseConfig,
+    GoRuntimeConfig,
+    ResourceLimits,
+    TLSConfigData,
+    get_container_resource_limits,
+    get_litmus_version,
+    go_runtime_env,
+)
 from litmus_libs.interfaces.litmus_auth import Endpoint
 
 logger = logging.getLogger(__name__)
@@ -39,6 +48,7 @@ class LitmusBackend:
         tls_config_getter: Callable[[], Optional[TLSConfigData]],
         auth_grpc_endpoint: Optional[Endpoint],
         frontend_url: Optional[str],
+        go_runtime: Optional[GoRuntimeConfig] = None,
     ):
         self._container = container
         self._tls_cert_path = tls_cert_path
@@ -49,6 +59,7 @@ class LitmusBackend:
         self._auth_grpc_endpoint = auth_grpc_endpoint
         self._frontend_url = frontend_url
         self._workload_version = get_litmus_version(self._container)
+        self._go_runtime = go_runtime or GoRuntimeConfig()
 
     def reconcile(self):
         """Unconditional control logic."""
@@ -94,6 +105,9 @@ class LitmusBackend:
             return self._container.get_service(self.service_name).is_running()
         except ConnectionError:
             return False
+        except ModelError:
+            # the service isn't in the plan (yet)
+            return False
 
     def _pebble_check_layer(self, tls_enabled: bool) -> CheckDict:
         return {
@@ -118,6 +132,10 @@ class LitmusBackend:
             return f"{parts[0]}.{parts[1]}-26.04_edge"
         return f"{parts[0]}-26.04_edge"
 
+    @functools.cached_property
+    def _resource_limits(self) -> ResourceLimits:
+        return get_container_resource_limits(self._container)
+
     def _environment_vars(self, tls_enabled: bool) -> dict:
         workload_version = self._workload_version or ""
         image_tag = self._docker_hub_tag(workload_version)
@@ -152,7 +170,7 @@ class LitmusBackend:
         if auth_endpoint := self._auth_grpc_endpoint:
             env.update(
                 {
-                    "LITMUS_AUTH_GRPC_ENDPOINT": auth_endpoint.grpc_server_host,
+                    "LITMUS_AUTH_GRPC_ENDPOINT": auth_endpoint.grpc_dial_host,
                     "LITMUS_AUTH_GRPC_PORT": auth_endpoint.grpc_server_port,
                 }
             )
@@ -162,6 +180,7 @@ class LitmusBackend:
                     "CHAOS_CENTER_UI_ENDPOINT": frontend_url,
                 }
             )
+        env.update(go_runtime_env(self._go_runtime, self._resource_limits))
         if tls_enabled:
             env.update(
                 {
@@ -70,6 +70,7 @@ def test_get_auth_grpc_endpoint(
                 ),
                 "grpc_server_port": json.dumps(8000),
                 "insecure": json.dumps(True),
+                "grpc_server_headless_host": json.dumps(None),
                 "version": json.dumps(0),
             },
         ),
@@ -109,6 +110,7 @@ def test_publish_endpoint_without_tls(
                 ),
                 "grpc_server_port": json.dumps(8001),
                 "insecure": json.dumps(False),
+                "grpc_server_headless_host": json.dumps(None),
                 "version": json.dumps(0),
             },
         ),
@@ -144,6 +146,49 @@ def test_publish_endpoint_with_tls(
     assert relation_out.local_app_data == expected
 
 
+def test_publish_headless_endpoint(
+    ctx, auth_relation, database_relation, backend_container
+):
+    # GIVEN a leader configured to publish its headless service
+    # WHEN a relation_changed event fires
+    state_out = ctx.run(
+        state=State(
+            relations={auth_relation, database_relation},
+            containers={backend_container},
+            leader=True,
+            model=Model(name="test"),
+            config={"grpc_headless_service": True},
+        ),
+        event=ctx.on.relation_changed(auth_relation),
+    )
+
+    # THEN the headless service, resolving to all units, is published along with the service
+    databag = state_out.get_relation(auth_relation.id).local_app_data
+    assert json.loads(databag["grpc_server_headless_host"]) == (
+        "app-headless.default.svc.cluster.local"
+    )
+    assert json.loads(databag["grpc_server_port"]) == 8000
+
+
+@pytest.mark.parametrize("headless", (False, True))
+def test_headless_service_is_only_a_san_when_published(
+    ctx, auth_relation, database_relation, backend_container, headless
+):
+    # GIVEN a unit configured to publish its headless service, or not
+    state = State(
+        relations={auth_relation, database_relation},
+        containers={backend_container},
+        config={"grpc_headless_service": headless},
+    )
+
+    # WHEN we look at the certificate it requests
+    with ctx(ctx.on.update_status(), state) as mgr:
+        sans = mgr.charm._certificate_request_attributes.sans_dns
+
+    # THEN the headless service is only in its SANs if it's published
+    assert ("app-headless.default.svc.cluster.local" in sans) is headless
+
+
 @pytest.mark.parametrize("leader", (False, True))
 @pytest.mark.parametrize("backend_tls", (False, True))
 @pytest.mark.parametrize("local_tls", (False, True))
@@ -14,7 +14,7 @@ from litmus_backend import LitmusBackend
     (
         CharmEvents.upgrade_charm(),
         CharmEvents.install(),
-        CharmEvents.update_status(),
+        CharmEvents.config_changed(),
         CharmEvents.install(),
     ),
 )
@@ -24,7 +24,7 @@ def test_ports_opened(ctx, event, backend_container, leader, tls):
 
     # WHEN any event fires
     with patch_cert_and_key_ctx(tls):
-        state_out = ctx.run(ctx.on.update_status(), state=state)
+        state_out = ctx.run(event, state=state)
 
     # THEN the workload_version is unset
     assert set(p.port for p in state_out.opened_ports) == (
@@ -1,6 +1,6 @@
 # Copyright 2025 Canonical Ltd.
 # See LICENSE file for licensing details.
-from ops.testing import State
+from ops.testing import Mount, State
 from dataclasses import replace
 
 import pytest
@@ -203,7 +203,7 @@ def test_workload_version_in_pebble_env_vars(
     state = State(containers=[backend_container])
 
     # WHEN any event is fired
-    state_out = ctx.run(ctx.on.update_status(), state=state)
+    state_out = ctx.run(ctx.on.config_changed(), state=state)
 
     backend_container_out = state_out.get_container(backend_container.name)
     actual_env_vars = backend_container_out.plan.to_dict()["services"]["backend"][
@@ -262,7 +262,7 @@ def test_execution_plane_image_tags_in_pebble_plan(
     state = State(containers=[backend_container])
 
     # WHEN any event is fired
-    state_out = ctx.run(ctx.on.update_status(), state=state)
+    state_out = ctx.run(ctx.on.config_changed(), state=state)
 
     actual_env_vars = state_out.get_container(backend_container.name).plan.to_dict()[
         "services"
@@ -300,3 +300,80 @@ def test_pebble_checks_plan(
     assert backend_container_out.plan.checks["backend-up"].tcp == {
         "port": 8081 if tls else 8080
     }
+
+
+def test_update_status_leaves_running_workload_alone(
+    ctx, backend_container, database_relation
+):
+    # GIVEN a deployment whose workload is up and running
+    state = State(containers=[backend_container], relations=[database_relation])
+    state = ctx.run(ctx.on.relation_changed(database_relation), state=state)
+    assert state.get_container("backend").services["backend"].is_running()
+    opened_ports = state.opened_ports
+
+    # WHEN update-status fires
+    state_out = ctx.run(ctx.on.update_status(), state=replace(state, opened_ports=[]))
+
+    # THEN nothing is reconciled (e.g. ports aren't re-opened)
+    assert opened_ports
+    assert not state_out.opened_ports
+
+
+def test_update_status_reconciles_stopped_workload(
+    ctx, backend_container, database_relation
+):
+    # GIVEN a deployment whose workload should run, but doesn't
+    state = State(containers=[backend_container], relations=[database_relation])
+
+    # WHEN update-status fires
+    state_out = ctx.run(ctx.on.update_status(), state=state)
+
+    # THEN the workload is reconciled, and started
+    assert state_out.get_container("backend").services["backend"].is_running()
+
+
+def test_pebble_plan_dials_headless_auth_service(ctx, backend_container, auth_relation):
+    # GIVEN an auth server that publishes its headless service
+    auth_relation = replace(
+        auth_relation,
+        remote_app_data={
+            **auth_remote_databag(),
+            "grpc_server_headless_host": '"auth-endpoints.model.svc.cluster.local"',
+        },
+    )
+    state = State(containers=[backend_container], relations=[auth_relation])
+
+    # WHEN a relation changed event is fired
+    state_out = ctx.run(ctx.on.relation_changed(auth_relation), state=state)
+
+    # THEN the backend server resolves all auth units through DNS
+    env = (
+        state_out.get_container(backend_container.name)
+        .plan.services["backend"]
+        .environment
+    )
+    assert (
+        env["LITMUS_AUTH_GRPC_ENDPOINT"]
+        == "dns:///auth-endpoints.model.svc.cluster.local"
+    )
+
+
+def test_pebble_plan_tunes_go_runtime_to_limits(ctx, backend_container, tmp_path):
+    # GIVEN a container limited to 1.5 CPUs and 1GiB of memory
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    (tmp_path / "memory.max").write_text(f"{1024**3}\n")
+    container = replace(
+        backend_container,
+        mounts={"cgroup": Mount(location="/sys/fs/cgroup", source=tmp_path)},
+    )
+    # AND a custom garbage collection target
+    state = State(containers=[container], config={"gogc": 50})
+
+    # WHEN a workload pebble ready event is fired
+    state_out = ctx.run(ctx.on.pebble_ready(container), state=state)
+
+    # THEN the Go runtime is tuned to the container limits
+    env = state_out.get_container(container.name).plan.services["backend"].environment
+    assert env["GOMAXPROCS"] == "2"
+    assert env["GOMEMLIMIT"] == "921MiB"
+    assert env["GOGC"] == "50"
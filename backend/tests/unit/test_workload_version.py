@@ -20,7 +20,7 @@ def test_workload_version_unset(ctx, backend_container, can_connect):
     state = State(containers=[backend_container])
 
     # WHEN any event fires
-    state_out = ctx.run(ctx.on.update_status(), state=state)
+    state_out = ctx.run(ctx.on.config_changed(), state=state)
 
     # THEN the workload_version is unset
     assert not state_out.workload_version
@@ -36,7 +36,7 @@ def test_workload_version_set(ctx, backend_container, version_file):
     state = State(containers=[backend_container])
 
     # WHEN any event fires
-    state_out = ctx.run(ctx.on.update_status(), state=state)
+    state_out = ctx.run(ctx.on.config_changed(), state=state)
 
     # THEN the workload_version is set
     assert state_out.workload_version
@@ -2,17 +2,29 @@
 # See LICENSE file for licensing details.
 
 
-from typing import Callable, Optional
+from dataclasses import asdict
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, MutableMapping, Optional
 from ops import Secret
 
-from environment_manager import EnvironmentManager
-from infra_manager import InfraManager
-from litmus_client import LitmusClient
+from environment_manager import DEFAULT_ENVIRONMENT, EnvironmentManager
+from infra_manager import InfraManager, InfraReconcileSummary
+from litmus_client import (
+    DEFAULT_POOL_MAXSIZE,
+    LitmusAuthError,
+    LitmusClient,
+    TokenStore,
+)
 from user_manager import UserManager
 from litmus_libs.interfaces.litmus_infrastructure import (
     InfrastructureDatabagModel,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class Chaoscenter:
     """Represents the Chaoscenter workload state and encapsulates all logic to operate it."""
@@ -23,32 +35,117 @@ class Chaoscenter:
         user_secret_id: Optional[str],
         get_secret: Callable[[str], Secret],
         infra_data: list[InfrastructureDatabagModel],
+        token_store: Optional[TokenStore] = None,
+        applied_manifests: Optional[MutableMapping[str, Any]] = None,
+        teardown_queue: Optional[MutableMapping[str, Any]] = None,
+        time_budget: Optional[float] = None,
+        verified_credentials: Optional[MutableMapping[str, Any]] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
     ):
 
         self._user_manager = UserManager(
             secret_id=user_secret_id,
             get_secret=get_secret,
-            make_client=lambda username, password: LitmusClient(
-                endpoint=endpoint, username=username, password=password
+            make_client=lambda username, password, credentials_revision: LitmusClient(
+                endpoint=endpoint,
+                username=username,
+                password=password,
+                token_store=token_store,
+                pool_maxsize=pool_maxsize,
+                credentials_revision=credentials_revision,
             ),
+            endpoint=endpoint,
+            verified_credentials=verified_credentials,
         )
 
         self._environment_manager = EnvironmentManager()
-        self._infra_manager = InfraManager(infra_data)
+        self._infra_manager = InfraManager(
+            infra_data, applied_manifests, teardown_queue
+        )
+        self._infra_data = infra_data
+        self._time_budget = time_budget
 
     @property
     def user_secrets_valid(self) -> bool:
         """Returns True if the UserManager is ready to manage credentials, False otherwise."""
         return self._user_manager.user_secrets_valid
 
-    def reconcile(self):
-        """Reconcile the state of the application, ensuring that all components are in their desired state."""
+    def inputs_fingerprint(self, **context: Any) -> str:
+        """A digest of everything the outcome of reconcile depends on.
+
+        That's the user secret and the desired infrastructures, plus whatever else
+        the caller passes in (endpoints, TLS state, workload version, ...).
+        """
+        inputs = {
+            "user_secret": self._user_manager.secret_fingerprint,
+            "infrastructures": sorted(
+                (asdict(infra) for infra in self._infra_data),
+                key=lambda infra: sorted(infra.items()),
+            ),
+            **context,
+        }
+        return _digest(inputs)
+
+    def is_alive(self) -> bool:
+        """Cheap check that the Litmus API is still up, without reconciling anything."""
+        client = self._user_manager.get_charm_client()
+        return client is not None and client.is_alive()
+
+    def reconcile(
+        self,
+        litmus_version: str = "",
+        frontend_url: str = "",
+        ca_cert: Optional[str] = None,
+    ) -> Optional[InfraReconcileSummary]:
+        """Reconcile the state of the application, ensuring that all components are in their desired state.
+
+        If a time budget was given, infrastructure work that doesn't fit in it is left for a later call.
+        The infrastructure manifests embed the Litmus version, the server address the infrastructures
+        connect back to (frontend_url) and the CA they trust; those applied for other values are
+        fetched again.
+        Returns the outcome of reconciling the infrastructures, or None if we didn't get that far.
+        """
+        deadline = time.monotonic() + self._time_budget if self._time_budget else None
         self._user_manager.reconcile()
 
         # Only attempt to reconcile env/infra if we have valid credentials
         client = self._user_manager.get_charm_client()
-        if client is None or not client.can_login():
-            return
+        if client is None:
+            return None
+        if not client.can_login():
+            # the credentials may have been changed behind our back
+            self._user_manager.forget_verified_credentials()
+            return None
+
+        try:
+            # read the whole project state once, and let all managers work off the same snapshot
+            snapshot = client.get_project_snapshot(
+                client.get_default_project_id(), DEFAULT_ENVIRONMENT
+            )
+            self._environment_manager.reconcile(client, snapshot)
+            summary = self._infra_manager.reconcile(
+                client,
+                snapshot,
+                deadline,
+                manifest_revision=_digest(
+                    {
+                        "litmus_version": litmus_version,
+                        "frontend_url": frontend_url,
+                        "ca_cert": ca_cert,
+                    }
+                ),
+            )
+        except LitmusAuthError as e:
+            # don't raise: that would roll back the forgotten credentials along with the hook
+            logger.warning("Litmus API refused the charm credentials: %s", e)
+            self._user_manager.forget_verified_credentials()
+            return None
+        if summary.auth_failed:
+            self._user_manager.forget_verified_credentials()
+        return summary
+
 
-        self._environment_manager.reconcile(client)
-        self._infra_manager.reconcile(client)
+def _digest(inputs: Dict[str, Any]) -> str:
+    return hashlib.sha256(
+        json.dumps(inputs, sort_keys=True, default=str).encode()
+    ).hexdigest()
@@ -5,13 +5,12 @@
 
 import logging
 import socket
+import time
 import typing
 from typing import Optional, Dict, cast, Any
 
 import cosl
-import cosl.reconciler
 from charmlibs.nginx_k8s import (
-    Nginx,
     NginxPrometheusExporter,
     NginxTracingConfig,
     TLSConfig,
@@ -20,12 +19,17 @@ from ops import (
     BlockedStatus,
     CollectStatusEvent,
     ActiveStatus,
+    MaintenanceStatus,
+    StoredState,
+    WaitingStatus,
 )
 from ops.charm import CharmBase
 from litmus_libs.interfaces.litmus_infrastructure import (
     LitmusInfrastructureRequirer,
 )
 from chaoscenter import Chaoscenter
+from litmus_client import DEFAULT_POOL_MAXSIZE, TokenStore
+from peers import PEERS_ENDPOINT, ChaoscenterPeers, ReconcileResult
 from charms.prometheus_k8s.v0.prometheus_scrape import MetricsEndpointProvider
 from charms.tempo_coordinator_k8s.v0.tracing import TracingEndpointRequirer
 from charms.tls_certificates_interface.v4.tls_certificates import (
@@ -33,32 +37,79 @@ from charms.tls_certificates_interface.v4.tls_certificates import (
     CertificateRequestAttributes,
 )
 from charms.traefik_k8s.v0.traefik_route import TraefikRouteRequirer
-from litmus_libs import get_app_hostname, get_litmus_version
+from litmus_libs import (
+    ContainerResources,
+    HookCallAccounting,
+    InvalidResourcesError,
+    StatefulSetResourcesPatch,
+    TieredReconciler,
+    dispatch_cached,
+    get_app_hostname,
+    get_container_resource_limits,
+    get_litmus_version,
+)
 from litmus_libs.interfaces.http_api import (
     LitmusAuthApiRequirer,
     LitmusBackendApiRequirer,
 )
 from litmus_libs.interfaces.self_monitoring import SelfMonitoring
-import cosl
-import cosl.reconciler
 from litmus_libs.status_manager import StatusManager
-from nginx_config import get_config, http_server_port, all_pebble_checks, container_name
-from traefik_config import ingress_config, static_ingress_config
+from nginx_workload import CachedNginx
+from nginx_config import (
+    UpstreamKeepalive,
+    WorkerSettings,
+    all_pebble_checks,
+    container_name,
+    get_config,
+    http_server_port,
+    worker_settings,
+)
+from traefik_config import (
+    DEFAULT_LOAD_BALANCING_STRATEGY,
+    LOAD_BALANCING_STRATEGIES,
+    Middlewares,
+    ingress_config,
+    static_ingress_config,
+)
 
 logger = logging.getLogger(__name__)
 AUTH_HTTP_API_ENDPOINT = "auth-http-api"
 BACKEND_HTTP_API_ENDPOINT = "backend-http-api"
 TLS_CERTIFICATES_ENDPOINT = "tls-certificates"
 NGINX_EXPORTER_PORT = 9113
+NGINX_EXPORTER_CONTAINER = "nginx-prometheus-exporter"
 
 
 class LitmusChaoscenterCharm(CharmBase):
     """Charmed Operator for Litmus Chaoscenter."""
 
+    _stored = StoredState()
+
     def __init__(self, *args):
         super().__init__(*args)
+        self._hook_calls = HookCallAccounting(self)
+        # Litmus access tokens, persisted so that we don't have to log in on every hook
+        self._stored.set_default(
+            litmus_tokens={},
+            infra_manifest_digests={},
+            infra_teardown_queue={},
+            # fingerprint of the inputs of the last successful litmus reconcile, and when it ran
+            litmus_inputs_fingerprint="",
+            litmus_last_full_resync=0.0,
+            # fingerprint of the user credentials last verified against the Litmus API
+            litmus_verified_credentials={},
+            # digests of the nginx config inputs, rendered config and TLS material last applied
+            nginx_state={},
+            # digest of the container resources last set on the StatefulSet
+            statefulset_resources={},
+        )
         self._fqdn = socket.getfqdn()
         self._container = self.unit.get_container(container_name)
+        self._resources_patch = StatefulSetResourcesPatch(
+            self.app.name,
+            self.model.name,
+            state=self._stored.statefulset_resources,  # type: ignore[arg-type]
+        )
         self._receive_auth_http_api = LitmusAuthApiRequirer(
             relation=self.model.get_relation(AUTH_HTTP_API_ENDPOINT), app=self.app
         )
@@ -96,21 +147,34 @@ class LitmusChaoscenterCharm(CharmBase):
             self.model.relations["litmus-infrastructure"], self.app
         )
 
-        self.nginx = Nginx(
+        self.nginx = CachedNginx(
             self._container,
+            state=self._stored.nginx_state,  # type: ignore
             liveness_check_endpoint_getter=self._nginx_liveness_endpoint,
         )
 
         self._self_monitoring = SelfMonitoring(self)
+        self._peers = ChaoscenterPeers(
+            self.model.get_relation(PEERS_ENDPOINT), self.app, self.unit
+        )
         self._chaoscenter = Chaoscenter(
             endpoint=f"{self._internal_frontend_url}:{http_server_port}",
             user_secret_id=self._user_credentials_secret,
-            get_secret=lambda secret_id: self.model.get_secret(id=secret_id),
+            # resolved several times per reconcile
+            get_secret=lambda secret_id: self._hook_calls.call(
+                "secret_get", self.model.get_secret, id=secret_id, read_only=True
+            ),
             infra_data=self._litmus_infra.get_all_data(),
+            token_store=TokenStore(self._stored.litmus_tokens),  # type: ignore[arg-type]
+            applied_manifests=self._stored.infra_manifest_digests,  # type: ignore[arg-type]
+            teardown_queue=self._stored.infra_teardown_queue,  # type: ignore[arg-type]
+            time_budget=self._reconcile_time_budget,
+            verified_credentials=self._stored.litmus_verified_credentials,  # type: ignore[arg-type]
+            pool_maxsize=self._api_connection_pool_size,
         )
 
         self.nginx_exporter = NginxPrometheusExporter(
-            self.unit.get_container("nginx-prometheus-exporter"),
+            self.unit.get_container(NGINX_EXPORTER_CONTAINER),
             nginx_port=http_server_port,
             nginx_prometheus_exporter_port=NGINX_EXPORTER_PORT,
         )
@@ -119,53 +183,126 @@ class LitmusChaoscenterCharm(CharmBase):
             self.on.collect_unit_status, self._on_collect_unit_status
         )
 
-        cosl.reconciler.observe_events(
-            self, cosl.reconciler.all_events, self._reconcile
+        self._reconciler = TieredReconciler(
+            self,
+            full=self._reconcile,
+            # update-status still drives the litmus state: resumes deferred work, resyncs
+            light=self._reconcile_litmus_api,
+            relation_handlers={
+                "litmus-infrastructure": self._reconcile_litmus_api,
+                # the leader's reconcile result only feeds the status, unit addresses the ingress
+                PEERS_ENDPOINT: self._reconcile_peers,
+                # these only feed the charm's own telemetry
+                "logging": self._reconcile_self_monitoring,
+                "charm-tracing": self._reconcile_self_monitoring,
+            },
         )
 
     def _reconcile(self):
         """Run all logic that is independent of what event we're processing."""
+        # first: changing them restarts the pod anyway
+        self._reconcile_resources()
         self.unit.set_ports(http_server_port)
-        self.unit.set_workload_version(
-            get_litmus_version(
-                container=self.unit.get_container(container_name),
-            )
-            or ""
-        )
+        self.unit.set_workload_version(self._workload_version)
 
         self._metrics_endpoint_provider.set_scrape_job_spec()
-        self._self_monitoring.reconcile(
-            ca_cert=self._tls_config.ca_cert if self._tls_config else None
-        )
+        self._reconcile_self_monitoring()
 
         self._receive_backend_http_api.publish_endpoint(
             f"{self._most_external_frontend_url}:{http_server_port}"
         )
 
-        if self.unit.is_leader() and self.ingress.is_ready():
-            self.ingress.submit_to_traefik(
-                ingress_config(
-                    self.model.name, self.app.name, self._tls_config is not None
-                ),
-                static=static_ingress_config(),
-            )
+        self._reconcile_ingress()
 
         if self.failed_consistency_checks:
             # don't do any litmus backend operations because they require a consistent deployment
             return None
 
         # logic that requires a consistent deployment
-        self.nginx.reconcile(
-            nginx_config=self._nginx_config(
-                # consistency checks would fail if these were unset
-                auth_url=cast(str, self.auth_url),
-                backend_url=cast(str, self.backend_url),
-            ),
+        nginx_inputs = self._nginx_config_inputs(
+            # consistency checks would fail if these were unset
+            auth_url=cast(str, self.auth_url),
+            backend_url=cast(str, self.backend_url),
+        )
+        self.nginx.reconcile_if_changed(
+            inputs=nginx_inputs,
+            render=lambda: get_config(**nginx_inputs),
             tls_config=self._tls_config,
         )
         self.nginx_exporter.reconcile()
 
-        self._chaoscenter.reconcile()
+        self._reconcile_litmus_api()
+
+    def _reconcile_ingress(self):
+        """Publish this unit's address, and balance the ingressed traffic over all units."""
+        self._peers.publish_address(self._fqdn)
+        if not (self.unit.is_leader() and self.ingress.is_ready()):
+            return
+        self.ingress.submit_to_traefik(
+            ingress_config(
+                self.model.name,
+                self.app.name,
+                self._tls_config is not None,
+                hosts=self._peers.addresses or [self._fqdn],
+                strategy=self._ingress_load_balancing,
+                sticky=bool(self.config.get("ingress_sticky_sessions", False)),
+                middlewares=self._ingress_middlewares,
+            ),
+            static=static_ingress_config(),
+        )
+
+    def _reconcile_peers(self):
+        self._reconcile_ingress()
+        self._reconcile_litmus_api()
+
+    def _reconcile_self_monitoring(self):
+        self._self_monitoring.reconcile(
+            ca_cert=self._tls_config.ca_cert if self._tls_config else None
+        )
+
+    def _reconcile_litmus_api(self) -> None:
+        """Reconcile the Litmus API state, unless none of its inputs changed since the last time."""
+        if self.failed_consistency_checks:
+            # litmus backend operations require a consistent deployment
+            return
+        if not self.unit.is_leader():
+            # the leader talks to the Litmus API on behalf of the whole application,
+            # so that units don't race each other to create the same resources
+            return
+
+        workload_version = self._workload_version
+        # the infrastructure manifests embed the address they connect back to and the CA to trust
+        frontend_url = f"{self._most_external_frontend_url}:{http_server_port}"
+        ca_cert = self._tls_config.ca_cert if self._tls_config else None
+        fingerprint = self._chaoscenter.inputs_fingerprint(
+            auth_url=self.auth_url,
+            backend_url=self.backend_url,
+            frontend_url=frontend_url,
+            ca_cert=ca_cert,
+            workload_version=workload_version,
+        )
+        resync_due = (
+            time.time() - self._stored.litmus_last_full_resync  # type: ignore[operator]
+            >= self._full_resync_interval
+        )
+        if fingerprint == self._stored.litmus_inputs_fingerprint and not resync_due:
+            if not self._chaoscenter.is_alive():
+                logger.info("litmus API liveness probe failed; forcing a full resync")
+                self._stored.litmus_inputs_fingerprint = ""
+            return
+
+        summary = self._chaoscenter.reconcile(
+            litmus_version=workload_version, frontend_url=frontend_url, ca_cert=ca_cert
+        )
+        if summary is not None:
+            self._peers.publish_result(ReconcileResult.from_summary(summary))
+
+        # only skip the next reconciles if this one got everything done
+        if summary is not None and not summary.failed and not summary.deferred:
+            self._stored.litmus_inputs_fingerprint = fingerprint
+            self._stored.litmus_last_full_resync = time.time()
+        else:
+            self._stored.litmus_inputs_fingerprint = ""
 
     ##################
     # CONFIG METHODS #
@@ -194,13 +331,17 @@ class LitmusChaoscenterCharm(CharmBase):
             else None
         )
 
-    def _nginx_config(self, backend_url: str, auth_url: str) -> str:
-        return get_config(
+    def _nginx_config_inputs(self, backend_url: str, auth_url: str) -> Dict[str, Any]:
+        """Everything the nginx config is rendered from."""
+        return dict(
             hostname=self._fqdn,
             auth_url=auth_url,
             backend_url=backend_url,
             tls_available=bool(self._tls_config),
             tracing_config=self._nginx_tracing_config(),
+            keepalive=self._upstream_keepalive,
+            workers=self._nginx_worker_settings,
+            http2=bool(self.config.get("http2", True)),
         )
 
     @property
@@ -216,7 +357,7 @@ class LitmusChaoscenterCharm(CharmBase):
             ),
         )
 
-    @property
+    @dispatch_cached
     def _tls_config(self) -> Optional[TLSConfig]:
         """Returns the TLS configuration, including certificates and private key, if available; None otherwise."""
         certificates, private_key = self._tls_certificates.get_assigned_certificate(
@@ -253,12 +394,12 @@ class LitmusChaoscenterCharm(CharmBase):
         protocol = "https" if self._tls_config else "http"
         return f"{protocol}://{get_app_hostname(self.app.name, self.model.name)}"
 
-    @property
+    @dispatch_cached
     def backend_url(self):
         """The backend's http API url."""
         return self._receive_backend_http_api.backend_endpoint
 
-    @property
+    @dispatch_cached
     def auth_url(self):
         """The auth's http API url."""
         return self._receive_auth_http_api.auth_endpoint
@@ -272,7 +413,7 @@ class LitmusChaoscenterCharm(CharmBase):
         checks = self.consistency_checks
         return [name for name, value in checks.items() if value is None]
 
-    @property
+    @dispatch_cached
     def consistency_checks(self) -> Dict[str, Optional[Any]]:
         """Verify the control plane deployment is consistent.
 
@@ -312,6 +453,112 @@ class LitmusChaoscenterCharm(CharmBase):
         """The secret ID configured for user credentials, or None if not set."""
         return typing.cast(Optional[str], self.config.get("user_secrets"))
 
+    @property
+    def _workload_version(self) -> str:
+        return (
+            get_litmus_version(container=self.unit.get_container(container_name)) or ""
+        )
+
+    @property
+    def _full_resync_interval(self) -> float:
+        """Seconds after which the litmus state is reconciled even if none of its inputs changed."""
+        return float(typing.cast(int, self.config.get("full_resync_interval", 0)))
+
+    @property
+    def _container_resources(self) -> Dict[str, ContainerResources]:
+        """Resource requests and limits of the workload containers, from the charm config.
+
+        Raises:
+            InvalidResourcesError: If the config isn't valid.
+        """
+        return {
+            container_name: ContainerResources.from_config(self.config),
+            NGINX_EXPORTER_CONTAINER: ContainerResources.from_config(
+                self.config, prefix="exporter_"
+            ),
+        }
+
+    @property
+    def _resources_config_error(self) -> Optional[str]:
+        try:
+            self._container_resources
+        except InvalidResourcesError as e:
+            return str(e)
+        return None
+
+    def _reconcile_resources(self):
+        """Set the configured resource requests and limits on the workload containers."""
+        if not self.unit.is_leader() or self._resources_config_error:
+            return
+        self._resources_patch.reconcile(self._container_resources)
+
+    @property
+    def _ingress_load_balancing(self) -> str:
+        """The strategy Traefik balances the ingressed traffic over the units with."""
+        strategy = typing.cast(
+            str,
+            self.config.get("ingress_load_balancing", DEFAULT_LOAD_BALANCING_STRATEGY),
+        )
+        if strategy not in LOAD_BALANCING_STRATEGIES:
+            logger.warning(
+                "invalid ingress_load_balancing %r; falling back to %r",
+                strategy,
+                DEFAULT_LOAD_BALANCING_STRATEGY,
+            )
+            return DEFAULT_LOAD_BALANCING_STRATEGY
+        return strategy
+
+    @property
+    def _ingress_middlewares(self) -> Middlewares:
+        """Traefik middlewares to apply to the ingressed requests."""
+        return Middlewares(
+            compress=bool(self.config.get("ingress_compression", True)),
+            retry_attempts=typing.cast(
+                int, self.config.get("ingress_retry_attempts", 0)
+            ),
+            max_inflight_requests=typing.cast(
+                int, self.config.get("ingress_max_inflight_requests", 0)
+            ),
+        )
+
+    @dispatch_cached
+    def _nginx_worker_settings(self) -> WorkerSettings:
+        """Nginx worker sizing, derived from the container's resource limits unless configured."""
+        return worker_settings(
+            get_container_resource_limits(self._container),
+            processes=typing.cast(int, self.config.get("nginx_worker_processes", 0)),
+            connections=typing.cast(
+                int, self.config.get("nginx_worker_connections", 0)
+            ),
+        )
+
+    @property
+    def _upstream_keepalive(self) -> UpstreamKeepalive:
+        """Settings of the pools of connections nginx keeps open to the auth and backend servers."""
+        return UpstreamKeepalive(
+            connections=typing.cast(int, self.config.get("upstream_keepalive", 0)),
+            timeout=typing.cast(int, self.config.get("upstream_keepalive_timeout", 60)),
+            requests=typing.cast(
+                int, self.config.get("upstream_keepalive_requests", 1000)
+            ),
+        )
+
+    @property
+    def _reconcile_time_budget(self) -> Optional[float]:
+        """Seconds a reconcile may spend on infrastructure work, or None if unbounded."""
+        budget = typing.cast(int, self.config.get("reconcile_time_budget", 0))
+        return float(budget) if budget > 0 else None
+
+    @property
+    def _api_connection_pool_size(self) -> int:
+        """Keep-alive connections the charm keeps open to the Litmus API."""
+        return max(
+            1,
+            typing.cast(
+                int, self.config.get("api_connection_pool_size", DEFAULT_POOL_MAXSIZE)
+            ),
+        )
+
     ###################
     # EVENT OBSERVERS #
     ###################
@@ -335,6 +582,25 @@ class LitmusChaoscenterCharm(CharmBase):
                 )
             )
 
+        if error := self._resources_config_error:
+            e.add_status(BlockedStatus(f"Invalid resources config: {error}"))
+
+        if result := self._peers.result:
+            if result.failed_infrastructures:
+                e.add_status(
+                    WaitingStatus(
+                        f"Failed to reconcile {len(result.failed_infrastructures)} "
+                        "infrastructures; see the leader's logs."
+                    )
+                )
+            elif result.deferred_infrastructures:
+                e.add_status(
+                    MaintenanceStatus(
+                        f"{len(result.deferred_infrastructures)} infrastructure "
+                        "operations pending."
+                    )
+                )
+
         StatusManager(
             charm=self,
             block_if_relations_missing=required_relations,
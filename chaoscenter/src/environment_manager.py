@@ -4,7 +4,7 @@
 
 import logging
 
-from litmus_client import LitmusClient
+from litmus_client import LitmusClient, ProjectSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -14,23 +14,14 @@ DEFAULT_ENVIRONMENT = "charmed_litmus"
 class EnvironmentManager:
     """Manages the Chaos Environment in Chaoscenter."""
 
-    def reconcile(self, litmus_client: LitmusClient) -> None:
+    def reconcile(self, litmus_client: LitmusClient, snapshot: ProjectSnapshot) -> None:
         """Reconcile the state of the environment, ensuring that it is in the desired state."""
-        default_project_id = litmus_client.get_default_project_id()
-        if not self._environment_exists(
-            litmus_client, default_project_id, DEFAULT_ENVIRONMENT
-        ):
+        if not self._environment_exists(snapshot, DEFAULT_ENVIRONMENT):
             litmus_client.create_environment(
-                project_id=default_project_id, name=DEFAULT_ENVIRONMENT
+                project_id=snapshot.project_id, name=DEFAULT_ENVIRONMENT
             )
             logger.info(f"Default environment {DEFAULT_ENVIRONMENT} created")
 
     @staticmethod
-    def _environment_exists(
-        litmus_client: LitmusClient,
-        project_id: str,
-        env_name: str,
-    ) -> bool:
-        return any(
-            env.name == env_name for env in litmus_client.list_environments(project_id)
-        )
+    def _environment_exists(snapshot: ProjectSnapshot, env_name: str) -> bool:
+        return any(env.name == env_name for env in snapshot.environments)
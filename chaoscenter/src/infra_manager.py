@@ -2,14 +2,39 @@
 # See LICENSE file for licensing details.
 """This module contains the InfraManager class, which is responsible for managing the infrastructure in Chaoscenter."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import functools
+import hashlib
 import logging
 from pathlib import Path
+import time
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+)
 
 from lightkube import Client, ApiError
 from lightkube.codecs import load_all_yaml
+from lightkube.resources.apiextensions_v1 import CustomResourceDefinition
+from lightkube.resources.apps_v1 import Deployment
 
 from environment_manager import DEFAULT_ENVIRONMENT
-from litmus_client import LitmusClient
+from litmus_client import (
+    AsyncLitmusClient,
+    LitmusAuthError,
+    LitmusClient,
+    ProjectSnapshot,
+    gather_bounded,
+)
 from litmus_libs.interfaces.litmus_infrastructure import InfrastructureDatabagModel
 from lightkube.generic_resource import create_namespaced_resource
 
@@ -38,26 +63,155 @@ ChaosResult = create_namespaced_resource(
 LITMUS_CRD_MANIFEST_PATH = (
     Path(__file__).parent / "k8s_manifests" / "litmus_portal_crds.yaml"
 )
+# label recording which revision of the CRD manifest a CRD was applied from
+CRD_DIGEST_LABEL = "litmus.charm.canonical.com/crds-digest"
+# label values are capped at 63 characters, so we only keep a prefix of the sha256
+CRD_DIGEST_LENGTH = 32
+# objects are applied one tier at a time, so whatever an object depends on exists before it;
+# objects of any other kind (Deployments, custom resources, ...) make up a last tier
+APPLY_TIERS: tuple[frozenset[str], ...] = (
+    frozenset({"CustomResourceDefinition"}),
+    frozenset(
+        {"Namespace", "ClusterRole", "ClusterRoleBinding", "Role", "RoleBinding"}
+    ),
+    frozenset({"ServiceAccount", "ConfigMap", "Secret", "Service"}),
+)
+# max number of objects being applied or deleted at once, across all the manifests
+MAX_CONCURRENT_K8S_CALLS = 8
+# the steps of tearing down an infrastructure, in order; each of them is idempotent
+TEARDOWN_STEPS = ("manifest", "k8s_resources", "experiments", "infrastructure")
+# max number of infrastructures being created, activated or deleted at once
+MAX_CONCURRENT_INFRA_OPERATIONS = 4
+
+
+@functools.cache
+def load_litmus_crds(path: Path) -> tuple[str, list]:
+    """Parse the Litmus CRD manifest, once per process.
+
+    Returns the digest of the manifest and the CRD objects, labelled with that digest.
+    """
+    content = path.read_text()
+    digest = hashlib.sha256(content.encode()).hexdigest()[:CRD_DIGEST_LENGTH]
+    crds = list(load_all_yaml(content))
+    for crd in crds:
+        if crd.metadata is None:
+            raise ValueError(f"CRD without metadata in {path}")
+        crd.metadata.labels = {**(crd.metadata.labels or {}), CRD_DIGEST_LABEL: digest}
+    return digest, crds
+
+
+def _deployments(objs: Iterable[Any]) -> list[list[str]]:
+    """The (namespace, name) of the Deployments among some k8s objects; namespace is "" if unset."""
+    return [
+        [obj.metadata.namespace or "", obj.metadata.name]
+        for obj in objs
+        if isinstance(obj, Deployment) and obj.metadata and obj.metadata.name
+    ]
+
+
+def _kind(obj: Any) -> str:
+    return getattr(obj, "kind", None) or type(obj).__name__
+
+
+def apply_tiers(objs: Iterable[Any]) -> list[list[Any]]:
+    """Group k8s objects into the (non-empty) tiers of APPLY_TIERS, in apply order."""
+    tiers: list[list[Any]] = [[] for _ in range(len(APPLY_TIERS) + 1)]
+    for obj in objs:
+        tier = next(
+            (i for i, kinds in enumerate(APPLY_TIERS) if _kind(obj) in kinds),
+            len(APPLY_TIERS),
+        )
+        tiers[tier].append(obj)
+    return [tier for tier in tiers if tier]
+
+
+class _OutOfTime(Exception):
+    """Raised when the reconcile time budget runs out before a unit of work is done."""
+
+
+@dataclass
+class InfraReconcileSummary:
+    """The outcome of reconciling each infrastructure, keyed by "<action> <name>/<namespace>"."""
+
+    succeeded: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    # units left (or left unfinished) for a later hook, because we ran out of time
+    deferred: list[str] = field(default_factory=list)
+    # whether any unit failed because the Litmus API refused our credentials
+    auth_failed: bool = False
 
 
 class InfraManager:
     """Manages the Chaos Infrastructures in Chaoscenter."""
 
-    def __init__(self, infrastructures: list[InfrastructureDatabagModel]):
-        """Initialize InfraManager."""
+    def __init__(
+        self,
+        infrastructures: list[InfrastructureDatabagModel],
+        applied_manifests: Optional[MutableMapping[str, Any]] = None,
+        teardown_queue: Optional[MutableMapping[str, Any]] = None,
+    ):
+        """Initialize InfraManager.
+
+        applied_manifests maps infra IDs to the manifest last applied for them: its digest, the
+        Deployments it contains, and the manifest revision it was applied at.
+        teardown_queue maps the IDs of the infras being deleted to the teardown steps done so far.
+        Pass persistent mappings to avoid re-applying unchanged manifests, and to resume
+        teardowns, across hooks.
+        """
 
         self._infrastructures = infrastructures
+        self._applied_manifests = (
+            applied_manifests if applied_manifests is not None else {}
+        )
+        self._teardown_queue = teardown_queue if teardown_queue is not None else {}
+        self._manifest_revision = ""
+        self._deadline: Optional[float] = None
         self._k8s_client = Client()
+        self._k8s_executor: Optional[ThreadPoolExecutor] = None
 
-    def reconcile(self, litmus_client: LitmusClient) -> None:
-        """Reconcile the infrastructure with the desired state (relation data)."""
-        project_id = litmus_client.get_default_project_id()
+    def reconcile(
+        self,
+        litmus_client: LitmusClient,
+        snapshot: ProjectSnapshot,
+        deadline: Optional[float] = None,
+        manifest_revision: str = "",
+    ) -> InfraReconcileSummary:
+        """Reconcile the infrastructure with the desired state (relation data).
 
-        actual_infra = {
-            (infra.name, infra.namespace): infra
-            for infra in litmus_client.list_infrastructures(
-                project_id, DEFAULT_ENVIRONMENT
+        A failure to reconcile one infrastructure doesn't stop the others from being reconciled.
+        If a deadline (in time.monotonic() terms) is given, no new unit of work is started past it;
+        the remaining work is picked up by the next reconcile.
+        The manifest of an inactive infrastructure isn't even fetched while the one applied for it
+        is still deployed, unless manifest_revision (e.g. the Litmus version, which the manifests
+        depend on) changed since.
+        """
+        self._deadline = deadline
+        self._manifest_revision = manifest_revision
+        with self._k8s_calls():
+            summary = asyncio.run(
+                self._reconcile(AsyncLitmusClient(litmus_client), snapshot)
+            )
+        if summary.failed:
+            logger.warning(
+                f"reconciled {len(summary.succeeded)} infrastructures, "
+                f"failed {len(summary.failed)}: {summary.failed}"
+            )
+        elif summary.succeeded:
+            logger.info(f"reconciled {len(summary.succeeded)} infrastructures")
+        if summary.deferred:
+            logger.info(
+                f"reconcile time budget exhausted; deferred to a later hook: {summary.deferred}"
             )
+        return summary
+
+    async def _reconcile(
+        self, client: AsyncLitmusClient, snapshot: ProjectSnapshot
+    ) -> InfraReconcileSummary:
+        project_id = snapshot.project_id
+        summary = InfraReconcileSummary()
+
+        actual_infra = {
+            (infra.name, infra.namespace): infra for infra in snapshot.infrastructures
         }
         desired_infra = {
             (infra.infrastructure_name, infra.model_name): infra
@@ -69,86 +223,284 @@ class InfraManager:
         infras_existing = set(actual_infra) & set(desired_infra)
         infras_inactive = {k for k in infras_existing if not actual_infra[k].active}
 
-        for infra_key in infras_to_create:
-            self._create_infra(desired_infra[infra_key], project_id, litmus_client)
+        # forget about teardowns that are done, or no longer wanted
+        ids_to_delete = {actual_infra[k].id for k in infras_to_delete}
+        for infra_id in set(self._teardown_queue) - ids_to_delete:
+            del self._teardown_queue[infra_id]
 
-        for infra_key in infras_inactive:
-            self._activate_infra(actual_infra[infra_key].id, project_id, litmus_client)
+        # run the blocking calls on a pool sized for the work we allow in flight at once
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=MAX_CONCURRENT_INFRA_OPERATIONS)
+        )
 
-        for infra_key in infras_to_delete:
-            self._delete_infra(
-                actual_infra[infra_key].id,
-                actual_infra[infra_key].namespace,
-                project_id,
-                litmus_client,
-            )
+        # the CRDs are shared by all infrastructures, so make sure they're there just once
+        if (infras_to_create or infras_inactive) and not self._out_of_time():
+            await asyncio.to_thread(self._ensure_crds)
 
-    def _create_infra(
-        self, infra: InfrastructureDatabagModel, project_id: str, client: LitmusClient
+        # each infrastructure is independent of the others, so work on a few at a time
+        await client.login()
+        await gather_bounded(
+            [
+                *(
+                    self._isolated(
+                        summary,
+                        f"create {name}/{namespace}",
+                        self._create_infra(
+                            desired_infra[(name, namespace)], project_id, client
+                        ),
+                    )
+                    for name, namespace in infras_to_create
+                ),
+                *(
+                    self._isolated(
+                        summary,
+                        f"activate {name}/{namespace}",
+                        self._activate_infra(
+                            actual_infra[(name, namespace)].id, project_id, client
+                        ),
+                    )
+                    for name, namespace in infras_inactive
+                ),
+                *(
+                    self._isolated(
+                        summary,
+                        f"delete {name}/{namespace}",
+                        self._delete_infra(
+                            actual_infra[(name, namespace)].id,
+                            namespace,
+                            project_id,
+                            client,
+                        ),
+                    )
+                    for name, namespace in infras_to_delete
+                ),
+            ],
+            limit=MAX_CONCURRENT_INFRA_OPERATIONS,
+        )
+        return summary
+
+    def _out_of_time(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    async def _isolated(
+        self, summary: InfraReconcileSummary, label: str, aw: Coroutine[Any, Any, None]
     ) -> None:
-        infra_id = client.register_infrastructure(
+        """Await a unit of work, recording its outcome rather than letting it raise."""
+        try:
+            if self._out_of_time():
+                aw.close()
+                raise _OutOfTime()
+            await aw
+        except _OutOfTime:
+            summary.deferred.append(label)
+        except LitmusAuthError as e:
+            logger.exception(f"failed to {label}")
+            summary.failed[label] = str(e)
+            summary.auth_failed = True
+        except Exception as e:
+            logger.exception(f"failed to {label}")
+            summary.failed[label] = str(e) or type(e).__name__
+        else:
+            summary.succeeded.append(label)
+
+    async def _create_infra(
+        self,
+        infra: InfrastructureDatabagModel,
+        project_id: str,
+        client: AsyncLitmusClient,
+    ) -> None:
+        infra_id = await client.register_infrastructure(
             infra.infrastructure_name, infra.model_name, project_id, DEFAULT_ENVIRONMENT
         )
-        self._activate_infra(infra_id, project_id, client)
+        await self._activate_infra(infra_id, project_id, client)
 
-    def _activate_infra(
-        self, infra_id: str, project_id: str, client: LitmusClient
+    async def _activate_infra(
+        self, infra_id: str, project_id: str, client: AsyncLitmusClient
     ) -> None:
-        manifest = client.get_infrastructure_manifest(infra_id, project_id)
-        if manifest:
-            self._apply_infra_manifest(manifest)
+        # an inactive infra whose manifest was applied and is still deployed is most likely just
+        # a subscriber that's slow to connect: force-applying everything again won't help
+        record = self._applied_manifests.get(infra_id)
+        if (
+            isinstance(record, Mapping)
+            and record.get("revision") == self._manifest_revision
+            and await asyncio.to_thread(self._deployed, record.get("deployments", []))
+        ):
+            logger.debug(
+                f"manifest of infra {infra_id} already applied; skipping fetch"
+            )
+            return
+
+        manifest = await client.get_infrastructure_manifest(infra_id, project_id)
+        if not manifest:
+            return
+
+        digest = hashlib.sha256(manifest.encode()).hexdigest()
+        if (
+            isinstance(record, Mapping)
+            and record.get("digest") == digest
+            and await asyncio.to_thread(self._deployed, record.get("deployments", []))
+        ):
+            logger.debug(f"manifest of infra {infra_id} unchanged; skipping apply")
+            deployments = record["deployments"]
+        else:
+            deployments = await asyncio.to_thread(self._apply_manifest, manifest)
+        self._applied_manifests[infra_id] = {
+            "digest": digest,
+            "revision": self._manifest_revision,
+            "deployments": deployments,
+        }
 
-    def _apply_infra_manifest(self, manifest: str) -> None:
+    def _deployed(self, deployments: Iterable[Iterable[str]]) -> bool:
+        """Cheap drift check: whether all the given (namespace, name) Deployments exist."""
+        for namespace, name in deployments:
+            try:
+                self._k8s_client.get(Deployment, name=name, namespace=namespace or None)
+            except ApiError:
+                return False
+        return True
+
+    def _ensure_crds(self) -> None:
+        """Apply the Litmus CRDs, unless the cluster already has this revision of them."""
         if not LITMUS_CRD_MANIFEST_PATH.exists():
             logger.warning(
                 f"Litmus CRD manifest not found at {LITMUS_CRD_MANIFEST_PATH}; skipping applying CRDs"
             )
-        else:
-            self._apply_manifest(LITMUS_CRD_MANIFEST_PATH.read_text())
-        self._apply_manifest(manifest)
+            return
 
-    def _delete_infra(
+        digest, crds = load_litmus_crds(LITMUS_CRD_MANIFEST_PATH)
+        try:
+            up_to_date = {
+                crd.metadata.name
+                for crd in self._k8s_client.list(
+                    CustomResourceDefinition, labels={CRD_DIGEST_LABEL: digest}
+                )
+                if crd.metadata
+            }
+        except ApiError as e:
+            logger.warning(f"Failed to list the Litmus CRDs, re-applying them: {e}")
+            up_to_date = set()
+
+        outdated = [crd for crd in crds if crd.metadata.name not in up_to_date]
+        if not outdated:
+            logger.debug(f"Litmus CRDs already at revision {digest}; skipping apply")
+            return
+        self._run_tiered("apply", [outdated], self._apply_object)
+
+    async def _delete_infra(
         self,
         infra_id: str,
         infra_namespace: str,
         project_id: str,
-        client: LitmusClient,
+        client: AsyncLitmusClient,
     ) -> None:
+        """Tear down an infrastructure, resuming from the last step done by a previous hook."""
+        entry = self._teardown_queue.get(infra_id) or {}
+        done = list(entry.get("done", []))
 
-        # 1. delete the execution plane components
-        manifest = client.get_infrastructure_manifest(infra_id, project_id)
-        if manifest:
-            self._delete_manifest(manifest)
+        for step in TEARDOWN_STEPS:
+            if step in done:
+                continue
+            if self._out_of_time():
+                raise _OutOfTime()
+            await self._teardown_step(
+                step, infra_id, infra_namespace, project_id, client
+            )
+            done.append(step)
+            # replace the whole entry, so the change is picked up by persistent storage
+            self._teardown_queue[infra_id] = {
+                "namespace": infra_namespace,
+                "done": done,
+            }
 
-        # 2. delete chaos K8s resources in the infra namespace
-        self._delete_chaos_experiments_from_k8s(namespace=infra_namespace)
+        self._teardown_queue.pop(infra_id, None)
+        self._applied_manifests.pop(infra_id, None)
 
-        # 3. delete chaos experiments from the database
-        self._delete_chaos_experiments_from_db(infra_id, project_id, client)
+    async def _teardown_step(
+        self,
+        step: str,
+        infra_id: str,
+        infra_namespace: str,
+        project_id: str,
+        client: AsyncLitmusClient,
+    ) -> None:
+        if step == "manifest":
+            # delete the execution plane components
+            manifest = await client.get_infrastructure_manifest(infra_id, project_id)
+            if manifest:
+                await asyncio.to_thread(self._delete_manifest, manifest)
+        elif step == "k8s_resources":
+            # delete chaos K8s resources in the infra namespace
+            await asyncio.to_thread(
+                self._delete_chaos_experiments_from_k8s, namespace=infra_namespace
+            )
+        elif step == "experiments":
+            # delete chaos experiments from the database
+            await self._delete_chaos_experiments_from_db(infra_id, project_id, client)
+        elif step == "infrastructure":
+            # delete the infrastructure from Chaoscenter
+            await client.delete_infrastructure(infra_id, project_id)
 
-        # 4. delete the infrastructure from Chaoscenter
-        client.delete_infrastructure(infra_id, project_id)
+    def _apply_manifest(self, manifest: str) -> list[list[str]]:
+        """Apply a k8s manifest to the cluster, tier by tier.
 
-    def _apply_manifest(self, manifest: str) -> None:
-        """Apply a k8s manifest to the cluster."""
-        for obj in load_all_yaml(manifest):
-            self._k8s_client.apply(
-                obj, force=True, field_manager="litmus-chaoscenter-charm"
-            )
+        Returns the (namespace, name) of the Deployments in it.
+        """
+        objs = load_all_yaml(manifest)
+        self._run_tiered("apply", apply_tiers(objs), self._apply_object)
+        return _deployments(objs)
 
     def _delete_manifest(self, manifest: str) -> None:
-        """Delete a k8s manifest from the cluster."""
-        for obj in load_all_yaml(manifest):
-            if not obj.metadata or not obj.metadata.name:
-                logger.warning(f"Skipping object with missing metadata or name: {obj}")
-                continue
-            resource = type(obj)
-            name = obj.metadata.name
-            namespace = obj.metadata.namespace
+        """Delete a k8s manifest from the cluster, in the reverse order it was applied."""
+        tiers = apply_tiers(load_all_yaml(manifest))
+        self._run_tiered("delete", tiers[::-1], self._delete_object)
+
+    @contextmanager
+    def _k8s_calls(self) -> Iterator[ThreadPoolExecutor]:
+        """Share a pool between all the manifests applied or deleted meanwhile.
+
+        It bounds the k8s calls in flight as a whole; its threads are only started when needed.
+        """
+        with ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_K8S_CALLS, thread_name_prefix="k8s"
+        ) as executor:
+            self._k8s_executor = executor
             try:
-                self._k8s_client.delete(resource, name=name, namespace=namespace)  # type: ignore[arg-type]
-            except ApiError:
-                logger.warning(f"Failed to delete non-existing object {name}")
+                yield executor
+            finally:
+                self._k8s_executor = None
+
+    def _run_tiered(
+        self, action: str, tiers: list[list[Any]], func: Callable[[Any], None]
+    ) -> None:
+        """Run func on every object, a tier at a time, with the objects of a tier in parallel."""
+        if self._k8s_executor is None:
+            with self._k8s_calls():
+                return self._run_tiered(action, tiers, func)
+        for i, tier in enumerate(tiers):
+            start = time.monotonic()
+            # consume the results, so that a failure stops us before the next tier
+            list(self._k8s_executor.map(func, tier))
+            logger.debug(
+                f"{action}: tier {i + 1}/{len(tiers)} ({len(tier)} objects) "
+                f"done in {time.monotonic() - start:.2f}s"
+            )
+
+    def _apply_object(self, obj: Any) -> None:
+        self._k8s_client.apply(
+            obj, force=True, field_manager="litmus-chaoscenter-charm"
+        )
+
+    def _delete_object(self, obj: Any) -> None:
+        if not obj.metadata or not obj.metadata.name:
+            logger.warning(f"Skipping object with missing metadata or name: {obj}")
+            return
+        resource = type(obj)
+        name = obj.metadata.name
+        namespace = obj.metadata.namespace
+        try:
+            self._k8s_client.delete(resource, name=name, namespace=namespace)  # type: ignore[arg-type]
+        except ApiError:
+            logger.warning(f"Failed to delete non-existing object {name}")
 
     def _delete_chaos_experiments_from_k8s(self, namespace):
         """Deletes all ChaosExperiments, ChaosEngines, and ChaosResults in a namespace."""
@@ -160,14 +512,10 @@ class InfraManager:
                     f"Failed to delete chaos resources in namespace {namespace}"
                 )
 
-    def _delete_chaos_experiments_from_db(
-        self, infra_id: str, project_id: str, client: LitmusClient
+    async def _delete_chaos_experiments_from_db(
+        self, infra_id: str, project_id: str, client: AsyncLitmusClient
     ):
         """Deletes all chaos experiments in the database associated with an infrastructure."""
-        existing_experiments = [
-            experiment
-            for experiment in client.list_experiments(project_id)
-            if experiment.infra_id == infra_id
-        ]
-        for experiment in existing_experiments:
-            client.delete_experiment(project_id=project_id, experiment_id=experiment.id)
+        # collect the IDs before deleting, so deletions don't shift the pages we're reading
+        experiments = await client.list_experiments(project_id, infra_id=infra_id)
+        await client.delete_experiments(project_id, [exp.id for exp in experiments])
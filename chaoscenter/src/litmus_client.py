@@ -4,12 +4,21 @@
 
 """High-level client for interacting with the Litmus API."""
 
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from http.cookiejar import DefaultCookiePolicy
+import json
 import logging
-from typing import Any
+import threading
+import time
+from typing import Any, Awaitable, Iterable, Iterator, MutableMapping, TypeVar
+from urllib.parse import urlparse
 from charmlibs.nginx_k8s import Nginx
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 
 CA_CERT_PATH = Nginx.CA_CERT_PATH
 
@@ -18,12 +27,35 @@ logger = logging.getLogger(__name__)
 DEFAULT_ADMIN_USERNAME = "admin"
 DEFAULT_ADMIN_PASSWORD = "litmus"
 GRAPHQL_QUERIES_PATH = Path(__file__).parent / "graphql"
+# consider cached tokens expired slightly before they actually do, so we don't race the server
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+# what splitting, base64-decoding and JSON-decoding a token that isn't a JWT can raise
+_MALFORMED_TOKEN_ERRORS = (IndexError, KeyError, TypeError, ValueError)
+# max number of keep-alive connections kept open per endpoint by the shared transport
+DEFAULT_POOL_MAXSIZE = 10
+# number of experiments fetched per listExperiment page
+DEFAULT_EXPERIMENTS_PAGE_SIZE = 100
+# max number of experiment deletions in flight at once; kept below the pool size
+DEFAULT_DELETE_CONCURRENCY = 4
+
+# max number of async client operations in flight at once; kept below the pool size
+DEFAULT_ASYNC_CONCURRENCY = 4
+
+_T = TypeVar("_T")
+
+_shared_adapters: dict[tuple[str, str | None], HTTPAdapter] = {}
+_shared_adapters_lock = threading.Lock()
+_thread_sessions = threading.local()
 
 
 class LitmusAPIException(Exception):
     """Custom exception for LitmusClient errors."""
 
 
+class LitmusAuthError(LitmusAPIException):
+    """Raised when the Litmus API refuses our credentials."""
+
+
 @dataclass
 class ChaosEnvironment:
     id: str
@@ -44,6 +76,130 @@ class ChaosExperiment:
     infra_id: str
 
 
+@dataclass
+class ProjectSnapshot:
+    """The state of a Litmus project, as read in a single request."""
+
+    project_id: str
+    environments: list[ChaosEnvironment]
+    infrastructures: list[ChaosInfrastructure]
+
+
+def _token_expiry(token: str) -> float:
+    """Return the expiry (as a unix timestamp) of a JWT, or 0 if it can't be determined."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"])
+    except _MALFORMED_TOKEN_ERRORS:
+        # not a JWT we can make sense of: treat it as already expired
+        return 0.0
+
+
+def _bearer_token(headers: dict[str, str]) -> str:
+    return headers["Authorization"].removeprefix("Bearer ")
+
+
+def _get_shared_adapter(key: tuple[str, str | None], pool_maxsize: int) -> HTTPAdapter:
+    with _shared_adapters_lock:
+        if (adapter := _shared_adapters.get(key)) is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            _shared_adapters[key] = adapter
+    return adapter
+
+
+def get_shared_session(
+    endpoint: str, ca_bundle: str | None, pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+) -> requests.Session:
+    """Return the HTTP session the calling thread uses to talk to an endpoint.
+
+    requests doesn't guarantee that a Session is thread-safe, so each thread gets its own.
+    All of them mount the same transport adapter per endpoint (scheme and host) and CA bundle,
+    whose urllib3 connection pool is thread-safe: all LitmusClient instances, and all the
+    worker threads they fan out to, reuse the same keep-alive connections and pay the TCP
+    (and TLS) handshake to nginx only once per connection.
+    `pool_maxsize` only takes effect when the adapter for an endpoint is first created.
+    """
+    parsed = urlparse(endpoint)
+    key = (f"{parsed.scheme}://{parsed.netloc}", ca_bundle)
+    adapter = _get_shared_adapter(key, pool_maxsize)
+
+    sessions: dict[tuple[str, str | None], requests.Session] | None = getattr(
+        _thread_sessions, "sessions", None
+    )
+    if sessions is None:
+        sessions = _thread_sessions.sessions = {}
+    session = sessions.get(key)
+    # the adapter is replaced once closed: don't keep using the stale one
+    if session is None or session.adapters["http://"] is not adapter:
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # clients authenticate with bearer tokens: don't let cookies leak between the
+        # different users sharing this transport
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        sessions[key] = session
+    return session
+
+
+def close_shared_sessions() -> None:
+    """Close all shared HTTP transports and their pooled connections."""
+    with _shared_adapters_lock:
+        for adapter in _shared_adapters.values():
+            adapter.close()
+        _shared_adapters.clear()
+
+
+class TokenStore:
+    """Keeps Litmus access tokens, and their expiry, across LitmusClient instances.
+
+    The store is backed by a mutable mapping; pass in one that outlives the current hook (for
+    example a StoredState dict) to reuse tokens across hook invocations.
+    Tokens are keyed by endpoint and username, and are only handed out to clients configured
+    with the same revision of the credentials (e.g. of the secret holding them) the token was
+    obtained with. Nothing derived from the passwords themselves is stored.
+    """
+
+    def __init__(self, storage: MutableMapping[str, Any] | None = None):
+        self._storage = storage if storage is not None else {}
+        # earlier revisions of the charm recorded a digest of the password: drop those entries
+        for key in [
+            k for k, entry in self._storage.items() if "password_digest" in entry
+        ]:
+            del self._storage[key]
+
+    @staticmethod
+    def _key(endpoint: str, username: str) -> str:
+        return f"{endpoint}|{username}"
+
+    def get(
+        self, endpoint: str, username: str, credentials_revision: str
+    ) -> str | None:
+        """Return a cached, non-expired token for this revision of the credentials, if any."""
+        entry = self._storage.get(self._key(endpoint, username))
+        if not entry or entry.get("credentials_revision") != credentials_revision:
+            return None
+        if entry["expiry"] - TOKEN_EXPIRY_MARGIN_SECONDS <= time.time():
+            return None
+        return entry["token"]
+
+    def put(
+        self, endpoint: str, username: str, credentials_revision: str, token: str
+    ) -> None:
+        """Cache a freshly obtained token."""
+        self._storage[self._key(endpoint, username)] = {
+            "token": token,
+            "expiry": _token_expiry(token),
+            "credentials_revision": credentials_revision,
+        }
+
+    def invalidate(self, endpoint: str, username: str) -> None:
+        """Drop any cached token for this user."""
+        self._storage.pop(self._key(endpoint, username), None)
+
+
 class LitmusClient:
     """High-level Litmus client using Litmus auth/graphql APIs."""
 
@@ -52,30 +208,62 @@ class LitmusClient:
         endpoint: str,
         username: str = DEFAULT_ADMIN_USERNAME,
         password: str = DEFAULT_ADMIN_PASSWORD,
+        token_store: TokenStore | None = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        credentials_revision: str | None = None,
     ):
+        """Tokens are only cached in token_store if credentials_revision identifies the password."""
         self._endpoint = endpoint.rstrip("/")
         self._username = username
         self._password = password
+        self._credentials_revision = credentials_revision
         self._default_project = f"{username}-project"
 
+        self._token_store = token_store if token_store is not None else TokenStore()
         self._token: str | None = None
+        # the client may be shared by worker threads: only one of them refreshes the token
+        self._token_lock = threading.RLock()
+        self._default_project_id: str | None = None
 
         self._ca_bundle = CA_CERT_PATH if endpoint.startswith("https://") else None
-        self._session = requests.Session()
+        self._pool_maxsize = pool_maxsize
+
+    @property
+    def _session(self) -> requests.Session:
+        # looked up on every call: the client may be used from several threads
+        return get_shared_session(
+            self._endpoint, self._ca_bundle, pool_maxsize=self._pool_maxsize
+        )
 
     def _load_query(self, query_name: str) -> str:
         return (GRAPHQL_QUERIES_PATH / f"{query_name}.graphql").read_text()
 
     def _ensure_token(self) -> None:
-        if self._token is None:
-            self._login()
+        with self._token_lock:
+            if self._token is None and self._credentials_revision is not None:
+                self._token = self._token_store.get(
+                    self._endpoint, self._username, self._credentials_revision
+                )
+            if self._token is None:
+                self._login()
+
+    def _invalidate_token(self, rejected: str | None = None) -> None:
+        """Drop the current token; if `rejected` is given, only if that's still the current one."""
+        with self._token_lock:
+            if rejected is not None and self._token != rejected:
+                # another thread already replaced the rejected token
+                return
+            self._token = None
+            self._token_store.invalidate(self._endpoint, self._username)
 
     def _get_auth_header(self) -> dict[str, str]:
         """Provides the Bearer token header."""
-        self._ensure_token()
+        with self._token_lock:
+            self._ensure_token()
+            token = self._token
 
         return {
-            "Authorization": f"Bearer {self._token}",
+            "Authorization": f"Bearer {token}",
             # Litmus backend middleware fails without a Referer header for some requests
             "Referer": f"{self._endpoint}/",
         }
@@ -84,17 +272,69 @@ class LitmusClient:
         """Internal login to fetch the JWT."""
         url = f"{self._endpoint}/auth/login"
         payload = {"username": self._username, "password": self._password}
-        try:
-            resp = self._session.post(
-                url, json=payload, timeout=10, verify=self._ca_bundle
-            )
-            resp.raise_for_status()
-            self._token = resp.json().get("accessToken")
-        except Exception as e:
-            self._token = None
-            raise LitmusAPIException(
-                f"Failed to login to Litmus API at {self._endpoint}: {e}"
+        with self._token_lock:
+            try:
+                resp = self._session.post(
+                    url, json=payload, timeout=10, verify=self._ca_bundle
+                )
+                resp.raise_for_status()
+                self._token = resp.json().get("accessToken")
+            except requests.HTTPError as e:
+                self._invalidate_token()
+                error_type = (
+                    LitmusAuthError
+                    if e.response is not None and e.response.status_code in (401, 403)
+                    else LitmusAPIException
+                )
+                raise error_type(
+                    f"Failed to login to Litmus API at {self._endpoint}: {e}"
+                )
+            except Exception as e:
+                self._invalidate_token()
+                raise LitmusAPIException(
+                    f"Failed to login to Litmus API at {self._endpoint}: {e}"
+                )
+            if self._token and self._credentials_revision is not None:
+                self._token_store.put(
+                    self._endpoint,
+                    self._username,
+                    self._credentials_revision,
+                    self._token,
+                )
+
+    def _authenticated_request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> requests.Response:
+        """Send a request with the auth header, logging in again once if the token is rejected."""
+        headers = self._get_auth_header()
+        resp = self._session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            timeout=10,
+            verify=self._ca_bundle,
+            **kwargs,
+        )
+        if resp.status_code == 401:
+            # the (possibly cached) token expired or was revoked server-side; concurrent
+            # requests may have had it rejected too, but only the first one logs in again
+            logger.debug("access token for %s was rejected; logging in again", url)
+            self._invalidate_token(rejected=_bearer_token(headers))
+            headers = self._get_auth_header()
+            resp = self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                timeout=10,
+                verify=self._ca_bundle,
+                **kwargs,
             )
+            if resp.status_code == 401:
+                self._invalidate_token(rejected=_bearer_token(headers))
+                raise LitmusAuthError(
+                    f"Litmus API at {self._endpoint} rejected a fresh token for {url}"
+                )
+        return resp
 
     def _execute_rest(
         self, method: str, path: str, payload: dict | None = None
@@ -102,14 +342,7 @@ class LitmusClient:
         """Executes a RESTful request."""
         url = f"{self._endpoint}{path}"
         try:
-            resp = self._session.request(
-                method=method,
-                url=url,
-                headers=self._get_auth_header(),
-                json=payload,
-                timeout=10,
-                verify=self._ca_bundle,
-            )
+            resp = self._authenticated_request(method, url, json=payload)
             resp.raise_for_status()
 
             data = resp.json()
@@ -127,13 +360,7 @@ class LitmusClient:
         url = f"{self._endpoint}/api/query"
         payload = {"query": query, "variables": variables or {}}
         try:
-            resp = self._session.post(
-                url=url,
-                json=payload,
-                headers=self._get_auth_header(),
-                timeout=10,
-                verify=self._ca_bundle,
-            )
+            resp = self._authenticated_request("POST", url, json=payload)
             resp.raise_for_status()
             data = resp.json()
 
@@ -201,7 +428,10 @@ class LitmusClient:
         if not data:
             return []
 
-        infras = data.get("listInfras", {}).get("infras", [])
+        return self._parse_infrastructures(data.get("listInfras"))
+
+    @staticmethod
+    def _parse_infrastructures(data: dict | None) -> list[ChaosInfrastructure]:
         return [
             ChaosInfrastructure(
                 id=infra["infraID"],
@@ -209,7 +439,7 @@ class LitmusClient:
                 namespace=infra["infraNamespace"],
                 active=infra["isActive"],
             )
-            for infra in infras
+            for infra in (data or {}).get("infras") or []
         ]
 
     def get_infrastructure_manifest(self, infra_id: str, project_id: str) -> str | None:
@@ -260,12 +490,13 @@ class LitmusClient:
         if not data:
             return []
 
-        envs = data.get("listEnvironments", {}).get("environments", [])
-        if not envs:
-            return []
+        return self._parse_environments(data.get("listEnvironments"))
 
+    @staticmethod
+    def _parse_environments(data: dict | None) -> list[ChaosEnvironment]:
         return [
-            ChaosEnvironment(id=env["environmentID"], name=env["name"]) for env in envs
+            ChaosEnvironment(id=env["environmentID"], name=env["name"])
+            for env in (data or {}).get("environments") or []
         ]
 
     def create_environment(self, project_id: str, name: str):
@@ -286,10 +517,24 @@ class LitmusClient:
         }
         self._execute_gql(query, variables)
 
+    def is_alive(self) -> bool:
+        """Cheap, unauthenticated liveness probe of the Litmus auth server."""
+        try:
+            resp = self._session.get(
+                f"{self._endpoint}/auth/status", timeout=10, verify=self._ca_bundle
+            )
+        except requests.RequestException as e:
+            logger.debug("liveness probe failed: %s", e)
+            return False
+        return resp.ok
+
     def can_login(self) -> bool:
-        """Try to authenticate and return True if credentials are valid."""
+        """Try to authenticate and return True if credentials are valid.
+
+        A cached, non-expired token obtained with the same credentials counts as a valid login.
+        """
         try:
-            self._login()
+            self._ensure_token()
         except LitmusAPIException:
             return False
         return self._token is not None
@@ -307,8 +552,8 @@ class LitmusClient:
         self._execute_rest("POST", "/auth/update/password", payload=payload)
 
         # Invalidate cached token - must re-login with new password
+        self._invalidate_token()
         self._password = new_password
-        self._token = None
 
     def create_user(
         self, username: str, password: str, name: str = "", email: str = ""
@@ -330,9 +575,7 @@ class LitmusClient:
         """Return True if a user with the given username exists (requires admin privileges)."""
         url = f"{self._endpoint}/auth/users"
         try:
-            resp = self._session.get(
-                url, headers=self._get_auth_header(), timeout=10, verify=self._ca_bundle
-            )
+            resp = self._authenticated_request("GET", url)
             resp.raise_for_status()
             users = resp.json()
             if isinstance(users, list):
@@ -346,33 +589,85 @@ class LitmusClient:
     def get_default_project_id(self) -> str:
         """Get the default project ID for the current user.
 
+        The ID is looked up once per client instance.
         Raises LitmusAPIException on failure.
         """
+        if self._default_project_id is not None:
+            return self._default_project_id
+
         data = self._execute_rest("GET", "/auth/list_projects")
         for project in data.get("projects", []):
-            if project.get("name") == self._default_project:
-                return project.get("projectID")
+            if project.get("name") != self._default_project:
+                continue
+            if not (project_id := project.get("projectID")):
+                raise LitmusAPIException(
+                    f"Default project '{self._default_project}' has no ID"
+                )
+            self._default_project_id = project_id
+            return project_id
 
         raise LitmusAPIException(
             f"Default project '{self._default_project}' not found for user '{self._username}'"
         )
 
-    def list_experiments(self, project_id: str) -> list[ChaosExperiment]:
-        """List all chaos experiments in a given project.
+    def list_experiments(
+        self,
+        project_id: str,
+        infra_id: str | None = None,
+        page_size: int = DEFAULT_EXPERIMENTS_PAGE_SIZE,
+    ) -> Iterator[ChaosExperiment]:
+        """Iterate over the chaos experiments in a given project, one page at a time.
 
+        If infra_id is given, only the experiments of that infrastructure are
+        requested from the server.
         Raises LitmusAPIException on failure.
         """
         query = self._load_query("list_experiments")
+        request: dict[str, Any] = {"pagination": {"page": 0, "limit": page_size}}
+        if infra_id is not None:
+            request["filter"] = {"infraID": infra_id}
+
+        fetched = 0
+        while True:
+            variables = {"projectID": project_id, "request": request}
+            data = (self._execute_gql(query, variables) or {}).get("listExperiment")
+            experiments = self._parse_experiments(data)
+            yield from experiments
+
+            fetched += len(experiments)
+            total = (data or {}).get("totalNoOfExperiments")
+            if len(experiments) < page_size or (total is not None and fetched >= total):
+                return
+            request["pagination"]["page"] += 1
+
+    @staticmethod
+    def _parse_experiments(data: dict | None) -> list[ChaosExperiment]:
+        return [
+            ChaosExperiment(id=exp["experimentID"], infra_id=exp["infra"]["infraID"])
+            for exp in (data or {}).get("experiments") or []
+        ]
+
+    def get_project_snapshot(
+        self, project_id: str, environment_id: str
+    ) -> ProjectSnapshot:
+        """Read the environments, and the infrastructures in an environment, of a project.
+
+        Both lists are fetched with a single (batched) GraphQL request.
+        Raises LitmusAPIException on failure.
+        """
+        query = self._load_query("get_project_snapshot")
         variables = {
             "projectID": project_id,
-            "request": {},
+            "environmentsRequest": {"environmentIDs": []},
+            "infrasRequest": {"environmentIDs": [environment_id]},
         }
 
-        data = self._execute_gql(query, variables)
-        return [
-            ChaosExperiment(id=exp["experimentID"], infra_id=exp["infra"]["infraID"])
-            for exp in data.get("listExperiment", {}).get("experiments", [])
-        ]
+        data = self._execute_gql(query, variables) or {}
+        return ProjectSnapshot(
+            project_id=project_id,
+            environments=self._parse_environments(data.get("environments")),
+            infrastructures=self._parse_infrastructures(data.get("infrastructures")),
+        )
 
     def delete_experiment(self, project_id: str, experiment_id: str) -> None:
         """Delete a chaos experiment in a given project by ID.
@@ -386,3 +681,148 @@ class LitmusClient:
         }
 
         self._execute_gql(query, variables)
+
+    def delete_experiments(
+        self,
+        project_id: str,
+        experiment_ids: Iterable[str],
+        max_workers: int = DEFAULT_DELETE_CONCURRENCY,
+    ) -> None:
+        """Delete several chaos experiments in a given project, a few at a time.
+
+        Every deletion is attempted even if some of them fail.
+        Raises LitmusAPIException if any deletion failed.
+        """
+        experiment_ids = list(experiment_ids)
+        if not experiment_ids:
+            return
+
+        # log in once up front, so the workers don't race each other to get a token
+        self._ensure_token()
+        failures: list[str] = []
+
+        def _delete(experiment_id: str) -> None:
+            try:
+                self.delete_experiment(project_id, experiment_id)
+            except LitmusAPIException as e:
+                logger.error("failed to delete experiment %s: %s", experiment_id, e)
+                failures.append(experiment_id)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            list(executor.map(_delete, experiment_ids))
+
+        if failures:
+            raise LitmusAPIException(
+                f"Failed to delete {len(failures)} of {len(experiment_ids)} experiments: {failures}"
+            )
+
+
+async def gather_bounded(
+    aws: Iterable[Awaitable[_T]], limit: int = DEFAULT_ASYNC_CONCURRENCY
+) -> list[_T]:
+    """Like asyncio.gather, but with at most `limit` awaitables running at once."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _bounded(aw: Awaitable[_T]) -> _T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_bounded(aw) for aw in aws))
+
+
+class AsyncLitmusClient:
+    """Asyncio interface to a LitmusClient, with the same API surface.
+
+    Each call runs the wrapped client in a worker thread, over its shared
+    keep-alive transport, so independent calls can be in flight at once.
+    """
+
+    def __init__(self, client: LitmusClient):
+        self._client = client
+
+    @property
+    def sync_client(self) -> LitmusClient:
+        """The wrapped synchronous client."""
+        return self._client
+
+    async def login(self) -> None:
+        """Make sure the client holds a token, so concurrent calls don't all log in at once."""
+        await asyncio.to_thread(self._client._ensure_token)
+
+    async def get_default_project_id(self) -> str:
+        return await asyncio.to_thread(self._client.get_default_project_id)
+
+    async def get_project_snapshot(
+        self, project_id: str, environment_id: str
+    ) -> ProjectSnapshot:
+        return await asyncio.to_thread(
+            self._client.get_project_snapshot, project_id, environment_id
+        )
+
+    async def register_infrastructure(
+        self, infra_name: str, namespace: str, project_id: str, environment_id: str
+    ) -> str:
+        return await asyncio.to_thread(
+            self._client.register_infrastructure,
+            infra_name,
+            namespace,
+            project_id,
+            environment_id,
+        )
+
+    async def list_infrastructures(
+        self, project_id: str, environment_id: str
+    ) -> list[ChaosInfrastructure]:
+        return await asyncio.to_thread(
+            self._client.list_infrastructures, project_id, environment_id
+        )
+
+    async def get_infrastructure_manifest(
+        self, infra_id: str, project_id: str
+    ) -> str | None:
+        return await asyncio.to_thread(
+            self._client.get_infrastructure_manifest, infra_id, project_id
+        )
+
+    async def delete_infrastructure(self, infra_id: str, project_id: str) -> None:
+        await asyncio.to_thread(
+            self._client.delete_infrastructure, infra_id, project_id
+        )
+
+    async def list_environments(self, project_id: str) -> list[ChaosEnvironment]:
+        return await asyncio.to_thread(self._client.list_environments, project_id)
+
+    async def create_environment(self, project_id: str, name: str) -> None:
+        await asyncio.to_thread(self._client.create_environment, project_id, name)
+
+    async def list_experiments(
+        self,
+        project_id: str,
+        infra_id: str | None = None,
+        page_size: int = DEFAULT_EXPERIMENTS_PAGE_SIZE,
+    ) -> list[ChaosExperiment]:
+        return await asyncio.to_thread(
+            lambda: list(
+                self._client.list_experiments(
+                    project_id, infra_id=infra_id, page_size=page_size
+                )
+            )
+        )
+
+    async def delete_experiment(self, project_id: str, experiment_id: str) -> None:
+        await asyncio.to_thread(
+            self._client.delete_experiment, project_id, experiment_id
+        )
+
+    async def delete_experiments(
+        self,
+        project_id: str,
+        experiment_ids: Iterable[str],
+        max_workers: int = DEFAULT_DELETE_CONCURRENCY,
+    ) -> None:
+        await asyncio.to_thread(
+            self._client.delete_experiments,
+            project_id,
+            list(experiment_ids),
+            max_workers,
+        )
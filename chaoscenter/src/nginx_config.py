@@ -5,7 +5,10 @@
 """Helper methods for creating Nginx configuration for Litmus."""
 
 import logging
-from typing import Dict, List, Optional, Set
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
 
 from charmlibs.nginx_k8s import (
     Nginx,
@@ -15,6 +18,7 @@ from charmlibs.nginx_k8s import (
     NginxTracingConfig,
     NginxUpstream,
 )
+from litmus_libs import ResourceLimits
 from urllib.parse import urlparse, ParseResult
 
 CERT_PATH = Nginx.CERT_PATH
@@ -36,6 +40,139 @@ upgrade_to_websocket_map_config = NginxMapConfig(
         "": ["close"],
     },
 )
+# with upstream keepalive, non-websocket requests must clear the Connection header instead
+# of closing the connection, so that it can go back to the pool
+# Ref: https://nginx.org/en/docs/http/ngx_http_upstream_module.html#keepalive
+upgrade_to_websocket_keepalive_map_config = NginxMapConfig(
+    source_variable="$http_upgrade",
+    target_variable="$connection_upgrade",
+    value_mappings={
+        "default": ["upgrade"],
+        "": [""],
+    },
+)
+
+# build artifacts whose name carries a hash of their content (e.g. main.3f2a9c1b.js) never change
+# under the same URL, so browsers can cache them forever; /api and /auth are never static files
+hashed_asset_path_regex = r"^/(?!api/|auth/).+[.-][0-9a-f]{8,}\.(?:js|mjs|css|map|woff2?|ttf|eot|svg|png|jpe?g|gif|webp|ico)$"
+# serve the precompressed <file>.gz shipped next to a static file if there is one, and compress
+# on the fly otherwise. The nginx in the workload image has no brotli module, so it's gzip only
+static_files_compression_directives = {
+    "gzip": ["on"],
+    "gzip_static": ["on"],
+    "gzip_vary": ["on"],
+    "gzip_comp_level": ["5"],
+    "gzip_min_length": ["1024"],
+    "gzip_types": [
+        "text/css",
+        "text/plain",
+        "application/javascript",
+        "application/json",
+        "image/svg+xml",
+    ],
+}
+# keep file descriptors and metadata of the static files nginx serves most
+static_files_cache_directives = {
+    "open_file_cache": ["max=1000", "inactive=60s"],
+    "open_file_cache_valid": ["120s"],
+    "open_file_cache_min_uses": ["2"],
+    "open_file_cache_errors": ["on"],
+}
+
+
+@dataclass(frozen=True)
+class UpstreamKeepalive:
+    """Pool of idle connections each nginx worker keeps open to each upstream."""
+
+    connections: int = 32
+    """Max idle connections per worker and upstream; 0 disables the pool."""
+    timeout: int = 60
+    """Seconds an idle connection stays in the pool."""
+    requests: int = 1000
+    """Requests served over a connection before it's closed."""
+
+
+@dataclass(frozen=True)
+class WorkerSettings:
+    """Sizing of the nginx worker processes and of their proxy buffers."""
+
+    processes: int = 5
+    connections: int = 4096
+    """Max simultaneous connections per worker, client and upstream ones alike."""
+    proxy_buffer_size_kib: int = 8
+    """Size of the buffer for response headers, and of each response body buffer."""
+    proxy_buffers: int = 8
+    """Number of response body buffers per proxied request."""
+
+
+MIN_WORKER_CONNECTIONS = 1024
+MAX_WORKER_CONNECTIONS = 65536
+
+
+def worker_settings(
+    limits: ResourceLimits, processes: int = 0, connections: int = 0
+) -> WorkerSettings:
+    """Size the nginx workers to the container's resource limits.
+
+    One worker per (started) CPU. Connections are sized so that, with every worker full,
+    half of the memory goes to connection buffers: an upgraded (websocket) connection holds
+    one proxy buffer per direction, so each connection costs about a buffer plus bookkeeping.
+    Non-zero processes/connections override the computed values; without limits,
+    the nginx library defaults apply.
+    """
+    defaults = WorkerSettings()
+    buffer_kib = (
+        4
+        if limits.memory is not None and limits.memory < 256 * 1024**2
+        else defaults.proxy_buffer_size_kib
+    )
+    if not processes:
+        processes = max(1, math.ceil(limits.cpu)) if limits.cpu else defaults.processes
+    if not connections:
+        if limits.memory is None:
+            connections = defaults.connections
+        else:
+            per_connection = (buffer_kib + 1) * 1024
+            connections = (limits.memory // 2) // (processes * per_connection)
+            connections = min(
+                max(connections, MIN_WORKER_CONNECTIONS), MAX_WORKER_CONNECTIONS
+            )
+    return WorkerSettings(
+        processes=processes,
+        connections=connections,
+        proxy_buffer_size_kib=buffer_kib,
+        proxy_buffers=defaults.proxy_buffers,
+    )
+
+
+# charmlibs-nginx-k8s can't render these directives itself, so they're added to its output
+_http_block_regex = re.compile(r"^(?P<indent> *)http \{\n", re.MULTILINE)
+# an upstream block, up to (excluded) its closing brace: the lines indented deeper than it
+_upstream_block_regex = re.compile(
+    r"^(?P<indent> *)upstream [^\n]*\{\n(?:(?P=indent) +[^\n]*\n)*", re.MULTILINE
+)
+
+
+def _with_http2(config: str) -> str:
+    """Serve HTTP/2 from all the servers of a rendered config."""
+    return _http_block_regex.sub(
+        lambda m: f"{m.group(0)}{m.group('indent')}    http2 on;\n", config, count=1
+    )
+
+
+def _with_upstream_keepalive(config: str, keepalive: UpstreamKeepalive) -> str:
+    """Keep pools of idle connections to all the upstreams of a rendered config."""
+
+    def add_keepalive(match: "re.Match[str]") -> str:
+        indent = f"{match.group('indent')}    "
+        return (
+            f"{match.group(0)}"
+            f"{indent}keepalive {keepalive.connections};\n"
+            f"{indent}keepalive_timeout {keepalive.timeout}s;\n"
+            f"{indent}keepalive_requests {keepalive.requests};\n"
+        )
+
+    return _upstream_block_regex.sub(add_keepalive, config)
 
 
 def get_config(
@@ -44,6 +181,9 @@ def get_config(
     backend_url: str,
     tls_available: bool = False,
     tracing_config: Optional[NginxTracingConfig] = None,
+    keepalive: Optional[UpstreamKeepalive] = None,
+    workers: Optional[WorkerSettings] = None,
+    http2: bool = False,
 ) -> str:
     if not hostname or not auth_url or not backend_url:
         raise ValueError(
@@ -57,22 +197,41 @@ def get_config(
     backend_scheme = _get_scheme_from_url(backend_parsed_url)
     backend_port = _get_port_from_url(backend_parsed_url)
 
-    config = NginxConfig(
+    keepalive = keepalive if keepalive and keepalive.connections > 0 else None
+    workers = workers or WorkerSettings()
+    config_kwargs: Dict[str, Any] = dict(
         server_name=hostname,
         upstream_configs=_upstreams(auth_port, backend_port),
         server_ports_to_locations=_server_ports_to_locations(
             auth_scheme=auth_scheme,
             backend_scheme=backend_scheme,
+            keepalive=keepalive is not None,
+            workers=workers,
         ),
-        map_configs=[upgrade_to_websocket_map_config],
         enable_status_page=False,
+        # worker_rlimit_nofile follows: two file descriptors per connection
+        worker_processes=workers.processes,
+        worker_connections=workers.connections,
     )
-    return config.get_config(
+    config = NginxConfig(
+        map_configs=[
+            upgrade_to_websocket_keepalive_map_config
+            if keepalive
+            else upgrade_to_websocket_map_config
+        ],
+        **config_kwargs,
+    ).get_config(
         _upstreams_to_addresses(auth_parsed_url.hostname, backend_parsed_url.hostname),  # type: ignore[arg-type]
         listen_tls=tls_available,
         root_path="/dist",
         tracing_config=tracing_config,
     )
+    # browsers (and Traefik) only negotiate HTTP/2 over TLS, through ALPN
+    if http2 and tls_available:
+        config = _with_http2(config)
+    if keepalive:
+        config = _with_upstream_keepalive(config, keepalive)
+    return config
 
 
 def _get_scheme_from_url(url: ParseResult) -> str:
@@ -92,24 +251,47 @@ def _get_port_from_url(url: ParseResult) -> int:
 def _server_ports_to_locations(
     auth_scheme: str,
     backend_scheme: str,
+    keepalive: bool = False,
+    workers: Optional[WorkerSettings] = None,
 ) -> Dict[int, List[NginxLocationConfig]]:
     """Generate a mapping from server ports to a list of Nginx location configurations."""
 
     return {
-        http_server_port: _generate_http_locations(auth_scheme, backend_scheme),
+        http_server_port: _generate_http_locations(
+            auth_scheme, backend_scheme, keepalive, workers
+        ),
     }
 
 
 def _generate_http_locations(
-    auth_scheme: str, backend_scheme: str
+    auth_scheme: str,
+    backend_scheme: str,
+    keepalive: bool = False,
+    workers: Optional[WorkerSettings] = None,
 ) -> List[NginxLocationConfig]:
+    workers = workers or WorkerSettings()
     return [
         NginxLocationConfig(
             path="/",
             extra_directives={
+                # index.html points to the current hashed assets: always revalidate it
                 "add_header": ["Cache-Control", "no-cache"],
                 "try_files": ["$uri", "/index.html"],
                 "autoindex": ["on"],
+                **static_files_compression_directives,
+                **static_files_cache_directives,
+            },
+        ),
+        NginxLocationConfig(
+            path=hashed_asset_path_regex,
+            modifier="~",
+            extra_directives={
+                "add_header": ["Cache-Control", "public, max-age=31536000, immutable"],
+                # a missing asset is a 404, not the UI
+                "try_files": ["$uri", "=404"],
+                "access_log": ["off"],
+                **static_files_compression_directives,
+                **static_files_cache_directives,
             },
         ),
         # this location will be used by pebble checks to verify that nginx is alive
@@ -127,7 +309,9 @@ def _generate_http_locations(
             backend="auth",
             rewrite=["^/auth(/.*)$", "$1", "break"],
             upstream_tls=True if auth_scheme == "https" else False,
-            extra_directives=_extra_directives(auth_scheme),
+            # keep the upstream connection open, whatever the client asked for
+            headers={"Connection": ""} if keepalive else {},
+            extra_directives=_extra_directives(auth_scheme, keepalive, workers),
         ),
         NginxLocationConfig(
             path="/api",
@@ -137,7 +321,7 @@ def _generate_http_locations(
             # Ref: https://nginx.org/en/docs/http/websocket.html
             headers={"Upgrade": "$http_upgrade", "Connection": "$connection_upgrade"},
             upstream_tls=True if backend_scheme == "https" else False,
-            extra_directives=_extra_directives(backend_scheme),
+            extra_directives=_extra_directives(backend_scheme, keepalive, workers),
         ),
         NginxLocationConfig(
             path="/status",
@@ -146,15 +330,29 @@ def _generate_http_locations(
     ]
 
 
-def _extra_directives(scheme: str) -> Dict[str, List[str]]:
+def _extra_directives(
+    scheme: str, keepalive: bool = False, workers: Optional[WorkerSettings] = None
+) -> Dict[str, List[str]]:
+    workers = workers or WorkerSettings()
+    buffer_size = f"{workers.proxy_buffer_size_kib}k"
+    directives: Dict[str, List[str]] = {
+        "proxy_buffer_size": [buffer_size],
+        "proxy_buffers": [str(workers.proxy_buffers), buffer_size],
+        "proxy_busy_buffers_size": [f"{2 * workers.proxy_buffer_size_kib}k"],
+    }
+    if keepalive:
+        # upstream keepalive requires HTTP/1.1; nginx speaks HTTP/1.0 to upstreams by default
+        directives["proxy_http_version"] = ["1.1"]
     if scheme == "https":
-        return {
-            "proxy_ssl_verify": ["off"],
-            "proxy_ssl_session_reuse": ["on"],
-            "proxy_ssl_certificate": [CERT_PATH],
-            "proxy_ssl_certificate_key": [KEY_PATH],
-        }
-    return {}
+        directives.update(
+            {
+                "proxy_ssl_verify": ["off"],
+                "proxy_ssl_session_reuse": ["on"],
+                "proxy_ssl_certificate": [CERT_PATH],
+                "proxy_ssl_certificate_key": [KEY_PATH],
+            }
+        )
+    return directives
 
 
 def _upstreams_to_addresses(auth_url: str, backend_url: str) -> Dict[str, Set[str]]:
@@ -0,0 +1,129 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Nginx workload management that skips work whose inputs didn't change."""
+
+import dataclasses
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Mapping, MutableMapping, Optional
+
+import ops
+from charmlibs.nginx_k8s import Nginx, TLSConfig
+from opentelemetry import trace
+from ops import pebble
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class NginxMetrics:
+    """What a reconcile actually had to do."""
+
+    renders: int = 0
+    pushes: int = 0
+    reloads: int = 0
+    certificate_writes: int = 0
+
+
+def _digest(value: Any) -> str:
+    def _default(obj: Any) -> Any:
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return dataclasses.asdict(obj)
+        return str(obj)
+
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=_default).encode()
+    ).hexdigest()
+
+
+class CachedNginx(Nginx):
+    """Nginx that only renders its config, and reconciles it with the certificates, when needed.
+
+    Digests of the config inputs, of the rendered config and of the TLS material last applied
+    are kept in ``state``; pass a persistent mapping to carry them across hooks.
+    If the nginx service isn't running (e.g. the workload container was restarted), or the CA
+    certificate is missing from the charm container (e.g. the charm container was restarted),
+    everything is applied again regardless.
+    """
+
+    def __init__(
+        self,
+        container: ops.Container,
+        state: Optional[MutableMapping[str, str]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(container, **kwargs)
+        self._state = state if state is not None else {}
+        self.metrics = NginxMetrics()
+
+    def reconcile_if_changed(
+        self,
+        inputs: Mapping[str, Any],
+        render: Callable[[], str],
+        tls_config: Optional[TLSConfig] = None,
+    ) -> None:
+        """Render the config from ``inputs`` and apply it, and ``tls_config``, unless already applied."""
+        if not self._container.can_connect():
+            return
+
+        tls_digest = _digest(dataclasses.asdict(tls_config) if tls_config else None)
+        # the CA certificate is also written to the charm container, which doesn't keep it
+        # across restarts
+        ca_cert_missing = (
+            tls_config is not None and not Path(self.CA_CERT_PATH).exists()
+        )
+        tls_changed = (
+            not self._is_running()
+            or ca_cert_missing
+            or tls_digest != self._state.get("tls_digest")
+        )
+        inputs_digest = _digest(dict(inputs))
+        if not tls_changed and inputs_digest == self._state.get("inputs_digest"):
+            logger.debug("nginx config inputs unchanged; nothing to do")
+            self._report()
+            return
+
+        config = render()
+        self.metrics.renders += 1
+        config_digest = _digest(config)
+        if tls_changed or config_digest != self._state.get("config_digest"):
+            # Nginx reloads whenever the config on disk differs
+            if self._config_on_disk() != config:
+                self.metrics.reloads += 1
+            self.reconcile(config, tls_config)
+            self.metrics.pushes += 1
+            if tls_changed:
+                self.metrics.certificate_writes += 1
+            self._state["tls_digest"] = tls_digest
+        else:
+            logger.debug("rendered nginx config unchanged; nothing to do")
+        self._state["inputs_digest"] = inputs_digest
+        self._state["config_digest"] = config_digest
+        self._report()
+
+    def _config_on_disk(self) -> Optional[str]:
+        try:
+            return self._container.pull(self.NGINX_CONFIG).read()
+        except pebble.PathError:
+            return None
+        except pebble.ProtocolError:
+            return None
+
+    def _is_running(self) -> bool:
+        try:
+            services = self._container.get_services(self._service_name)
+        except ops.ModelError:
+            return False
+        except pebble.Error:
+            return False
+        service = services.get(self._service_name)
+        return service is not None and service.is_running()
+
+    def _report(self) -> None:
+        logger.debug("nginx reconcile: %s", self.metrics)
+        span = trace.get_current_span()
+        for name, value in dataclasses.asdict(self.metrics).items():
+            span.set_attribute(f"nginx.{name}", value)
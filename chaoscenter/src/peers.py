@@ -0,0 +1,99 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+"""Peer relation wrapper.
+
+Used by the leader to share the outcome of its Litmus reconcile, and by every unit to share its
+address, so that the leader can balance the ingressed traffic over all units.
+"""
+
+import logging
+from typing import List, Optional
+
+import ops
+import pydantic
+
+from infra_manager import InfraReconcileSummary
+
+logger = logging.getLogger(__name__)
+
+PEERS_ENDPOINT = "chaoscenter-peers"
+
+
+class ReconcileResult(pydantic.BaseModel):
+    """Outcome of the leader's last reconcile against the Litmus API."""
+
+    failed_infrastructures: list[str] = []
+    deferred_infrastructures: list[str] = []
+
+    @classmethod
+    def from_summary(cls, summary: InfraReconcileSummary) -> "ReconcileResult":
+        return cls(
+            failed_infrastructures=sorted(summary.failed),
+            deferred_infrastructures=sorted(summary.deferred),
+        )
+
+
+class ChaoscenterPeers:
+    """Wraps the chaoscenter peer relation."""
+
+    def __init__(
+        self,
+        relation: Optional[ops.Relation],
+        app: ops.Application,
+        unit: Optional[ops.Unit] = None,
+    ):
+        self._relation = relation
+        self._app = app
+        self._unit = unit
+
+    def publish_address(self, address: str) -> None:
+        """Publish this unit's address to its peer unit databag."""
+        if self._relation is None or self._unit is None:
+            return
+        if self._relation.data[self._unit].get("address") == address:
+            return
+        try:
+            # a plain string: the unit databag also holds Juju's own, non-JSON, keys
+            self._relation.data[self._unit]["address"] = address
+        except ops.ModelError:
+            logger.debug(
+                "failed to publish unit address to %s; is the relation still being created?",
+                self._relation,
+            )
+
+    @property
+    def addresses(self) -> List[str]:
+        """The addresses of all the units that published one, this one included, sorted."""
+        if self._relation is None:
+            return []
+        units = {*self._relation.units, *([self._unit] if self._unit else [])}
+        return sorted(
+            {
+                address
+                for unit in units
+                if (address := self._relation.data[unit].get("address"))
+            }
+        )
+
+    def publish_result(self, result: ReconcileResult) -> None:
+        """Publish the outcome of a reconcile to the peer application databag (leader only)."""
+        if self._relation is None:
+            return
+        try:
+            self._relation.save(result, self._app)
+        except ops.ModelError:
+            logger.debug(
+                "failed to publish reconcile result to %s; is the relation still being created?",
+                self._relation,
+            )
+
+    @property
+    def result(self) -> Optional[ReconcileResult]:
+        """The outcome of the leader's last reconcile, if it published one."""
+        if self._relation is None or not self._relation.data.get(self._app):
+            return None
+        try:
+            return self._relation.load(ReconcileResult, self._app)
+        except pydantic.ValidationError:
+            logger.warning("invalid reconcile result in the peer relation databag")
+            return None
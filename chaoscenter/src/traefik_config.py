@@ -1,10 +1,31 @@
 from collections import namedtuple
+from dataclasses import dataclass
 import socket
-from typing import Dict, Sequence
+from typing import Any, Dict, List, Optional, Sequence
 
 
 EntryPoint = namedtuple("Port", "name, port")
 
+# Traefik's load balancing strategies: weighted round robin, and power of two choices
+LOAD_BALANCING_STRATEGIES = ("wrr", "p2c")
+DEFAULT_LOAD_BALANCING_STRATEGY = "wrr"
+STICKY_SESSION_COOKIE = "litmus_chaoscenter_server"
+HEALTH_CHECK_PATH = "/health"
+# requests that can safely be sent again if the server didn't answer
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@dataclass(frozen=True)
+class Middlewares:
+    """Traefik middlewares applied to the requests routed to the ChaosCenter."""
+
+    # compress responses that aren't already
+    compress: bool = True
+    # times an idempotent request is retried on another unit if a unit doesn't answer; 0 to disable
+    retry_attempts: int = 0
+    # maximum simultaneous requests forwarded to the ChaosCenter; 0 for no limit
+    max_inflight_requests: int = 0
+
 
 def entrypoints() -> Sequence[EntryPoint]:
     return (EntryPoint("litmus-chaoscenter", 8185),)
@@ -18,30 +39,127 @@ def static_ingress_config() -> dict:
     return {"entryPoints": entry_points}
 
 
-def _build_lb_server_config(scheme: str, port: int) -> Dict[str, str]:
+def _build_lb_server_config(scheme: str, port: int, host: str) -> Dict[str, str]:
     """Build the server portion of the loadbalancer config of Traefik ingress."""
-    return {"url": f"{scheme}://{socket.getfqdn()}:{port}"}
+    return {"url": f"{scheme}://{host}:{port}"}
+
+
+def _build_load_balancer_config(
+    scheme: str,
+    port: int,
+    hosts: Sequence[str],
+    strategy: str,
+    sticky: bool,
+) -> Dict[str, Any]:
+    """Build the loadbalancer config of Traefik ingress, spreading traffic over all ``hosts``."""
+    config: Dict[str, Any] = {
+        "servers": [
+            _build_lb_server_config(scheme, port, host) for host in sorted(set(hosts))
+        ],
+        # take units whose nginx doesn't answer out of the rotation
+        "healthCheck": {
+            "path": HEALTH_CHECK_PATH,
+            "interval": "10s",
+            "timeout": "3s",
+        },
+    }
+    # only set when needed: Traefik versions older than v3.4 don't know the option
+    if strategy != DEFAULT_LOAD_BALANCING_STRATEGY:
+        config["strategy"] = strategy
+    if sticky:
+        # keep each browser, and its websocket subscriptions, on the same unit
+        config["sticky"] = {
+            "cookie": {
+                "name": STICKY_SESSION_COOKIE,
+                "secure": scheme == "https",
+                "httpOnly": True,
+                "sameSite": "lax",
+            }
+        }
+    return config
 
 
-def ingress_config(model_name: str, app_name: str, tls: bool) -> dict:
-    """Build a raw ingress configuration for Traefik."""
+def _build_middlewares_config(prefix: str, middlewares: Middlewares) -> Dict[str, Any]:
+    """Build the Traefik middlewares to apply to all requests, by name."""
+    config: Dict[str, Any] = {}
+    if middlewares.max_inflight_requests > 0:
+        config[f"{prefix}-inflight"] = {
+            "inFlightReq": {"amount": middlewares.max_inflight_requests}
+        }
+    if middlewares.compress:
+        # responses nginx already compressed are passed through as they are
+        config[f"{prefix}-compress"] = {
+            "compress": {"excludedContentTypes": ["text/event-stream"]}
+        }
+    return config
+
+
+def ingress_config(
+    model_name: str,
+    app_name: str,
+    tls: bool,
+    hosts: Optional[Sequence[str]] = None,
+    strategy: str = DEFAULT_LOAD_BALANCING_STRATEGY,
+    sticky: bool = False,
+    middlewares: Optional[Middlewares] = None,
+) -> dict:
+    """Build a raw ingress configuration for Traefik.
+
+    Traffic is balanced over ``hosts``, the addresses of all chaoscenter units;
+    by default, only this unit's.
+    If ``middlewares.retry_attempts`` is set, idempotent requests are routed through a separate
+    router, that retries them.
+    """
+    if strategy not in LOAD_BALANCING_STRATEGIES:
+        raise ValueError(
+            f"invalid load balancing strategy {strategy!r}; "
+            f"expected one of {', '.join(LOAD_BALANCING_STRATEGIES)}"
+        )
+    hosts = hosts or [socket.getfqdn()]
+    middlewares = middlewares or Middlewares()
     http_routers = {}
     http_services = {}
+    http_middlewares: Dict[str, Any] = {}
     for name, port in entrypoints():
-        http_routers[f"juju-{model_name}-{app_name}-{name}"] = {
+        prefix = f"juju-{model_name}-{app_name}-{name}"
+        router_middlewares = _build_middlewares_config(prefix, middlewares)
+        http_middlewares.update(router_middlewares)
+        rule = "ClientIP(`0.0.0.0/0`)"
+        router = {
             "entryPoints": [name],
             "service": f"juju-{model_name}-{app_name}-service-{name}",
-            "rule": "ClientIP(`0.0.0.0/0`)",
+            "rule": rule,
         }
+        if router_middlewares:
+            router["middlewares"] = list(router_middlewares)
+        http_routers[prefix] = router
+        if middlewares.retry_attempts > 0:
+            retry_middlewares: List[str] = [*router_middlewares, f"{prefix}-retry"]
+            http_middlewares[f"{prefix}-retry"] = {
+                "retry": {
+                    "attempts": middlewares.retry_attempts,
+                    "initialInterval": "100ms",
+                }
+            }
+            methods = " || ".join(
+                f"Method(`{method}`)" for method in IDEMPOTENT_METHODS
+            )
+            http_routers[f"{prefix}-idempotent"] = {
+                **router,
+                # Traefik prefers the router with the longest rule, i.e. this one
+                "rule": f"{rule} && ({methods})",
+                "middlewares": retry_middlewares,
+            }
         # ref https://doc.traefik.io/traefik/v2.0/user-guides/grpc/#with-https
         http_services[f"juju-{model_name}-{app_name}-service-{name}"] = {
-            "loadBalancer": {
-                "servers": [_build_lb_server_config("https" if tls else "http", port)]
-            }
+            "loadBalancer": _build_load_balancer_config(
+                "https" if tls else "http", port, hosts, strategy, sticky
+            )
         }
-    return {
-        "http": {
-            "routers": http_routers,
-            "services": http_services,
-        },
+    http_config: Dict[str, Any] = {
+        "routers": http_routers,
+        "services": http_services,
     }
+    if http_middlewares:
+        http_config["middlewares"] = http_middlewares
+    return {"http": http_config}
@@ -17,10 +17,11 @@ user secret. And when they re-deploy the charm and pass in the same secret, thei
 which means the data in the database will still be accessible.
 """
 
+import functools
 import logging
 import re
 import secrets
-from typing import Optional, Dict, Callable
+from typing import Any, Optional, Dict, Callable, MutableMapping
 import ops
 import pydantic
 
@@ -79,11 +80,26 @@ class UserManager:
         self,
         secret_id: Optional[str],
         get_secret: Callable[[str], Secret],
-        make_client: Callable[[str, str], LitmusClient],
+        make_client: Callable[[str, str, Optional[str]], LitmusClient],
+        endpoint: str = "",
+        verified_credentials: Optional[MutableMapping[str, Any]] = None,
     ):
+        """Initialize UserManager.
+
+        verified_credentials records which revision of the user secret was last verified against
+        which endpoint; never anything derived from the credentials themselves.
+        Pass a persistent mapping to skip re-verifying them (which lists all Litmus users)
+        across hooks, until the secret or the endpoint change, or an API call is refused.
+        """
         self._secret_id = secret_id
         self._get_secret = get_secret
         self._make_client = make_client
+        self._endpoint = endpoint
+        self._verified_credentials = (
+            verified_credentials if verified_credentials is not None else {}
+        )
+        # earlier revisions of the charm recorded a digest of the credentials: drop it
+        self._verified_credentials.pop("fingerprint", None)
 
     @property
     def user_secrets_valid(self) -> bool:
@@ -94,9 +110,12 @@ class UserManager:
             return False
         return True
 
-    @property
+    @functools.cached_property
     def _secret(self) -> Optional[Secret]:
-        """The secret containing user credentials for the admin and the 'charm' bot account."""
+        """The secret containing user credentials for the admin and the 'charm' bot account.
+
+        Resolved once: the status, the fingerprint and the reconcile all need it in the same dispatch.
+        """
         secret_id = self._secret_id
         if not secret_id:
             logger.warning(
@@ -160,6 +179,10 @@ class UserManager:
             if self._apply_credentials(creds):
                 logger.debug("successfully updated user credentials")
                 secret.get_content(refresh=True)
+                self._verified_credentials["refreshes"] = (
+                    self._verified_credentials.get("refreshes", 0) + 1
+                )
+                self._mark_verified()
 
             else:
                 logger.warning(
@@ -175,9 +198,15 @@ class UserManager:
                 "secret contents have not changed since last revision; ensuring credentials are applied"
             )
             if self._validate_secret_content(current_creds):
+                if self._is_verified():
+                    logger.debug(
+                        "credentials already verified for this secret revision and endpoint"
+                    )
+                    return
                 creds = _UserSecretModel.model_validate(current_creds)
                 if self._apply_credentials(creds):
                     logger.debug("successfully applied user credentials")
+                    self._mark_verified()
                 else:
                     logger.warning(
                         "failed to apply user credentials; will retry on next reconcile"
@@ -185,6 +214,30 @@ class UserManager:
             else:
                 logger.warning("invalid secret contents; cannot apply credentials")
 
+    @property
+    def _tracked_revision(self) -> str:
+        """Identifies the revision of the user secret this unit tracks.
+
+        A charm can't read the revision of a secret it doesn't own, so we count the times we
+        moved on to a newer revision of it instead.
+        """
+        return f"{self._secret_id}#{self._verified_credentials.get('refreshes', 0)}"
+
+    def _is_verified(self) -> bool:
+        return (
+            self._verified_credentials.get("verified")
+            == f"{self._tracked_revision}@{self._endpoint}"
+        )
+
+    def _mark_verified(self) -> None:
+        self._verified_credentials["verified"] = (
+            f"{self._tracked_revision}@{self._endpoint}"
+        )
+
+    def forget_verified_credentials(self) -> None:
+        """Have the next reconcile verify the credentials again, e.g. after the API refused them."""
+        self._verified_credentials.pop("verified", None)
+
     def _apply_credentials(self, creds: _UserSecretModel) -> bool:
         """Apply the given credentials to the system. Returns True if successful, False otherwise."""
         logger.debug("applying user credentials via Litmus API")
@@ -210,7 +263,7 @@ class UserManager:
         resets it from the Litmus default to the value in the secret. On subsequent reconciles
         a successful login with target_password is a no-op.
         """
-        client = self._make_client("admin", target_password)
+        client = self._make_client("admin", target_password, None)
         if client.can_login():
             logger.debug("admin credentials already correct")
             return
@@ -219,7 +272,7 @@ class UserManager:
         logger.info(
             "admin login with target password failed; attempting reset from default password"
         )
-        default_client = self._make_client("admin", DEFAULT_ADMIN_PASSWORD)
+        default_client = self._make_client("admin", DEFAULT_ADMIN_PASSWORD, None)
         default_client.set_password(DEFAULT_ADMIN_PASSWORD, target_password)
         logger.info("admin password updated successfully")
 
@@ -230,18 +283,18 @@ class UserManager:
         immediately reset to charm_password (bypassing the forced-reset-on-first-login
         restriction in Litmus).
         """
-        admin = self._make_client("admin", admin_password)
+        admin = self._make_client("admin", admin_password, None)
 
         if not admin.user_exists(self.CHARM_USERNAME):
             logger.info("charm user does not exist; creating with temporary password")
             temp_password = secrets.token_urlsafe(16)
             admin.create_user(self.CHARM_USERNAME, temp_password)
-            charm = self._make_client(self.CHARM_USERNAME, temp_password)
+            charm = self._make_client(self.CHARM_USERNAME, temp_password, None)
             charm.set_password(temp_password, charm_password)
             logger.info("charm user created and password set")
             return
 
-        charm = self._make_client(self.CHARM_USERNAME, charm_password)
+        charm = self._make_client(self.CHARM_USERNAME, charm_password, None)
         if charm.can_login():
             logger.debug("charm credentials already correct")
         else:
@@ -250,6 +303,19 @@ class UserManager:
                 "ensure the secret contains the correct current charm password"
             )
 
+    @property
+    def secret_fingerprint(self) -> Optional[str]:
+        """Identifies the latest revision of the user secret, or None if there's no secret.
+
+        That's the tracked revision, flagged if a newer one is pending: the contents are only
+        compared in memory, so nothing derived from the credentials ends up being persisted.
+        """
+        secret = self._secret
+        if not secret:
+            return None
+        pending = secret.get_content(refresh=False) != secret.peek_content()
+        return f"{self._tracked_revision}{' (newer pending)' if pending else ''}"
+
     def get_charm_client(self) -> LitmusClient | None:
         """Get a LitmusClient authenticated as the charm user."""
         secret = self._secret
@@ -257,4 +323,7 @@ class UserManager:
             logger.warning("cannot get charm client without valid user secret")
             return None
         creds = _UserSecretModel.model_validate(secret.get_content())
-        return self._make_client(self.CHARM_USERNAME, creds.charm_password)
+        # the token it gets may be reused until the tracked revision of the secret changes
+        return self._make_client(
+            self.CHARM_USERNAME, creds.charm_password, self._tracked_revision
+        )
@@ -11,6 +11,7 @@ from scenario import Relation
 from certificates_helpers import mock_cert_and_key
 from charmlibs.nginx_k8s import Nginx
 from charm import LitmusChaoscenterCharm
+from litmus_client import ProjectSnapshot
 from ops.testing import Exec
 
 CA_CERT_PATH = Nginx.CA_CERT_PATH
@@ -186,3 +187,12 @@ def mock_litmus_client():
     client = MagicMock()
     client.get_default_project_id.return_value = MOCK_LITMUS_PROJECT_ID
     return client
+
+
+def make_snapshot(environments=(), infrastructures=()) -> ProjectSnapshot:
+    """Build a ProjectSnapshot of the mock Litmus project."""
+    return ProjectSnapshot(
+        project_id=MOCK_LITMUS_PROJECT_ID,
+        environments=list(environments),
+        infrastructures=list(infrastructures),
+    )
@@ -3,12 +3,17 @@
 
 """Scenario (state-transition) tests for Chaoscenter user-credential management."""
 
+import dataclasses
+import json
 from unittest.mock import patch
 
 import ops
 import pytest
 import requests_mock as requests_mock_module
-from ops.testing import CharmEvents, State
+from ops.testing import CharmEvents, PeerRelation, State
+
+from infra_manager import InfraReconcileSummary
+from litmus_client import LitmusAuthError
 
 BASE_URL = "http://litmus.local:8185"
 AUTH_URL = f"{BASE_URL}/auth/login"
@@ -17,6 +22,14 @@ CREATE_URL = f"{BASE_URL}/auth/create_user"
 UPDATE_PASSWORD_URL = f"{BASE_URL}/auth/update/password"
 
 
+def _stored(state: State) -> dict:
+    """The charm's own StoredState in a scenario output state."""
+    (stored,) = [
+        s for s in state.stored_states if s.owner_path == "LitmusChaoscenterCharm"
+    ]
+    return stored.content
+
+
 @pytest.fixture(autouse=True)
 def _patch_cc_url():
     with patch(
@@ -37,6 +50,15 @@ def _patch_infra_reconciler():
         yield
 
 
+@pytest.fixture(autouse=True)
+def _patch_project_snapshot():
+    with (
+        patch("litmus_client.LitmusClient.get_default_project_id"),
+        patch("litmus_client.LitmusClient.get_project_snapshot"),
+    ):
+        yield
+
+
 # ---------------------------------------------------------------------------
 # Test 1 – missing user_secrets config → BlockedStatus
 # ---------------------------------------------------------------------------
@@ -146,6 +168,7 @@ def test_valid_credentials_calls_litmus_api(
             relations={auth_http_api_relation, backend_http_api_relation},
             config=user_secrets_config,
             secrets=[user_secret],
+            leader=True,
         )
 
         # WHEN any event fires
@@ -155,3 +178,365 @@ def test_valid_credentials_calls_litmus_api(
     assert any(r.url == UPDATE_PASSWORD_URL for r in m.request_history)
     # AND the create endpoint was called for the charm user
     assert any(r.url == CREATE_URL for r in m.request_history)
+
+
+# ---------------------------------------------------------------------------
+# Test 3 – only the leader talks to the Litmus API, and shares the outcome
+# ---------------------------------------------------------------------------
+
+
+def test_follower_makes_no_litmus_api_calls(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a non-leader unit with valid credentials
+    with requests_mock_module.Mocker() as m:
+        state = State(
+            containers={nginx_container, nginx_prometheus_exporter_container},
+            relations={auth_http_api_relation, backend_http_api_relation},
+            config=user_secrets_config,
+            secrets=[user_secret],
+            leader=False,
+        )
+
+        # WHEN any event fires
+        ctx.run(ctx.on.config_changed(), state=state)
+
+    # THEN no request was made to the Litmus API
+    assert not m.request_history
+
+
+def test_leader_publishes_reconcile_result(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a leader whose infra reconcile fails for one infrastructure
+    peers = PeerRelation("chaoscenter-peers")
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        relations={auth_http_api_relation, backend_http_api_relation, peers},
+        config=user_secrets_config,
+        secrets=[user_secret],
+        leader=True,
+    )
+    summary = InfraReconcileSummary(failed={"create infra/ns": "boom"})
+
+    # WHEN any event fires
+    with patch("chaoscenter.Chaoscenter.reconcile", return_value=summary):
+        state_out = ctx.run(ctx.on.config_changed(), state=state)
+
+    # THEN the outcome is published to the peer app databag, and reflected in the status
+    databag = state_out.get_relation(peers.id).local_app_data
+    assert json.loads(databag["failed_infrastructures"]) == ["create infra/ns"]
+    assert isinstance(state_out.unit_status, ops.WaitingStatus)
+
+
+def test_follower_status_reflects_leader_result(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a follower, and a leader that left work for a later hook
+    peers = PeerRelation(
+        "chaoscenter-peers",
+        local_app_data={
+            "failed_infrastructures": "[]",
+            "deferred_infrastructures": json.dumps(["delete infra/ns"]),
+        },
+    )
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        relations={auth_http_api_relation, backend_http_api_relation, peers},
+        config=user_secrets_config,
+        secrets=[user_secret],
+        leader=False,
+    )
+
+    # WHEN any event fires
+    state_out = ctx.run(ctx.on.update_status(), state=state)
+
+    # THEN the follower reports the pending work
+    assert isinstance(state_out.unit_status, ops.MaintenanceStatus)
+    assert "1 infrastructure operations pending" in state_out.unit_status.message
+
+
+# ---------------------------------------------------------------------------
+# Test 4 – unchanged inputs → only a liveness probe, no full reconcile
+# ---------------------------------------------------------------------------
+
+
+def test_unchanged_inputs_skip_litmus_reconcile(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a leader that already reconciled successfully
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        relations={auth_http_api_relation, backend_http_api_relation},
+        config=user_secrets_config,
+        secrets=[user_secret],
+        leader=True,
+    )
+    with (
+        patch(
+            "chaoscenter.Chaoscenter.reconcile",
+            return_value=InfraReconcileSummary(),
+        ) as reconcile,
+        patch("chaoscenter.Chaoscenter.is_alive", return_value=True) as is_alive,
+    ):
+        state = ctx.run(ctx.on.config_changed(), state=state)
+        assert reconcile.call_count == 1
+
+        # WHEN an event fires and none of the inputs changed
+        state = ctx.run(ctx.on.update_status(), state=state)
+
+        # THEN only the liveness probe ran
+        assert reconcile.call_count == 1
+        is_alive.assert_called_once()
+
+        # AND WHEN the user secret gets a new revision
+        new_secret = dataclasses.replace(
+            user_secret,
+            latest_content={
+                "admin-password": "Admin2!pass",
+                "charm-password": "Charm2!pass",
+            },
+        )
+        ctx.run(
+            ctx.on.update_status(),
+            state=dataclasses.replace(state, secrets=[new_secret]),
+        )
+
+        # THEN the full reconcile runs again
+        assert reconcile.call_count == 2
+
+
+def test_new_frontend_url_triggers_litmus_reconcile(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    ingress_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a leader that already reconciled successfully without ingress
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        relations={auth_http_api_relation, backend_http_api_relation},
+        config=user_secrets_config,
+        secrets=[user_secret],
+        leader=True,
+    )
+    with (
+        patch(
+            "chaoscenter.Chaoscenter.reconcile",
+            return_value=InfraReconcileSummary(),
+        ) as reconcile,
+        patch("chaoscenter.Chaoscenter.is_alive", return_value=True),
+    ):
+        state = ctx.run(ctx.on.config_changed(), state=state)
+
+        # WHEN the frontend gets ingressed, which changes the address the infrastructure
+        # manifests connect back to
+        ctx.run(
+            ctx.on.update_status(),
+            state=dataclasses.replace(
+                state, relations=state.relations | {ingress_relation}
+            ),
+        )
+
+    # THEN the full reconcile runs again, with the ingressed address
+    assert reconcile.call_count == 2
+    assert reconcile.call_args.kwargs["frontend_url"] == "http://1.2.3.4:8185"
+
+
+def test_zero_resync_interval_always_reconciles(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a leader configured to fully reconcile on every hook
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        relations={auth_http_api_relation, backend_http_api_relation},
+        config={**user_secrets_config, "full_resync_interval": 0},
+        secrets=[user_secret],
+        leader=True,
+    )
+    with patch(
+        "chaoscenter.Chaoscenter.reconcile", return_value=InfraReconcileSummary()
+    ) as reconcile:
+        # WHEN two events fire with the same inputs
+        state = ctx.run(ctx.on.config_changed(), state=state)
+        ctx.run(ctx.on.update_status(), state=state)
+
+    # THEN both fully reconcile
+    assert reconcile.call_count == 2
+
+
+def test_verified_credentials_are_not_verified_again(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a leader configured to fully reconcile on every hook, and a Litmus API
+    # where both the admin and the charm user already have the configured passwords
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        relations={auth_http_api_relation, backend_http_api_relation},
+        config={**user_secrets_config, "full_resync_interval": 0},
+        secrets=[user_secret],
+        leader=True,
+    )
+    with (
+        requests_mock_module.Mocker() as m,
+        patch(
+            "infra_manager.InfraManager.reconcile",
+            return_value=InfraReconcileSummary(),
+        ),
+    ):
+        m.post(AUTH_URL, json={"accessToken": "tok"})
+        m.get(USERS_URL, json=[{"username": "charm"}])
+
+        # WHEN two events fire with the same credentials
+        state = ctx.run(ctx.on.config_changed(), state=state)
+        ctx.run(ctx.on.config_changed(), state=state)
+
+    # THEN the users are only listed by the first one
+    assert sum(r.url == USERS_URL for r in m.request_history) == 1
+
+
+def test_auth_error_forgets_verified_credentials(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a leader whose credentials were verified in an earlier hook
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        relations={auth_http_api_relation, backend_http_api_relation},
+        config={**user_secrets_config, "full_resync_interval": 0},
+        secrets=[user_secret],
+        leader=True,
+    )
+    with (
+        requests_mock_module.Mocker() as m,
+        patch(
+            "infra_manager.InfraManager.reconcile",
+            return_value=InfraReconcileSummary(),
+        ),
+    ):
+        m.post(AUTH_URL, json={"accessToken": "tok"})
+        m.get(USERS_URL, json=[{"username": "charm"}])
+        state = ctx.run(ctx.on.config_changed(), state=state)
+
+        # WHEN a later API call gets refused
+        with patch(
+            "infra_manager.InfraManager.reconcile",
+            return_value=InfraReconcileSummary(auth_failed=True),
+        ):
+            state = ctx.run(ctx.on.config_changed(), state=state)
+        assert sum(r.url == USERS_URL for r in m.request_history) == 1
+
+        # THEN the next hook verifies the credentials again
+        ctx.run(ctx.on.config_changed(), state=state)
+
+    assert sum(r.url == USERS_URL for r in m.request_history) == 2
+
+
+def test_refused_snapshot_forgets_verified_credentials(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a leader whose credentials were verified in an earlier hook
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        relations={auth_http_api_relation, backend_http_api_relation},
+        config={**user_secrets_config, "full_resync_interval": 0},
+        secrets=[user_secret],
+        leader=True,
+    )
+    with (
+        requests_mock_module.Mocker() as m,
+        patch(
+            "infra_manager.InfraManager.reconcile",
+            return_value=InfraReconcileSummary(),
+        ),
+    ):
+        m.post(AUTH_URL, json={"accessToken": "tok"})
+        m.get(USERS_URL, json=[{"username": "charm"}])
+        state = ctx.run(ctx.on.config_changed(), state=state)
+        assert "verified" in _stored(state)["litmus_verified_credentials"]
+
+        # WHEN reading the project state gets refused
+        with patch(
+            "litmus_client.LitmusClient.get_project_snapshot",
+            side_effect=LitmusAuthError("refused"),
+        ):
+            state = ctx.run(ctx.on.config_changed(), state=state)
+
+    # THEN the hook succeeds and the output state no longer marks the credentials verified
+    assert "verified" not in _stored(state)["litmus_verified_credentials"]
+    assert _stored(state)["litmus_inputs_fingerprint"] == ""
+
+
+def test_api_connection_pool_size_is_configurable(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a configured API connection pool size
+    state = State(
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        config={**user_secrets_config, "api_connection_pool_size": 3},
+        secrets=[user_secret],
+    )
+
+    # WHEN the charm builds its Litmus clients
+    with ctx(ctx.on.update_status(), state=state) as mgr:
+        client = mgr.charm._chaoscenter._user_manager._make_client(
+            "charm", "pass", None
+        )
+
+    # THEN they pool that many connections
+    assert client._pool_maxsize == 3
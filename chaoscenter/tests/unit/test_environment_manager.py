@@ -3,18 +3,18 @@
 
 from types import SimpleNamespace
 
-from conftest import MOCK_LITMUS_PROJECT_ID
+from conftest import MOCK_LITMUS_PROJECT_ID, make_snapshot
 from environment_manager import DEFAULT_ENVIRONMENT, EnvironmentManager
 
 
 def test_reconcile_creates_new_environment(mock_litmus_client):
     """GIVEN no Litmus envs exist, WHEN reconciling, THEN default env is created."""
     # GIVEN
-    mock_litmus_client.list_environments.return_value = []
+    snapshot = make_snapshot(environments=[])
     manager = EnvironmentManager()
 
     # WHEN
-    manager.reconcile(mock_litmus_client)
+    manager.reconcile(mock_litmus_client, snapshot)
 
     # THEN
     mock_litmus_client.create_environment.assert_called_once_with(
@@ -26,13 +26,13 @@ def test_reconcile_creates_new_environment(mock_litmus_client):
 def test_reconcile_skips_environment_creation_if_it_already_exists(mock_litmus_client):
     """GIVEN a default env exists in the project, WHEN reconciling, THEN no actions are taken."""
     # GIVEN
-    mock_litmus_client.list_environments.return_value = [
-        SimpleNamespace(id="env-1", name=DEFAULT_ENVIRONMENT)
-    ]
+    snapshot = make_snapshot(
+        environments=[SimpleNamespace(id="env-1", name=DEFAULT_ENVIRONMENT)]
+    )
     manager = EnvironmentManager()
 
     # WHEN
-    manager.reconcile(mock_litmus_client)
+    manager.reconcile(mock_litmus_client, snapshot)
 
     # THEN
     mock_litmus_client.create_environment.assert_not_called()
@@ -15,7 +15,7 @@ def test_chaoscenter_endpoints(
     # GIVEN http api relations with auth and backend
     # WHEN the charm receives any event
     state_out = ctx.run(
-        ctx.on.update_status(),
+        ctx.on.config_changed(),
         state=State(
             leader=True,
             relations={auth_http_api_relation, backend_http_api_relation},
@@ -2,14 +2,28 @@
 # See LICENSE file for licensing details.
 
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch, call
-from infra_manager import InfraManager
+from unittest.mock import ANY, MagicMock, patch
+from infra_manager import (
+    CRD_DIGEST_LABEL,
+    LITMUS_CRD_MANIFEST_PATH,
+    MAX_CONCURRENT_K8S_CALLS,
+    InfraManager,
+    apply_tiers,
+    load_litmus_crds,
+)
 
 import pytest
 
+from lightkube import ApiError
+from lightkube.codecs import load_all_yaml
+
 from environment_manager import DEFAULT_ENVIRONMENT
-from conftest import MOCK_LITMUS_PROJECT_ID
+from litmus_client import LitmusAPIException
+from conftest import MOCK_LITMUS_PROJECT_ID, make_snapshot
 
 
 @pytest.fixture
@@ -36,14 +50,14 @@ def test_reconcile_creates_new_infrastructure(
     """GIVEN a desired infra that doesn't exist, WHEN reconciling, THEN it is registered and applied."""
     # GIVEN: Databag has one infra, but the backend is empty
     infra_data = [MagicMock(infrastructure_name="new-infra", model_name="test-ns")]
-    mock_litmus_client.list_infrastructures.return_value = []
+    snapshot = make_snapshot(infrastructures=[])
     mock_litmus_client.register_infrastructure.return_value = "generated-uuid"
     mock_litmus_client.get_infrastructure_manifest.return_value = "yaml-content"
 
     manager = InfraManager(infra_data)
 
     # WHEN
-    manager.reconcile(mock_litmus_client)
+    manager.reconcile(mock_litmus_client, snapshot)
 
     # THEN
     mock_litmus_client.register_infrastructure.assert_called_once_with(
@@ -61,14 +75,18 @@ def test_reconcile_skips_active_infrastructure(
     infra_data = [
         SimpleNamespace(infrastructure_name="k8s-infra", model_name="test-ns")
     ]
-    mock_litmus_client.list_infrastructures.return_value = [
-        SimpleNamespace(id="id-1", name="k8s-infra", namespace="test-ns", active=True)
-    ]
+    snapshot = make_snapshot(
+        infrastructures=[
+            SimpleNamespace(
+                id="id-1", name="k8s-infra", namespace="test-ns", active=True
+            )
+        ],
+    )
 
     manager = InfraManager(infra_data)
 
     # WHEN
-    manager.reconcile(mock_litmus_client)
+    manager.reconcile(mock_litmus_client, snapshot)
 
     # THEN
     mock_litmus_client.register_infrastructure.assert_not_called()
@@ -83,15 +101,19 @@ def test_reconcile_reactivates_inactive_infrastructure(
     infra_data = [
         SimpleNamespace(infrastructure_name="k8s-infra", model_name="test-ns")
     ]
-    mock_litmus_client.list_infrastructures.return_value = [
-        SimpleNamespace(id="id-1", name="k8s-infra", namespace="test-ns", active=False)
-    ]
+    snapshot = make_snapshot(
+        infrastructures=[
+            SimpleNamespace(
+                id="id-1", name="k8s-infra", namespace="test-ns", active=False
+            )
+        ],
+    )
     mock_litmus_client.get_infrastructure_manifest.return_value = "re-apply-this"
 
     manager = InfraManager(infra_data)
 
     # WHEN
-    manager.reconcile(mock_litmus_client)
+    manager.reconcile(mock_litmus_client, snapshot)
 
     # THEN: No new registration, but manifest is fetched and applied
     mock_litmus_client.register_infrastructure.assert_not_called()
@@ -107,15 +129,17 @@ def test_reconcile_deletes_removed_infrastructure(
     """GIVEN an infra in the backend not in desired state, WHEN reconciling, THEN it is deleted."""
     # GIVEN: Databag is empty, but backend has an infra
     infra_data = []
-    mock_litmus_client.list_infrastructures.return_value = [
-        SimpleNamespace(id="old-uuid", name="stale-infra", namespace="old-ns")
-    ]
+    snapshot = make_snapshot(
+        infrastructures=[
+            SimpleNamespace(id="old-uuid", name="stale-infra", namespace="old-ns")
+        ],
+    )
     mock_litmus_client.get_infrastructure_manifest.return_value = "re-apply-this"
 
     manager = InfraManager(infra_data)
 
     # WHEN
-    manager.reconcile(mock_litmus_client)
+    manager.reconcile(mock_litmus_client, snapshot)
 
     # THEN
     mock_litmus_client.delete_infrastructure.assert_called_once_with(
@@ -131,28 +155,465 @@ def test_reconcile_deletes_removed_infrastructure_experiments(
     """GIVEN an infra in the backend not in desired state, WHEN reconciling, THEN associated chaos experiments are deleted."""
     # GIVEN: Databag is empty, but backend has an infra
     infra_data = []
-    mock_litmus_client.list_infrastructures.return_value = [
-        SimpleNamespace(id="old-uuid", name="stale-infra", namespace="old-ns")
+    snapshot = make_snapshot(
+        infrastructures=[
+            SimpleNamespace(id="old-uuid", name="stale-infra", namespace="old-ns")
+        ],
+    )
+    mock_litmus_client.list_experiments.return_value = iter(
+        [
+            SimpleNamespace(id="exp-1", infra_id="old-uuid"),
+            SimpleNamespace(id="exp-2", infra_id="old-uuid"),
+        ]
+    )
+
+    manager = InfraManager(infra_data)
+
+    # WHEN
+    manager.reconcile(mock_litmus_client, snapshot)
+
+    # THEN: only the experiments of the removed infra are listed, and deleted in bulk
+    mock_litmus_client.list_experiments.assert_called_once_with(
+        MOCK_LITMUS_PROJECT_ID, infra_id="old-uuid", page_size=ANY
+    )
+    mock_litmus_client.delete_experiments.assert_called_once_with(
+        MOCK_LITMUS_PROJECT_ID, ["exp-1", "exp-2"], ANY
+    )
+
+
+def test_reconcile_creates_many_infrastructures_concurrently(
+    mock_litmus_client, mock_apply_k8s_manifest
+):
+    """GIVEN many desired infras that don't exist, WHEN reconciling, THEN they are all registered and applied."""
+    # GIVEN: Databag has many infras, but the backend is empty
+    infra_data = [
+        MagicMock(infrastructure_name=f"infra-{i}", model_name=f"ns-{i}")
+        for i in range(10)
     ]
-    mock_litmus_client.list_experiments.return_value = [
-        SimpleNamespace(id="exp-1", infra_id="old-uuid"),
-        SimpleNamespace(id="exp-2", infra_id="old-uuid"),
-        SimpleNamespace(id="exp-3", infra_id="other-infra"),
+    snapshot = make_snapshot(infrastructures=[])
+    mock_litmus_client.register_infrastructure.side_effect = lambda name, *_: (
+        f"{name}-uuid"
+    )
+    mock_litmus_client.get_infrastructure_manifest.side_effect = lambda infra_id, _: (
+        f"{infra_id}-manifest"
+    )
+
+    manager = InfraManager(infra_data)
+
+    # WHEN
+    manager.reconcile(mock_litmus_client, snapshot)
+
+    # THEN: every infra is registered and has its own manifest applied
+    assert mock_litmus_client.register_infrastructure.call_count == 10
+    applied = {c.args[0] for c in mock_apply_k8s_manifest.call_args_list}
+    assert {f"infra-{i}-uuid-manifest" for i in range(10)} <= applied
+
+
+def test_load_litmus_crds_is_cached_and_labelled():
+    """GIVEN the CRD manifest, WHEN loading it twice, THEN it is parsed once and labelled with its digest."""
+    # WHEN
+    digest, crds = load_litmus_crds(LITMUS_CRD_MANIFEST_PATH)
+
+    # THEN
+    assert load_litmus_crds(LITMUS_CRD_MANIFEST_PATH)[1] is crds
+    assert crds
+    assert all(crd.metadata.labels[CRD_DIGEST_LABEL] == digest for crd in crds)
+
+
+def test_load_litmus_crds_rejects_crds_without_metadata(tmp_path):
+    """GIVEN a CRD manifest with a CRD lacking metadata, WHEN loading it, THEN it is rejected."""
+    # GIVEN
+    manifest = tmp_path / "crds.yaml"
+    manifest.write_text(
+        "apiVersion: apiextensions.k8s.io/v1\n"
+        "kind: CustomResourceDefinition\n"
+        "spec: {group: litmuschaos.io, names: {kind: Foo, plural: foos}, scope: Namespaced, versions: []}\n"
+    )
+
+    # WHEN/THEN
+    with pytest.raises(ValueError, match="without metadata"):
+        load_litmus_crds(manifest)
+
+
+def test_reconcile_applies_crds_once_for_many_infrastructures(
+    mock_litmus_client, mock_apply_k8s_manifest
+):
+    """GIVEN several infras to create, WHEN reconciling, THEN the CRDs are applied once, not once per infra."""
+    # GIVEN: the cluster has no CRDs yet
+    infra_data = [
+        MagicMock(infrastructure_name=f"infra-{i}", model_name=f"ns-{i}")
+        for i in range(5)
     ]
+    mock_litmus_client.register_infrastructure.side_effect = lambda name, *_: (
+        f"{name}-uuid"
+    )
+    mock_litmus_client.get_infrastructure_manifest.side_effect = lambda infra_id, _: (
+        f"{infra_id}-manifest"
+    )
+    manager = InfraManager(infra_data)
+    manager._k8s_client.list.return_value = []
+
+    # WHEN
+    manager.reconcile(mock_litmus_client, make_snapshot())
 
+    # THEN: one list, and one apply per CRD
+    _, crds = load_litmus_crds(LITMUS_CRD_MANIFEST_PATH)
+    manager._k8s_client.list.assert_called_once()
+    assert manager._k8s_client.apply.call_count == len(crds)
+
+
+def test_reconcile_skips_crds_already_at_current_digest(
+    mock_litmus_client, mock_apply_k8s_manifest
+):
+    """GIVEN the cluster already has the CRDs at the current digest, WHEN reconciling, THEN they are not re-applied."""
+    # GIVEN
+    infra_data = [MagicMock(infrastructure_name="new-infra", model_name="test-ns")]
+    mock_litmus_client.get_infrastructure_manifest.return_value = "yaml-content"
     manager = InfraManager(infra_data)
+    _, crds = load_litmus_crds(LITMUS_CRD_MANIFEST_PATH)
+    manager._k8s_client.list.return_value = [
+        SimpleNamespace(metadata=SimpleNamespace(name=crd.metadata.name))
+        for crd in crds
+    ]
 
     # WHEN
-    manager.reconcile(mock_litmus_client)
+    manager.reconcile(mock_litmus_client, make_snapshot())
+
+    # THEN: the CRDs are not applied, but the infra manifest still is
+    manager._k8s_client.apply.assert_not_called()
+    mock_apply_k8s_manifest.assert_any_call("yaml-content")
+
+
+SUBSCRIBER_MANIFEST = """
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: subscriber
+  namespace: test-ns
+spec: {}
+"""
+
+
+def _inactive_infra_snapshot():
+    return make_snapshot(
+        infrastructures=[
+            SimpleNamespace(
+                id="id-1", name="k8s-infra", namespace="test-ns", active=False
+            )
+        ],
+    )
+
+
+def test_reconcile_records_applied_manifest_digest(
+    mock_litmus_client, mock_apply_k8s_manifest
+):
+    """GIVEN an inactive infra never applied before, WHEN reconciling, THEN its manifest is applied and its digest recorded."""
+    # GIVEN
+    infra_data = [MagicMock(infrastructure_name="k8s-infra", model_name="test-ns")]
+    mock_litmus_client.get_infrastructure_manifest.return_value = SUBSCRIBER_MANIFEST
+    mock_apply_k8s_manifest.return_value = [["test-ns", "subscriber"]]
+    applied_manifests = {}
+    manager = InfraManager(infra_data, applied_manifests)
+
+    # WHEN
+    manager.reconcile(mock_litmus_client, _inactive_infra_snapshot())
 
     # THEN
-    mock_litmus_client.delete_experiment.assert_any_call(
-        project_id=MOCK_LITMUS_PROJECT_ID, experiment_id="exp-1"
+    mock_apply_k8s_manifest.assert_called_once_with(SUBSCRIBER_MANIFEST)
+    assert applied_manifests == {
+        "id-1": {
+            "digest": ANY,
+            "revision": "",
+            "deployments": [["test-ns", "subscriber"]],
+        }
+    }
+
+
+def test_reconcile_skips_unchanged_deployed_manifest(
+    mock_litmus_client, mock_apply_k8s_manifest
+):
+    """GIVEN an inactive infra whose manifest is still deployed, WHEN reconciling, THEN it is neither fetched nor re-applied."""
+    # GIVEN: the manifest was applied in a previous hook
+    infra_data = [MagicMock(infrastructure_name="k8s-infra", model_name="test-ns")]
+    mock_litmus_client.get_infrastructure_manifest.return_value = SUBSCRIBER_MANIFEST
+    mock_apply_k8s_manifest.return_value = [["test-ns", "subscriber"]]
+    applied_manifests = {}
+    InfraManager(infra_data, applied_manifests).reconcile(
+        mock_litmus_client, _inactive_infra_snapshot(), manifest_revision="3.29"
     )
-    mock_litmus_client.delete_experiment.assert_any_call(
-        project_id=MOCK_LITMUS_PROJECT_ID, experiment_id="exp-2"
+    mock_apply_k8s_manifest.reset_mock()
+    mock_litmus_client.get_infrastructure_manifest.reset_mock()
+
+    # WHEN
+    manager = InfraManager(infra_data, applied_manifests)
+    manager.reconcile(
+        mock_litmus_client, _inactive_infra_snapshot(), manifest_revision="3.29"
+    )
+
+    # THEN
+    mock_litmus_client.get_infrastructure_manifest.assert_not_called()
+    mock_apply_k8s_manifest.assert_not_called()
+    manager._k8s_client.get.assert_called_once_with(
+        ANY, name="subscriber", namespace="test-ns"
     )
-    assert (
-        call(project_id=MOCK_LITMUS_PROJECT_ID, experiment_id="exp-3")
-        not in mock_litmus_client.delete_experiment.mock_calls
+
+
+def test_reconcile_fetches_manifest_again_on_new_revision(
+    mock_litmus_client, mock_apply_k8s_manifest
+):
+    """GIVEN an inactive infra applied at an older revision, WHEN reconciling, THEN its manifest is fetched, and only re-applied if it changed."""
+    # GIVEN: the manifest was applied in a previous hook, at an older revision
+    infra_data = [MagicMock(infrastructure_name="k8s-infra", model_name="test-ns")]
+    mock_litmus_client.get_infrastructure_manifest.return_value = SUBSCRIBER_MANIFEST
+    mock_apply_k8s_manifest.return_value = [["test-ns", "subscriber"]]
+    applied_manifests = {}
+    InfraManager(infra_data, applied_manifests).reconcile(
+        mock_litmus_client, _inactive_infra_snapshot(), manifest_revision="3.28"
     )
+    mock_apply_k8s_manifest.reset_mock()
+    mock_litmus_client.get_infrastructure_manifest.reset_mock()
+
+    # WHEN
+    InfraManager(infra_data, applied_manifests).reconcile(
+        mock_litmus_client, _inactive_infra_snapshot(), manifest_revision="3.29"
+    )
+
+    # THEN: the manifest is fetched, but it didn't change, so it isn't re-applied
+    mock_litmus_client.get_infrastructure_manifest.assert_called_once()
+    mock_apply_k8s_manifest.assert_not_called()
+    assert applied_manifests["id-1"]["revision"] == "3.29"
+
+
+def test_reconcile_reapplies_drifted_manifest(
+    mock_litmus_client, mock_apply_k8s_manifest
+):
+    """GIVEN an inactive infra whose subscriber Deployment is gone, WHEN reconciling, THEN its manifest is re-applied."""
+    # GIVEN: the manifest was applied in a previous hook, but the Deployment was deleted since
+    infra_data = [MagicMock(infrastructure_name="k8s-infra", model_name="test-ns")]
+    mock_litmus_client.get_infrastructure_manifest.return_value = SUBSCRIBER_MANIFEST
+    mock_apply_k8s_manifest.return_value = [["test-ns", "subscriber"]]
+    applied_manifests = {}
+    InfraManager(infra_data, applied_manifests).reconcile(
+        mock_litmus_client, _inactive_infra_snapshot()
+    )
+    mock_apply_k8s_manifest.reset_mock()
+    manager = InfraManager(infra_data, applied_manifests)
+    manager._k8s_client.get.side_effect = ApiError(response=MagicMock(status_code=404))
+
+    # WHEN
+    manager.reconcile(mock_litmus_client, _inactive_infra_snapshot())
+
+    # THEN
+    mock_apply_k8s_manifest.assert_called_once_with(SUBSCRIBER_MANIFEST)
+
+
+MULTI_TIER_MANIFEST = """
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: subscriber
+  namespace: test-ns
+---
+apiVersion: v1
+kind: ServiceAccount
+metadata:
+  name: litmus
+  namespace: test-ns
+---
+apiVersion: rbac.authorization.k8s.io/v1
+kind: Role
+metadata:
+  name: litmus
+  namespace: test-ns
+---
+apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: subscriber-config
+  namespace: test-ns
+"""
+
+
+def test_apply_tiers_orders_objects_by_dependency():
+    """GIVEN a manifest with objects of several kinds, WHEN tiering it, THEN dependencies come first."""
+    # WHEN
+    tiers = apply_tiers(load_all_yaml(MULTI_TIER_MANIFEST))
+
+    # THEN
+    assert [sorted(obj.kind for obj in tier) for tier in tiers] == [
+        ["Role"],
+        ["ConfigMap", "ServiceAccount"],
+        ["Deployment"],
+    ]
+
+
+def test_apply_manifest_applies_tiers_in_order():
+    """GIVEN a manifest with objects of several kinds, WHEN applying it, THEN each tier is applied before the next."""
+    # GIVEN
+    manager = InfraManager([])
+
+    # WHEN
+    deployments = manager._apply_manifest(MULTI_TIER_MANIFEST)
+
+    # THEN
+    applied = [c.args[0].kind for c in manager._k8s_client.apply.call_args_list]
+    assert applied[0] == "Role"
+    assert sorted(applied[1:3]) == ["ConfigMap", "ServiceAccount"]
+    assert applied[3] == "Deployment"
+    assert deployments == [["test-ns", "subscriber"]]
+
+
+def test_concurrent_manifests_share_the_k8s_calls_bound():
+    """GIVEN several manifests applied at once, WHEN applying them, THEN at most MAX_CONCURRENT_K8S_CALLS objects are applied at a time."""
+    # GIVEN
+    manager = InfraManager([])
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def _apply(*args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+
+    manager._k8s_client.apply.side_effect = _apply
+    manifests = [
+        "---".join(
+            f"""
+apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: config-{i}
+  namespace: infra-{n}
+"""
+            for i in range(MAX_CONCURRENT_K8S_CALLS)
+        )
+        for n in range(4)
+    ]
+
+    # WHEN
+    with (
+        manager._k8s_calls(),
+        ThreadPoolExecutor(max_workers=len(manifests)) as executor,
+    ):
+        list(executor.map(manager._apply_manifest, manifests))
+
+    # THEN
+    assert manager._k8s_client.apply.call_count == 4 * MAX_CONCURRENT_K8S_CALLS
+    assert max_in_flight <= MAX_CONCURRENT_K8S_CALLS
+
+
+def test_delete_manifest_deletes_tiers_in_reverse_order():
+    """GIVEN a manifest with objects of several kinds, WHEN deleting it, THEN dependents are deleted first."""
+    # GIVEN
+    manager = InfraManager([])
+
+    # WHEN
+    manager._delete_manifest(MULTI_TIER_MANIFEST)
+
+    # THEN
+    deleted = [c.args[0].__name__ for c in manager._k8s_client.delete.call_args_list]
+    assert deleted[0] == "Deployment"
+    assert deleted[-1] == "Role"
+
+
+def test_reconcile_isolates_failing_infrastructure(
+    mock_litmus_client, mock_apply_k8s_manifest
+):
+    """GIVEN an infra whose registration fails, WHEN reconciling, THEN the other infras are still reconciled and the failure is reported."""
+    # GIVEN: registering "bad-infra" fails
+    infra_data = [
+        MagicMock(infrastructure_name=name, model_name="test-ns")
+        for name in ("good-infra", "bad-infra", "other-infra")
+    ]
+
+    def _register(name, *_):
+        if name == "bad-infra":
+            raise LitmusAPIException("boom")
+        return f"{name}-uuid"
+
+    mock_litmus_client.register_infrastructure.side_effect = _register
+    mock_litmus_client.get_infrastructure_manifest.side_effect = lambda infra_id, _: (
+        f"{infra_id}-manifest"
+    )
+    manager = InfraManager(infra_data)
+
+    # WHEN
+    summary = manager.reconcile(mock_litmus_client, make_snapshot())
+
+    # THEN
+    assert sorted(summary.succeeded) == [
+        "create good-infra/test-ns",
+        "create other-infra/test-ns",
+    ]
+    assert summary.failed == {"create bad-infra/test-ns": "boom"}
+    mock_apply_k8s_manifest.assert_any_call("good-infra-uuid-manifest")
+    mock_apply_k8s_manifest.assert_any_call("other-infra-uuid-manifest")
+
+
+def test_reconcile_resumes_teardown_from_queue(
+    mock_litmus_client, mock_delete_k8s_manifest, mock_delete_k8s_experiments
+):
+    """GIVEN a teardown interrupted after its first steps, WHEN reconciling, THEN only the remaining steps are run."""
+    # GIVEN: a previous hook already deleted the manifest and the k8s chaos resources
+    snapshot = make_snapshot(
+        infrastructures=[
+            SimpleNamespace(id="old-uuid", name="stale-infra", namespace="old-ns")
+        ],
+    )
+    mock_litmus_client.list_experiments.return_value = iter([])
+    teardown_queue = {
+        "old-uuid": {"namespace": "old-ns", "done": ["manifest", "k8s_resources"]}
+    }
+    manager = InfraManager([], teardown_queue=teardown_queue)
+
+    # WHEN
+    manager.reconcile(mock_litmus_client, snapshot)
+
+    # THEN
+    mock_delete_k8s_manifest.assert_not_called()
+    mock_delete_k8s_experiments.assert_not_called()
+    mock_litmus_client.delete_infrastructure.assert_called_once_with(
+        "old-uuid", MOCK_LITMUS_PROJECT_ID
+    )
+    assert teardown_queue == {}
+
+
+def test_reconcile_defers_work_past_deadline(
+    mock_litmus_client, mock_delete_k8s_manifest, mock_delete_k8s_experiments
+):
+    """GIVEN an expired deadline, WHEN reconciling, THEN no work is started and it is reported as deferred."""
+    # GIVEN
+    snapshot = make_snapshot(
+        infrastructures=[
+            SimpleNamespace(id="old-uuid", name="stale-infra", namespace="old-ns")
+        ],
+    )
+    manager = InfraManager([])
+
+    # WHEN
+    summary = manager.reconcile(
+        mock_litmus_client, snapshot, deadline=time.monotonic() - 1
+    )
+
+    # THEN
+    assert summary.deferred == ["delete stale-infra/old-ns"]
+    mock_delete_k8s_manifest.assert_not_called()
+    mock_litmus_client.delete_infrastructure.assert_not_called()
+
+
+def test_reconcile_drops_stale_teardown_entries(mock_litmus_client):
+    """GIVEN a queued teardown for an infra that's no longer to be deleted, WHEN reconciling, THEN the entry is dropped."""
+    # GIVEN
+    teardown_queue = {"gone-uuid": {"namespace": "ns", "done": ["manifest"]}}
+    manager = InfraManager([], teardown_queue=teardown_queue)
+
+    # WHEN
+    manager.reconcile(mock_litmus_client, make_snapshot())
+
+    # THEN
+    assert teardown_queue == {}
@@ -1,7 +1,11 @@
-from scenario import State
+import pytest
+import yaml
+from scenario import PeerRelation, State
 
 import ops
 
+from traefik_config import Middlewares, ingress_config
+
 
 def test_ingressed_url_present_in_status(
     ctx,
@@ -67,3 +71,135 @@ def test_ingressed_https_url_present_in_status(
 
     # THEN juju status reports an ingressed url
     assert state_out.unit_status == ops.ActiveStatus("Ready at https://1.2.3.4:8185.")
+
+
+def test_ingress_config_balances_over_all_hosts():
+    # GIVEN the addresses of three units
+    hosts = ["app-1.app-endpoints", "app-0.app-endpoints", "app-2.app-endpoints"]
+
+    # WHEN we build the ingress config with sticky sessions and p2c balancing
+    config = ingress_config(
+        "model", "app", tls=True, hosts=hosts, strategy="p2c", sticky=True
+    )
+
+    # THEN traffic is balanced over all of them, skipping those failing health checks
+    (service,) = config["http"]["services"].values()
+    load_balancer = service["loadBalancer"]
+    assert load_balancer["servers"] == [
+        {"url": f"https://app-{i}.app-endpoints:8185"} for i in range(3)
+    ]
+    assert load_balancer["healthCheck"]["path"] == "/health"
+    assert load_balancer["strategy"] == "p2c"
+    assert load_balancer["sticky"]["cookie"]["secure"] is True
+
+
+def test_ingress_config_defaults():
+    # WHEN we build the ingress config with the default balancing settings
+    config = ingress_config("model", "app", tls=False, hosts=["app-0.app-endpoints"])
+
+    # THEN Traefik's default strategy is left implicit, and sessions aren't sticky
+    (service,) = config["http"]["services"].values()
+    assert "strategy" not in service["loadBalancer"]
+    assert "sticky" not in service["loadBalancer"]
+
+
+def test_ingress_config_middlewares():
+    # WHEN we build the ingress config with all middlewares enabled
+    config = ingress_config(
+        "model",
+        "app",
+        tls=False,
+        hosts=["app-0.app-endpoints"],
+        middlewares=Middlewares(
+            compress=True, retry_attempts=3, max_inflight_requests=100
+        ),
+    )
+
+    # THEN all requests are limited and compressed
+    routers = config["http"]["routers"]
+    middlewares = config["http"]["middlewares"]
+    default_router = routers["juju-model-app-litmus-chaoscenter"]
+    assert [
+        next(iter(middlewares[name])) for name in default_router["middlewares"]
+    ] == ["inFlightReq", "compress"]
+    assert middlewares[default_router["middlewares"][0]]["inFlightReq"]["amount"] == 100
+    # AND only idempotent requests are retried, through a more specific router
+    retry_router = routers["juju-model-app-litmus-chaoscenter-idempotent"]
+    assert retry_router["service"] == default_router["service"]
+    assert "Method(`GET`)" in retry_router["rule"]
+    assert len(retry_router["rule"]) > len(default_router["rule"])
+    retry = middlewares[retry_router["middlewares"][-1]]["retry"]
+    assert retry["attempts"] == 3
+
+
+def test_ingress_config_without_middlewares():
+    # WHEN we build the ingress config with all middlewares disabled
+    config = ingress_config(
+        "model",
+        "app",
+        tls=False,
+        hosts=["app-0.app-endpoints"],
+        middlewares=Middlewares(compress=False),
+    )
+
+    # THEN a single router forwards the requests as they are
+    assert list(config["http"]["routers"]) == ["juju-model-app-litmus-chaoscenter"]
+    assert "middlewares" not in config["http"]
+    assert (
+        "middlewares"
+        not in config["http"]["routers"]["juju-model-app-litmus-chaoscenter"]
+    )
+
+
+def test_ingress_config_rejects_unknown_strategy():
+    with pytest.raises(ValueError):
+        ingress_config("model", "app", tls=False, strategy="random")
+
+
+def test_leader_ingresses_all_units(
+    ctx,
+    unit_fqdn,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    ingress_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN a leader with two peers that published their address
+    peers = PeerRelation(
+        "chaoscenter-peers",
+        peers_data={
+            1: {"address": "app-1.app-headless.default.svc.cluster.local"},
+            2: {"address": "app-2.app-headless.default.svc.cluster.local"},
+        },
+    )
+
+    # WHEN a peer joins
+    state_out = ctx.run(
+        ctx.on.relation_changed(peers, remote_unit=2),
+        state=State(
+            leader=True,
+            relations={
+                auth_http_api_relation,
+                backend_http_api_relation,
+                ingress_relation,
+                peers,
+            },
+            containers={nginx_container, nginx_prometheus_exporter_container},
+            config=user_secrets_config,
+            secrets=[user_secret],
+        ),
+    )
+
+    # THEN the leader publishes its own address
+    assert state_out.get_relation(peers.id).local_unit_data["address"] == (unit_fqdn)
+    # AND Traefik balances the ingressed traffic over all three units
+    config = yaml.safe_load(
+        state_out.get_relation(ingress_relation.id).local_app_data["config"]
+    )
+    (service,) = config["http"]["services"].values()
+    assert [server["url"] for server in service["loadBalancer"]["servers"]] == [
+        f"http://app-{i}.app-headless.default.svc.cluster.local:8185" for i in range(3)
+    ]
@@ -3,15 +3,27 @@
 
 """Unit tests for Litmus API wrapper."""
 
+import asyncio
+import base64
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 import requests_mock
 import pytest
 
 from litmus_client import (
+    AsyncLitmusClient,
     LitmusClient,
     LitmusAPIException,
+    LitmusAuthError,
     ChaosEnvironment,
     ChaosInfrastructure,
+    ProjectSnapshot,
+    TokenStore,
+    close_shared_sessions,
+    gather_bounded,
 )
 
 # Configuration for mocks
@@ -28,6 +40,12 @@ def client():
     return LitmusClient(endpoint=BASE_URL, username="admin", password="litmus")
 
 
+def _jwt(exp: float) -> str:
+    """Build an (unsigned) JWT carrying the given expiry claim."""
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).rstrip(b"=")
+    return f"header.{payload.decode()}.signature"
+
+
 @pytest.fixture
 def mock_api():
     """Context manager for mocking requests."""
@@ -61,6 +79,35 @@ class TestAuthentication:
         # AND: The token should be wiped (set to None)
         assert client._token is None
 
+    def test_refused_credentials_raise_auth_error(self, client, mock_api):
+        # GIVEN: A server that refuses our credentials
+        mock_api.post(AUTH_URL, status_code=401)
+
+        # WHEN: A login is attempted
+        # THEN: The failure is reported as an authentication error
+        with pytest.raises(LitmusAuthError):
+            client._login()
+
+    def test_server_error_on_login_is_not_an_auth_error(self, client, mock_api):
+        # GIVEN: A server failing for reasons unrelated to our credentials
+        mock_api.post(AUTH_URL, status_code=500)
+
+        # WHEN: A login is attempted
+        # THEN: The failure is not reported as an authentication error
+        with pytest.raises(LitmusAPIException) as exc_info:
+            client._login()
+        assert not isinstance(exc_info.value, LitmusAuthError)
+
+    def test_token_rejected_after_fresh_login_raises_auth_error(self, client, mock_api):
+        # GIVEN: A server that rejects even a freshly obtained token
+        mock_api.post(AUTH_URL, json={"accessToken": "fresh-token"})
+        mock_api.get(MOCK_REST_URL, status_code=401)
+
+        # WHEN: An API call is made
+        # THEN: The failure is reported as an authentication error
+        with pytest.raises(LitmusAuthError):
+            client._execute_rest("GET", MOCK_REST_PATH)
+
     def test_token_persistence(self, client, mock_api):
         # GIVEN: A client that already possesses a valid token
         client._token = "existing-token"
@@ -72,6 +119,201 @@ class TestAuthentication:
         assert mock_api.call_count == 0
 
 
+REVISION = "secret:abc#1"
+
+
+class TestTokenStore:
+    def test_token_reused_across_clients(self, mock_api):
+        # GIVEN: A token store shared by two clients with the same credentials
+        store = TokenStore({})
+        token = _jwt(time.time() + 3600)
+        mock_api.post(AUTH_URL, json={"accessToken": token})
+        first = LitmusClient(
+            BASE_URL, "admin", "pass", token_store=store, credentials_revision=REVISION
+        )
+        second = LitmusClient(
+            BASE_URL, "admin", "pass", token_store=store, credentials_revision=REVISION
+        )
+
+        # WHEN: Both clients check whether they can login
+        assert first.can_login()
+        assert second.can_login()
+
+        # THEN: Only the first one actually logged in
+        assert mock_api.call_count == 1
+        assert second._get_auth_header()["Authorization"] == f"Bearer {token}"
+
+    def test_expired_token_is_not_reused(self, mock_api):
+        # GIVEN: A store holding an expired token
+        storage = {}
+        store = TokenStore(storage)
+        store.put(BASE_URL, "admin", REVISION, _jwt(time.time() - 10))
+        mock_api.post(AUTH_URL, json={"accessToken": "fresh-token"})
+
+        # WHEN: A client with the same credentials checks whether it can login
+        client = LitmusClient(
+            BASE_URL, "admin", "pass", token_store=store, credentials_revision=REVISION
+        )
+        assert client.can_login()
+
+        # THEN: The client logged in again
+        assert mock_api.call_count == 1
+        assert client._token == "fresh-token"
+
+    @pytest.mark.parametrize(
+        "token", ("opaque-token", "header.!!!.signature", "header.bnVsbA.signature")
+    )
+    def test_malformed_token_is_not_reused(self, token):
+        # GIVEN: A store holding a token that isn't a JWT we can read the expiry of
+        store = TokenStore()
+        store.put(BASE_URL, "admin", REVISION, token)
+
+        # THEN: The token is considered expired
+        assert store.get(BASE_URL, "admin", REVISION) is None
+
+    def test_token_not_reused_for_different_secret_revision(self, mock_api):
+        # GIVEN: A store holding a valid token obtained with an older secret revision
+        store = TokenStore({})
+        store.put(BASE_URL, "admin", "secret:abc#0", _jwt(time.time() + 3600))
+        mock_api.post(AUTH_URL, status_code=401)
+
+        # WHEN: A client using a newer secret revision checks whether it can login
+        client = LitmusClient(
+            BASE_URL,
+            "admin",
+            "new-pass",
+            token_store=store,
+            credentials_revision=REVISION,
+        )
+
+        # THEN: The cached token is not used and the login fails
+        assert not client.can_login()
+        assert mock_api.call_count == 1
+
+    def test_token_not_cached_without_secret_revision(self, mock_api):
+        # GIVEN: A client that doesn't know which secret revision its password comes from
+        storage = {}
+        mock_api.post(AUTH_URL, json={"accessToken": _jwt(time.time() + 3600)})
+        client = LitmusClient(
+            BASE_URL, "admin", "pass", token_store=TokenStore(storage)
+        )
+
+        # WHEN: It logs in
+        assert client.can_login()
+
+        # THEN: The token is not cached
+        assert storage == {}
+
+    def test_nothing_derived_from_the_password_is_stored(self, mock_api):
+        # GIVEN: A store with a legacy entry keyed on a password digest
+        storage = {"legacy": {"token": "t", "expiry": 0, "password_digest": "d"}}
+        store = TokenStore(storage)
+        mock_api.post(AUTH_URL, json={"accessToken": _jwt(time.time() + 3600)})
+        client = LitmusClient(
+            BASE_URL, "admin", "pass", token_store=store, credentials_revision=REVISION
+        )
+
+        # WHEN: A client logs in and its token is cached
+        assert client.can_login()
+
+        # THEN: The legacy entry is gone and the new one only records the secret revision
+        (entry,) = storage.values()
+        assert set(entry) == {"token", "expiry", "credentials_revision"}
+        assert entry["credentials_revision"] == REVISION
+
+    def test_rejected_token_triggers_new_login(self, mock_api):
+        # GIVEN: A store holding a token that the server has revoked
+        store = TokenStore({})
+        store.put(BASE_URL, "admin", REVISION, _jwt(time.time() + 3600))
+        mock_api.post(AUTH_URL, json={"accessToken": "fresh-token"})
+        mock_api.get(
+            MOCK_REST_URL,
+            [{"status_code": 401}, {"json": {"data": {"ok": True}}}],
+        )
+        client = LitmusClient(
+            BASE_URL, "admin", "pass", token_store=store, credentials_revision=REVISION
+        )
+
+        # WHEN: An API call is made
+        data = client._execute_rest("GET", MOCK_REST_PATH)
+
+        # THEN: The client logged in again, retried, and cached the new token
+        assert data == {"ok": True}
+        assert mock_api.request_history[-1].headers["Authorization"] == (
+            "Bearer fresh-token"
+        )
+        assert store.get(BASE_URL, "admin", REVISION) is None  # no exp claim
+
+    def test_failed_login_invalidates_cached_token(self, mock_api):
+        # GIVEN: A store holding a valid token
+        store = TokenStore({})
+        store.put(BASE_URL, "admin", REVISION, _jwt(time.time() + 3600))
+        mock_api.post(AUTH_URL, status_code=401)
+        client = LitmusClient(
+            BASE_URL, "admin", "pass", token_store=store, credentials_revision=REVISION
+        )
+
+        # WHEN: An explicit login fails
+        with pytest.raises(LitmusAPIException):
+            client._login()
+
+        # THEN: The cached token is dropped
+        assert store.get(BASE_URL, "admin", REVISION) is None
+
+
+class TestSharedTransport:
+    @pytest.fixture(autouse=True)
+    def _close_sessions(self):
+        close_shared_sessions()
+        yield
+        close_shared_sessions()
+
+    def test_clients_for_same_endpoint_share_session(self):
+        # GIVEN: Two clients for different users on the same endpoint
+        admin = LitmusClient(BASE_URL, "admin", "pass")
+        charm = LitmusClient(f"{BASE_URL}/", "charm", "pass")
+
+        # THEN: They share the same pooled session
+        assert admin._session is charm._session
+
+    def test_clients_for_different_endpoints_dont_share_session(self):
+        # GIVEN: Two clients on different endpoints
+        plain = LitmusClient(BASE_URL, "admin", "pass")
+        tls = LitmusClient("https://litmus.local", "admin", "pass")
+
+        # THEN: They use different sessions
+        assert plain._session is not tls._session
+
+    def test_threads_get_their_own_session_over_the_same_transport(self):
+        # GIVEN: A client
+        client = LitmusClient(BASE_URL, "admin", "pass", pool_maxsize=3)
+
+        # WHEN: It is used from another thread too
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker_session = executor.submit(lambda: client._session).result()
+
+        # THEN: Each thread has its own session, but they share the connection pool
+        assert worker_session is not client._session
+        adapter = client._session.adapters["https://"]
+        assert worker_session.adapters["https://"] is adapter
+        assert adapter._pool_maxsize == 3
+
+    def test_shared_session_does_not_keep_cookies(self, mock_api):
+        # GIVEN: A login endpoint that sets a cookie
+        mock_api.post(
+            AUTH_URL,
+            json={"accessToken": "tok"},
+            headers={"Set-Cookie": "session=admin; Path=/"},
+        )
+        client = LitmusClient(BASE_URL, "admin", "pass")
+
+        # WHEN: The client logs in
+        client._login()
+
+        # THEN: The cookie is not stored on the shared session
+        assert not client._session.cookies
+
+
 class TestRESTMethods:
     def test_rest_calls_success(self, client, mock_api):
         # GIVEN: A valid token and a mocked response
@@ -274,3 +516,210 @@ class TestGraphQLMethods:
         assert mock_api.call_count == 1
         sent_vars = mock_api.request_history[-1].json()["variables"]
         assert sent_vars["infraID"] == "infra-1"
+
+    def test_get_project_snapshot_single_request(self, client, mock_api):
+        # GIVEN: A mock batched response with environments and infras
+        client._token = "valid-token"
+        payload = {
+            "data": {
+                "environments": {
+                    "environments": [{"environmentID": TEST_ENV, "name": TEST_ENV}]
+                },
+                "infrastructures": {
+                    "infras": [
+                        {
+                            "infraID": "i-1",
+                            "name": "my-infra",
+                            "infraNamespace": "litmus",
+                            "isActive": False,
+                        }
+                    ]
+                },
+            }
+        }
+        mock_api.post(GQL_URL, json=payload)
+
+        # WHEN: Reading the project snapshot
+        snapshot = client.get_project_snapshot("proj-1", TEST_ENV)
+
+        # THEN: Both lists are read with a single request
+        assert mock_api.call_count == 1
+        assert isinstance(snapshot, ProjectSnapshot)
+        assert snapshot.project_id == "proj-1"
+        assert [env.id for env in snapshot.environments] == [TEST_ENV]
+        assert [infra.id for infra in snapshot.infrastructures] == ["i-1"]
+        sent_vars = mock_api.request_history[-1].json()["variables"]
+        assert sent_vars["infrasRequest"]["environmentIDs"] == [TEST_ENV]
+
+    def test_get_project_snapshot_empty(self, client, mock_api):
+        # GIVEN: A batched response with no data
+        client._token = "valid-token"
+        mock_api.post(GQL_URL, json={"data": None})
+
+        # WHEN: Reading the project snapshot
+        snapshot = client.get_project_snapshot("proj-1", TEST_ENV)
+
+        # THEN: All lists are empty
+        assert snapshot.environments == []
+        assert snapshot.infrastructures == []
+
+    def test_list_experiments_paginates_with_infra_filter(self, client, mock_api):
+        # GIVEN: Two pages of experiments for an infra
+        client._token = "valid-token"
+
+        def _page(ids):
+            return {
+                "json": {
+                    "data": {
+                        "listExperiment": {
+                            "totalNoOfExperiments": 3,
+                            "experiments": [
+                                {"experimentID": i, "infra": {"infraID": "infra-1"}}
+                                for i in ids
+                            ],
+                        }
+                    }
+                }
+            }
+
+        mock_api.post(GQL_URL, [_page(["e-1", "e-2"]), _page(["e-3"])])
+
+        # WHEN: Listing the experiments of the infra
+        experiments = list(
+            client.list_experiments("proj-1", infra_id="infra-1", page_size=2)
+        )
+
+        # THEN: Every page is requested with the infra filter
+        assert [exp.id for exp in experiments] == ["e-1", "e-2", "e-3"]
+        assert mock_api.call_count == 2
+        requests_sent = [
+            r.json()["variables"]["request"] for r in mock_api.request_history
+        ]
+        assert [r["pagination"] for r in requests_sent] == [
+            {"page": 0, "limit": 2},
+            {"page": 1, "limit": 2},
+        ]
+        assert all(r["filter"] == {"infraID": "infra-1"} for r in requests_sent)
+
+    def test_delete_experiments_attempts_all_and_reports_failures(
+        self, client, mock_api
+    ):
+        # GIVEN: A delete mutation that fails for one experiment
+        client._token = "valid-token"
+
+        def _respond(request, context):
+            if request.json()["variables"]["experimentID"] == "e-2":
+                return {"errors": [{"message": "boom"}]}
+            return {"data": {"deleteChaosExperiment": True}}
+
+        mock_api.post(GQL_URL, json=_respond)
+
+        # WHEN/THEN: Deleting three experiments raises, after trying all of them
+        with pytest.raises(LitmusAPIException, match="1 of 3"):
+            client.delete_experiments("proj-1", ["e-1", "e-2", "e-3"])
+        deleted = {
+            r.json()["variables"]["experimentID"] for r in mock_api.request_history
+        }
+        assert deleted == {"e-1", "e-2", "e-3"}
+
+    def test_delete_experiments_refresh_a_rejected_token_once(self, client, mock_api):
+        # GIVEN: A cached token the server rejects
+        client._token = "stale-token"
+        mock_api.post(AUTH_URL, json={"accessToken": "fresh-token"})
+
+        def _respond(request, context):
+            if request.headers["Authorization"] == "Bearer stale-token":
+                # let all workers get their request rejected at about the same time
+                time.sleep(0.05)
+                context.status_code = 401
+                return {}
+            return {"data": {"deleteChaosExperiment": True}}
+
+        mock_api.post(GQL_URL, json=_respond)
+
+        # WHEN: Several experiments are deleted concurrently
+        client.delete_experiments("proj-1", [f"e-{i}" for i in range(8)])
+
+        # THEN: Only one of the workers logged in again, and all used the fresh token
+        assert sum(r.url == AUTH_URL for r in mock_api.request_history) == 1
+        assert client._token == "fresh-token"
+
+    def test_is_alive_probes_auth_status_without_login(self, client, mock_api):
+        # GIVEN: A healthy auth server
+        mock_api.get(f"{BASE_URL}/auth/status", json={"status": "up"})
+
+        # WHEN/THEN: The probe succeeds with a single unauthenticated request
+        assert client.is_alive()
+        assert mock_api.call_count == 1
+        assert "Authorization" not in mock_api.request_history[-1].headers
+
+    def test_is_alive_false_on_error(self, client, mock_api):
+        # GIVEN: An unhealthy auth server
+        mock_api.get(f"{BASE_URL}/auth/status", status_code=503)
+
+        # WHEN/THEN: The probe fails
+        assert not client.is_alive()
+
+    def test_default_project_id_is_looked_up_once(self, client, mock_api):
+        # GIVEN: A mocked list_projects endpoint
+        client._token = "valid-token"
+        mock_api.get(
+            f"{BASE_URL}/auth/list_projects",
+            json={"data": {"projects": [{"projectID": "p1", "name": "admin-project"}]}},
+        )
+
+        # WHEN: The default project ID is requested twice
+        first = client.get_default_project_id()
+        second = client.get_default_project_id()
+
+        # THEN: Only one request is made
+        assert first == second == "p1"
+        assert mock_api.call_count == 1
+
+    def test_default_project_without_id_raises_exception(self, client, mock_api):
+        # GIVEN: A default project listed without its ID
+        client._token = "valid-token"
+        mock_api.get(
+            f"{BASE_URL}/auth/list_projects",
+            json={"data": {"projects": [{"name": "admin-project"}]}},
+        )
+
+        # WHEN/THEN: Looking up its ID fails, instead of returning None
+        with pytest.raises(LitmusAPIException, match="has no ID"):
+            client.get_default_project_id()
+
+
+class TestAsyncClient:
+    def test_async_client_wraps_sync_client(self, client, mock_api):
+        # GIVEN: A mocked manifest query
+        client._token = "valid-token"
+        mock_api.post(GQL_URL, json={"data": {"getInfraManifest": "yaml"}})
+
+        # WHEN: The manifest is requested through the async client
+        manifest = asyncio.run(
+            AsyncLitmusClient(client).get_infrastructure_manifest("infra-1", "proj-1")
+        )
+
+        # THEN: The sync client's result is returned
+        assert manifest == "yaml"
+        assert mock_api.request_history[-1].json()["variables"]["infraID"] == "infra-1"
+
+    def test_gather_bounded_limits_concurrency(self):
+        # GIVEN: More awaitables than the concurrency limit
+        running = 0
+        peak = 0
+
+        async def _work(i):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return i
+
+        # WHEN: They are gathered with a limit of 2
+        results = asyncio.run(gather_bounded([_work(i) for i in range(6)], limit=2))
+
+        # THEN: Results keep their order, and at most 2 ran at once
+        assert results == list(range(6))
+        assert peak == 2
@@ -1,5 +1,8 @@
+import dataclasses
 import json
+import re
 from pathlib import Path
+from typing import Optional
 from unittest.mock import patch
 
 from scenario import State, Relation
@@ -8,7 +11,9 @@ import pytest
 from urllib.parse import urlparse
 
 import nginx_config
+from nginx_workload import CachedNginx, NginxMetrics
 from charmlibs.nginx_k8s import Nginx
+from litmus_libs import ResourceLimits
 from conftest import patch_cert_and_key_ctx
 
 CERT_PATH = Nginx.CERT_PATH
@@ -72,7 +77,7 @@ def test_config_contains_correct_urls(
 
     with patch_cert_and_key_ctx(tls_enabled):
         state_out = ctx.run(
-            ctx.on.update_status(),
+            ctx.on.config_changed(),
             state=State(
                 leader=True,
                 relations={
@@ -155,7 +160,7 @@ def test_config_contains_auth_rewrite(
     )
 
     state_out = ctx.run(
-        ctx.on.update_status(),
+        ctx.on.config_changed(),
         state=State(
             leader=True,
             relations={auth_relation, backend_relation},
@@ -204,7 +209,7 @@ def test_config_contains_ssl_config_when_tls_relation_created(
 ):
     # GIVEN chaoscenter related to backend and auth
     state_out = ctx.run(
-        ctx.on.update_status(),
+        ctx.on.config_changed(),
         state=State(
             leader=True,
             relations={
@@ -287,7 +292,7 @@ def test_config_contains_correct_locations_config_depending_on_endpoints_configu
     )
 
     state_out = ctx.run(
-        ctx.on.update_status(),
+        ctx.on.config_changed(),
         state=State(
             leader=True,
             relations={
@@ -339,7 +344,7 @@ def test_generated_ssl_config_matches_expected_config(
         },
     )
     state_out = ctx.run(
-        ctx.on.update_status(),
+        ctx.on.config_changed(),
         state=State(
             leader=True,
             relations={
@@ -377,7 +382,7 @@ def test_config_contains_tracing_config(
 ):
     # GIVEN chaoscenter related to backend, auth, and a tracing backend
     state_out = ctx.run(
-        ctx.on.update_status(),
+        ctx.on.config_changed(),
         state=State(
             leader=True,
             relations={
@@ -416,6 +421,82 @@ def test_config_contains_tracing_config(
         assert f"otel_resource_attr {key}" in config
 
 
+def _generated_config(ctx, state_out, container_name):
+    container_out = state_out.get_container(container_name)
+    return (container_out.get_filesystem(ctx) / NGINX_CONFIG[1:]).read_text()
+
+
+def test_config_keeps_upstream_connections_alive(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN chaoscenter related to backend and auth, with custom keepalive settings
+    state_out = ctx.run(
+        ctx.on.config_changed(),
+        state=State(
+            leader=True,
+            relations={auth_http_api_relation, backend_http_api_relation},
+            containers={nginx_container, nginx_prometheus_exporter_container},
+            config={
+                **user_secrets_config,
+                "upstream_keepalive": 16,
+                "upstream_keepalive_timeout": 30,
+                "upstream_keepalive_requests": 500,
+            },
+            secrets=[user_secret],
+        ),
+    )
+
+    # WHEN we peek into the generated nginx config
+    config = _generated_config(ctx, state_out, nginx_container.name)
+
+    # THEN both upstreams keep a pool of idle connections
+    assert config.count("keepalive 16;") == 2
+    assert config.count("keepalive_timeout 30s;") == 2
+    assert config.count("keepalive_requests 500;") == 2
+    # AND nginx talks HTTP/1.1 to them, without forwarding the client's Connection header
+    assert config.count("proxy_http_version 1.1;") == 2
+    assert "proxy_set_header Connection '';" in config
+    # AND the websocket upgrade on /api still works, without closing other connections
+    assert "proxy_set_header Connection $connection_upgrade;" in config
+    assert "'' close;" not in config
+
+
+def test_config_without_upstream_keepalive(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN chaoscenter related to backend and auth, with upstream keepalive disabled
+    state_out = ctx.run(
+        ctx.on.config_changed(),
+        state=State(
+            leader=True,
+            relations={auth_http_api_relation, backend_http_api_relation},
+            containers={nginx_container, nginx_prometheus_exporter_container},
+            config={**user_secrets_config, "upstream_keepalive": 0},
+            secrets=[user_secret],
+        ),
+    )
+
+    # WHEN we peek into the generated nginx config
+    config = _generated_config(ctx, state_out, nginx_container.name)
+
+    # THEN upstream connections are closed after each request
+    assert "keepalive" not in config
+    assert "proxy_http_version" not in config
+    assert "'' close;" in config
+
+
 def test_get_scheme_from_url_returns_http_when_scheme_empty():
     # GIVEN a URL parsed without a scheme (scheme is empty string)
     url = urlparse("//foo.bar:80")
@@ -426,3 +507,296 @@ def test_get_scheme_from_url_returns_http_when_scheme_empty():
 
     # THEN the fallback "http" is returned
     assert scheme == "http"
+
+
+@pytest.mark.parametrize(
+    "path, hashed",
+    (
+        ("/static/js/main.3f2a9c1b.js", True),
+        ("/assets/index-0a1b2c3d4e.css", True),
+        ("/fonts/roboto.8d5ea2f1a9.woff2", True),
+        ("/index.html", False),
+        ("/manifest.json", False),
+        ("/favicon.ico", False),
+        ("/static/js/main.js", False),
+        ("/api/query.3f2a9c1b.js", False),
+        ("/auth/login.3f2a9c1b.js", False),
+    ),
+)
+def test_hashed_asset_path_regex(path, hashed):
+    # nginx uses PCRE; for this pattern, Python's re agrees with it
+    assert bool(re.match(nginx_config.hashed_asset_path_regex, path)) is hashed
+
+
+def test_config_caches_hashed_assets_forever(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN chaoscenter related to backend and auth
+    state_out = ctx.run(
+        ctx.on.config_changed(),
+        state=State(
+            leader=True,
+            relations={auth_http_api_relation, backend_http_api_relation},
+            containers={nginx_container, nginx_prometheus_exporter_container},
+            config=user_secrets_config,
+            secrets=[user_secret],
+        ),
+    )
+
+    # WHEN we peek into the generated nginx config
+    config = _generated_config(ctx, state_out, nginx_container.name)
+
+    # THEN index.html is always revalidated, while hashed assets are immutable
+    assert "add_header Cache-Control no-cache;" in config
+    assert "add_header Cache-Control 'public, max-age=31536000, immutable';" in config
+    # AND static files are served precompressed if possible, compressed otherwise
+    assert config.count("gzip_static on;") == 2
+    assert config.count("gzip on;") == 2
+    assert "open_file_cache max=1000 inactive=60s;" in config
+
+
+@pytest.mark.parametrize(
+    "limits, expected",
+    (
+        # no limits: nginx library defaults
+        (ResourceLimits(), nginx_config.WorkerSettings()),
+        # one worker per started CPU; half the memory for connection buffers
+        (
+            ResourceLimits(cpu=1.5, memory=1024**3),
+            nginx_config.WorkerSettings(processes=2, connections=29127),
+        ),
+        # small containers get smaller buffers, and at least the minimum connections
+        (
+            ResourceLimits(cpu=0.2, memory=64 * 1024**2),
+            nginx_config.WorkerSettings(
+                processes=1, connections=6553, proxy_buffer_size_kib=4
+            ),
+        ),
+        (
+            ResourceLimits(cpu=16, memory=128 * 1024**2),
+            nginx_config.WorkerSettings(
+                processes=16,
+                connections=nginx_config.MIN_WORKER_CONNECTIONS,
+                proxy_buffer_size_kib=4,
+            ),
+        ),
+        # huge containers are capped
+        (
+            ResourceLimits(cpu=1, memory=64 * 1024**3),
+            nginx_config.WorkerSettings(
+                processes=1, connections=nginx_config.MAX_WORKER_CONNECTIONS
+            ),
+        ),
+    ),
+)
+def test_worker_settings_from_limits(limits, expected):
+    assert nginx_config.worker_settings(limits) == expected
+
+
+def test_worker_settings_overrides():
+    # GIVEN limits, and explicit worker processes and connections
+    settings = nginx_config.worker_settings(
+        ResourceLimits(cpu=4, memory=1024**3), processes=3, connections=2048
+    )
+
+    # THEN the explicit values win
+    assert (settings.processes, settings.connections) == (3, 2048)
+
+
+def test_config_worker_settings_from_charm_config(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN chaoscenter configured with explicit nginx worker settings
+    state_out = ctx.run(
+        ctx.on.config_changed(),
+        state=State(
+            leader=True,
+            relations={auth_http_api_relation, backend_http_api_relation},
+            containers={nginx_container, nginx_prometheus_exporter_container},
+            config={
+                **user_secrets_config,
+                "nginx_worker_processes": 3,
+                "nginx_worker_connections": 10000,
+            },
+            secrets=[user_secret],
+        ),
+    )
+
+    # WHEN we peek into the generated nginx config
+    config = _generated_config(ctx, state_out, nginx_container.name)
+
+    # THEN the workers are sized accordingly
+    assert "worker_processes 3;" in config
+    assert "worker_connections 10000;" in config
+    assert "worker_rlimit_nofile 20000;" in config
+
+
+@dataclasses.dataclass
+class NginxWork:
+    """What a dispatch had nginx do."""
+
+    renders: int = 0
+    reconciles: int = 0
+    reloads: int = 0
+    certificate_updates: int = 0
+    metrics: Optional[NginxMetrics] = None
+
+
+def _nginx_work(ctx, state, container_name="chaoscenter"):
+    work = NginxWork()
+
+    def render(*args, **kwargs):
+        work.renders += 1
+        return nginx_config.get_config(*args, **kwargs)
+
+    def reconcile(self, *args, **kwargs):
+        work.reconciles += 1
+        return Nginx.reconcile(self, *args, **kwargs)
+
+    ctx.exec_history.clear()
+    with (
+        patch("charm.get_config", new=render),
+        patch.object(CachedNginx, "reconcile", new=reconcile),
+    ):
+        with ctx(ctx.on.config_changed(), state) as mgr:
+            state_out = mgr.run()
+            work.metrics = mgr.charm.nginx.metrics
+    for exec_args in ctx.exec_history.get(container_name, []):
+        if exec_args.command == ["nginx", "-s", "reload"]:
+            work.reloads += 1
+        elif exec_args.command[0] == "update-ca-certificates":
+            work.certificate_updates += 1
+    return state_out, work
+
+
+@pytest.fixture
+def local_ca_cert_path(tmp_path):
+    path = tmp_path / "ca.crt"
+    with patch.object(CachedNginx, "CA_CERT_PATH", str(path)):
+        yield path
+
+
+@pytest.mark.parametrize("tls", (True, False))
+def test_unchanged_config_is_not_pushed_again(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+    local_ca_cert_path,
+    tls,
+):
+    # GIVEN chaoscenter related to backend and auth, with or without TLS
+    state = State(
+        leader=True,
+        relations={auth_http_api_relation, backend_http_api_relation},
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        config=user_secrets_config,
+        secrets=[user_secret],
+    )
+    with patch_cert_and_key_ctx(tls):
+        # WHEN the config is first applied
+        state_out, work = _nginx_work(ctx, state)
+        # THEN it's rendered and applied, and the certificates updated
+        assert (work.renders, work.reconciles, work.certificate_updates) == (1, 1, 1)
+
+        # AND WHEN the charm reconciles again with nothing changed
+        _, work = _nginx_work(ctx, state_out)
+
+    # THEN nothing is rendered, applied, reloaded or updated again
+    assert dataclasses.replace(work, metrics=None) == NginxWork()
+    assert work.metrics == NginxMetrics()
+
+
+def test_changed_config_is_pushed_and_reloaded(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN chaoscenter with its nginx config already applied
+    state = State(
+        leader=True,
+        relations={auth_http_api_relation, backend_http_api_relation},
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        config=user_secrets_config,
+        secrets=[user_secret],
+    )
+    state_out, _ = _nginx_work(ctx, state)
+
+    # WHEN an input of the config changes
+    state_out, work = _nginx_work(
+        ctx,
+        dataclasses.replace(
+            state_out, config={**user_secrets_config, "upstream_keepalive": 8}
+        ),
+    )
+
+    # THEN the config is rendered, applied and reloaded
+    assert (work.renders, work.reconciles, work.reloads) == (1, 1, 1)
+    # AND the charm's metrics account for that work
+    assert work.metrics == NginxMetrics(renders=1, pushes=1, reloads=1)
+    assert "keepalive 8;" in _generated_config(ctx, state_out, nginx_container.name)
+
+
+@patch_cert_and_key_ctx(True)
+def test_missing_local_ca_cert_is_written_again(
+    ctx,
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+    local_ca_cert_path,
+):
+    # GIVEN chaoscenter with TLS already applied
+    state = State(
+        leader=True,
+        relations={auth_http_api_relation, backend_http_api_relation},
+        containers={nginx_container, nginx_prometheus_exporter_container},
+        config=user_secrets_config,
+        secrets=[user_secret],
+    )
+    state_out, _ = _nginx_work(ctx, state)
+    assert local_ca_cert_path.exists()
+
+    # WHEN the charm container restarts, losing the CA certificate written to it
+    local_ca_cert_path.unlink()
+    _nginx_work(ctx, state_out)
+
+    # THEN the CA certificate is written again
+    assert local_ca_cert_path.exists()
+
+
+@pytest.mark.parametrize("tls", (True, False))
+@pytest.mark.parametrize("http2", (True, False))
+def test_config_serves_http2_over_tls(tls, http2):
+    # WHEN we generate the nginx config with or without TLS and HTTP/2
+    config = nginx_config.get_config(
+        hostname="chaoscenter",
+        auth_url="http://auth:3000",
+        backend_url="http://backend:8080",
+        tls_available=tls,
+        http2=http2,
+    )
+
+    # THEN HTTP/2 is only enabled over TLS
+    assert ("http2 on;" in config) is (tls and http2)
@@ -212,3 +212,33 @@ def test_tls_active_status(
 
     # THEN the unit sets active
     assert isinstance(state_out.unit_status, ops.ActiveStatus)
+
+
+def test_invalid_exporter_resources_blocked_status(
+    ctx: Context[LitmusChaoscenterCharm],
+    nginx_container,
+    nginx_prometheus_exporter_container,
+    auth_http_api_relation,
+    backend_http_api_relation,
+    user_secret,
+    user_secrets_config,
+):
+    # GIVEN an exporter memory request above its limit
+    state = State(
+        leader=True,
+        containers=[nginx_container, nginx_prometheus_exporter_container],
+        relations=[auth_http_api_relation, backend_http_api_relation],
+        config={
+            **user_secrets_config,
+            "exporter_memory_request": "1Gi",
+            "exporter_memory_limit": "64Mi",
+        },
+        secrets=[user_secret],
+    )
+
+    # WHEN any event fires
+    state_out = ctx.run(ctx.on.config_changed(), state=state)
+
+    # THEN the unit sets blocked, pointing at the offending option
+    assert isinstance(state_out.unit_status, ops.BlockedStatus)
+    assert "exporter_memory_request" in state_out.unit_status.message
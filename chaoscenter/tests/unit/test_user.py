@@ -191,6 +191,131 @@ class TestReconcileChangedCredentials:
         assert any("invalid secret contents" in m for m in caplog.messages)
 
 
+class TestVerifiedCredentials:
+    """Tests for skipping the verification of credentials already verified."""
+
+    def _make(self, secret, verified, endpoint="http://litmus:8185"):
+        return UserManager(
+            secret_id="secret:abc123",
+            get_secret=MagicMock(return_value=secret),
+            make_client=MagicMock(),
+            endpoint=endpoint,
+            verified_credentials=verified,
+        )
+
+    def test_verified_credentials_are_not_applied_again(self):
+        # GIVEN credentials that were successfully applied in an earlier hook
+        verified = {}
+        secret = _make_secret(VALID_SECRET_CONTENT)
+        with patch.object(UserManager, "_apply_credentials", return_value=True):
+            self._make(secret, verified).reconcile()
+
+        # WHEN a later hook reconciles the same credentials against the same endpoint
+        with patch.object(UserManager, "_apply_credentials") as mock_apply:
+            self._make(secret, verified).reconcile()
+
+        # THEN they aren't applied (nor verified) again
+        mock_apply.assert_not_called()
+
+    def test_failed_apply_is_not_recorded(self):
+        # GIVEN credentials that failed to apply
+        verified = {}
+        secret = _make_secret(VALID_SECRET_CONTENT)
+        with patch.object(UserManager, "_apply_credentials", return_value=False):
+            self._make(secret, verified).reconcile()
+
+        # WHEN a later hook reconciles them
+        with patch.object(UserManager, "_apply_credentials") as mock_apply:
+            self._make(secret, verified).reconcile()
+
+        # THEN they're applied again
+        mock_apply.assert_called_once()
+
+    def test_endpoint_change_triggers_verification(self):
+        # GIVEN credentials verified against an endpoint
+        verified = {}
+        secret = _make_secret(VALID_SECRET_CONTENT)
+        with patch.object(UserManager, "_apply_credentials", return_value=True):
+            self._make(secret, verified).reconcile()
+
+        # WHEN the endpoint changes
+        with patch.object(UserManager, "_apply_credentials") as mock_apply:
+            self._make(secret, verified, endpoint="https://litmus:8185").reconcile()
+
+        # THEN the credentials are verified again
+        mock_apply.assert_called_once()
+
+    def test_new_secret_revision_is_recorded_once_applied(self):
+        # GIVEN a secret whose new revision gets successfully applied
+        verified = {}
+        new_content = {"admin-password": "NewAdmin1!", "charm-password": "NewCharm1!"}
+        with patch.object(UserManager, "_apply_credentials", return_value=True):
+            self._make(
+                _make_secret(current=VALID_SECRET_CONTENT, next_=new_content),
+                verified,
+            ).reconcile()
+
+        # WHEN a later hook reconciles the (now tracked) new revision
+        with patch.object(UserManager, "_apply_credentials") as mock_apply:
+            self._make(_make_secret(new_content), verified).reconcile()
+
+        # THEN it isn't applied again
+        mock_apply.assert_not_called()
+
+    def test_forgotten_credentials_are_verified_again(self):
+        # GIVEN verified credentials that the API later refused
+        verified = {}
+        secret = _make_secret(VALID_SECRET_CONTENT)
+        with patch.object(UserManager, "_apply_credentials", return_value=True):
+            self._make(secret, verified).reconcile()
+        self._make(secret, verified).forget_verified_credentials()
+
+        # WHEN a later hook reconciles them
+        with patch.object(UserManager, "_apply_credentials") as mock_apply:
+            self._make(secret, verified).reconcile()
+
+        # THEN they're verified again
+        mock_apply.assert_called_once()
+
+    def test_nothing_derived_from_the_credentials_is_recorded(self):
+        # GIVEN a record left by an earlier charm revision, holding a digest of the credentials
+        verified = {"fingerprint": "0123abcd"}
+        new_content = {"admin-password": "NewAdmin1!", "charm-password": "NewCharm1!"}
+
+        # WHEN a new revision of the secret gets successfully applied
+        with patch.object(UserManager, "_apply_credentials", return_value=True):
+            self._make(
+                _make_secret(current=VALID_SECRET_CONTENT, next_=new_content),
+                verified,
+            ).reconcile()
+
+        # THEN only the secret ID, the revisions moved on to and the endpoint are recorded
+        assert verified == {
+            "refreshes": 1,
+            "verified": "secret:abc123#1@http://litmus:8185",
+        }
+
+    def test_secret_fingerprint_tracks_revisions_not_contents(self):
+        # GIVEN a tracked secret revision
+        verified = {}
+        secret = _make_secret(VALID_SECRET_CONTENT)
+        fingerprint = self._make(secret, verified).secret_fingerprint
+
+        # WHEN a newer revision gets published
+        new_content = {"admin-password": "NewAdmin1!", "charm-password": "NewCharm1!"}
+        updated = _make_secret(current=VALID_SECRET_CONTENT, next_=new_content)
+        pending = self._make(updated, verified).secret_fingerprint
+
+        # AND it gets applied
+        with patch.object(UserManager, "_apply_credentials", return_value=True):
+            self._make(updated, verified).reconcile()
+        applied = self._make(_make_secret(new_content), verified).secret_fingerprint
+
+        # THEN the fingerprint changes each time, without depending on the contents
+        assert len({fingerprint, pending, applied}) == 3
+        assert applied == "secret:abc123#1"
+
+
 class TestValidateSecretContent:
     """Tests for _validate_secret_content."""
 
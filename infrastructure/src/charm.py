@@ -10,8 +10,8 @@ from opentelemetry import trace
 
 from ops.charm import CharmBase
 
-from cosl.reconciler import all_events, observe_events
 from ops import ActiveStatus, CollectStatusEvent
+from litmus_libs import TieredReconciler
 from litmus_libs.status_manager import StatusManager
 from litmus_libs.interfaces.litmus_infrastructure import (
     LitmusInfrastructureProvider,
@@ -53,7 +53,16 @@ class LitmusInfrastructureCharm(CharmBase):
             self.on.collect_unit_status, self._on_collect_unit_status
         )
 
-        observe_events(self, all_events, self._reconcile)
+        # update-status has nothing to do here: all the state we manage is persisted
+        self._reconciler = TieredReconciler(
+            self,
+            full=self._reconcile,
+            relation_handlers={
+                "charm-tracing": self._reconcile_charm_tracing,
+                # the trusted certs are also used to send charm traces
+                "receive-ca-certs": self._reconcile_certs_and_tracing,
+            },
+        )
 
     ##################
     # EVENT HANDLERS #
@@ -78,8 +87,7 @@ class LitmusInfrastructureCharm(CharmBase):
 
     def _reconcile(self):
         """Run all logic that is independent of what event we're processing."""
-        self._reconcile_trusted_certs()
-        self._reconcile_charm_tracing()
+        self._reconcile_certs_and_tracing()
 
         if self.unit.is_leader():
             self._infra_provider.publish_data(
@@ -90,6 +98,10 @@ class LitmusInfrastructureCharm(CharmBase):
                 )
             )
 
+    def _reconcile_certs_and_tracing(self):
+        self._reconcile_trusted_certs()
+        self._reconcile_charm_tracing()
+
     def _reconcile_trusted_certs(self):
         if certificates := self._trusted_ca_certs:
             curr = (
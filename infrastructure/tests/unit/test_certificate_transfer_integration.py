@@ -15,7 +15,7 @@ def test_ca_certs_write_on_disk(mock_run, ctx, mock_cert_path):
 
     # WHEN any event is fired
     with patch("charm.TRUSTED_CA_CERT_PATH", mock_cert_path):
-        ctx.run(ctx.on.update_status(), state)
+        ctx.run(ctx.on.config_changed(), state)
 
     # THEN verify that the certs have been written to disk
     assert mock_cert_path.read_text() == "cert1\ncert2"
@@ -37,7 +37,7 @@ def test_ca_certs_removed_when_relation_empty(ctx, mock_cert_path):
 
     # WHEN any event is fired
     with patch("charm.TRUSTED_CA_CERT_PATH", mock_cert_path):
-        ctx.run(ctx.on.update_status(), state)
+        ctx.run(ctx.on.config_changed(), state)
 
     # THEN the certificate file is removed from the disk
     assert not mock_cert_path.exists()
@@ -58,10 +58,45 @@ def test_ca_certs_idempotency(mock_run, ctx, mock_cert_path):
 
     # WHEN any event is fired
     with patch("charm.TRUSTED_CA_CERT_PATH", mock_cert_path):
-        ctx.run(ctx.on.update_status(), state)
+        ctx.run(ctx.on.config_changed(), state)
 
     # THEN verify that the file content remains unchanged
     assert mock_cert_path.read_text() == "cert1\ncert2"
 
     # AND verify that update-ca-certificates was NOT called
     mock_run.assert_not_called()
+
+
+@patch("subprocess.run")
+def test_ca_certs_written_on_relation_changed(mock_run, ctx, mock_cert_path):
+    # GIVEN a a charm integrated over receive-ca-certs relation
+    certs_rel = Relation(
+        endpoint="receive-ca-certs",
+        remote_app_data={"certificates": json.dumps(["cert1"])},
+    )
+    state = State(relations={certs_rel})
+
+    # WHEN the relation changes
+    with patch("charm.TRUSTED_CA_CERT_PATH", mock_cert_path):
+        ctx.run(ctx.on.relation_changed(certs_rel), state)
+
+    # THEN the certs are written to disk
+    assert mock_cert_path.read_text() == "cert1"
+
+
+@patch("subprocess.run")
+def test_update_status_does_not_touch_ca_certs(mock_run, ctx, mock_cert_path):
+    # GIVEN a a charm integrated over receive-ca-certs relation
+    certs_rel = Relation(
+        endpoint="receive-ca-certs",
+        remote_app_data={"certificates": json.dumps(["cert1"])},
+    )
+    state = State(relations={certs_rel})
+
+    # WHEN update-status fires
+    with patch("charm.TRUSTED_CA_CERT_PATH", mock_cert_path):
+        ctx.run(ctx.on.update_status(), state)
+
+    # THEN nothing is written to disk
+    assert not mock_cert_path.exists()
+    mock_run.assert_not_called()
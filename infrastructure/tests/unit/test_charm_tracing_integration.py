@@ -32,7 +32,7 @@ def test_charm_tracing(mock_set_destination, ctx, mock_cert_path, tls):
 
     # WHEN any event is fired
     with patch("charm.TRUSTED_CA_CERT_PATH", mock_cert_path):
-        ctx.run(ctx.on.update_status(), state)
+        ctx.run(ctx.on.config_changed(), state)
 
     # THEN verify that tracing is configured with the correct URL
     # AND the CA is provided ONLY when tls was True
@@ -3,14 +3,39 @@
 
 """Utilities to work with litmus."""
 
-from .models import DatabaseConfig, TLSConfigData
+from .caching import CacheStats, cache_stats, dispatch_cached, invalidate
+from .hook_calls import CallStats, HookCallAccounting
+from .k8s_resources import ContainerResources, InvalidResourcesError, StatefulSetResourcesPatch
+from .models import DatabaseConfig, GoRuntimeConfig, ResourceLimits, TLSConfigData
+from .reconciler import TieredReconciler
 from .tls_reconciler import TlsReconciler
-from .utils import get_app_hostname, get_litmus_version
+from .utils import (
+    get_app_hostname,
+    get_container_resource_limits,
+    get_headless_hostname,
+    get_litmus_version,
+    go_runtime_env,
+)
 
 __all__ = [
+    "CacheStats",
+    "CallStats",
+    "ContainerResources",
     "DatabaseConfig",
+    "GoRuntimeConfig",
+    "HookCallAccounting",
+    "InvalidResourcesError",
+    "ResourceLimits",
+    "StatefulSetResourcesPatch",
     "TLSConfigData",
+    "TieredReconciler",
     "TlsReconciler",
+    "cache_stats",
+    "dispatch_cached",
     "get_app_hostname",
+    "get_container_resource_limits",
+    "get_headless_hostname",
     "get_litmus_version",
+    "go_runtime_env",
+    "invalidate",
 ]
@@ -0,0 +1,89 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Dispatch-scoped memoization for charm properties."""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar, overload
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# attributes on the cached object's __dict__ holding the cached values and their counters
+_CACHE_ATTR = "_dispatch_cache"
+_STATS_ATTR = "_dispatch_cache_stats"
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters of a dispatch-cached property."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+class dispatch_cached(Generic[T]):  # noqa: N801  # lowercase, like functools.cached_property
+    """Like ``functools.cached_property``, but with hit/miss counters and explicit invalidation.
+
+    Values are stored on the instance, and ops instantiates the charm once per dispatch,
+    so a charm property decorated with this is computed at most once per hook,
+    unless it's invalidated in between (e.g. after an action that changes its inputs).
+
+    Usage:
+    >>> class MyCharm(ops.CharmBase):
+    ...    @dispatch_cached
+    ...    def _tls_config(self) -> Optional[TLSConfigData]:
+    ...        ...  # expensive
+    ...
+    ...    def _reconcile(self):
+    ...        self._tls_certificates.sync()
+    ...        invalidate(self, "_tls_config")
+    """
+
+    def __init__(self, func: Callable[[Any], T]):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str):
+        """Cache under the attribute name the descriptor is assigned to."""
+        self.name = name
+
+    @overload
+    def __get__(self, obj: None, objtype: Optional[type] = None) -> "dispatch_cached[T]": ...
+
+    @overload
+    def __get__(self, obj: object, objtype: Optional[type] = None) -> T: ...
+
+    def __get__(
+        self, obj: Optional[object], objtype: Optional[type] = None
+    ) -> "dispatch_cached[T] | T":
+        """Return the cached value, computing it on first access."""
+        if obj is None:
+            return self
+        cache: Dict[str, Any] = obj.__dict__.setdefault(_CACHE_ATTR, {})
+        all_stats: Dict[str, CacheStats] = obj.__dict__.setdefault(_STATS_ATTR, {})
+        stats = all_stats.setdefault(self.name, CacheStats())
+        if self.name in cache:
+            stats.hits += 1
+            return cache[self.name]
+        stats.misses += 1
+        value = cache[self.name] = self.func(obj)
+        return value
+
+
+def invalidate(obj: object, *names: str) -> None:
+    """Drop the cached values of the given dispatch-cached properties, or all of them if none is given."""
+    cache: Dict[str, Any] = obj.__dict__.get(_CACHE_ATTR, {})
+    if not names:
+        cache.clear()
+        return
+    for name in names:
+        cache.pop(name, None)
+
+
+def cache_stats(obj: object) -> Dict[str, CacheStats]:
+    """Return the hit and miss counters of each dispatch-cached property accessed on this object."""
+    return dict(obj.__dict__.get(_STATS_ATTR, {}))
@@ -0,0 +1,141 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Per-dispatch accounting of hook tool and Pebble calls."""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+import ops
+from opentelemetry import trace
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class CallStats:
+    """How many times a call was made in this dispatch, and how long it took in total."""
+
+    calls: int = 0
+    coalesced: int = 0
+    seconds: float = 0.0
+
+
+class HookCallAccounting(ops.Object):
+    """Count, time and coalesce the hook tool and Pebble calls a charm makes in a dispatch.
+
+    Only the calls the charm routes through ``call`` (or helpers like ``can_connect``) are
+    accounted for: ops is left alone. Identical read-only calls (``self.model.get_secret(...)``,
+    ``Container.can_connect()``, ...) are only made once per dispatch: later ones are answered
+    with the same result, until the charm makes a call that could change it (any call that isn't
+    read-only), which invalidates them. Failed calls are never coalesced: the next identical call
+    is made again.
+
+    A summary of the dispatch is logged and attached to a trace span on framework commit.
+
+    Usage:
+    >>> class MyCharm(ops.CharmBase):
+    ...    def __init__(self, *args):
+    ...        super().__init__(*args)
+    ...        self._hook_calls = HookCallAccounting(self)
+    ...
+    ...    def _get_secret(self, secret_id: str) -> ops.Secret:
+    ...        return self._hook_calls.call(
+    ...            "secret_get", self.model.get_secret, id=secret_id, read_only=True
+    ...        )
+    """
+
+    def __init__(self, charm: ops.CharmBase, coalesce: bool = True):
+        super().__init__(charm, "hook-call-accounting")
+        self._coalesce = coalesce
+        self._stats: Dict[str, CallStats] = {}
+        self._cache: Dict[Hashable, Any] = {}
+
+        self.framework.observe(self.framework.on.commit, self._on_commit)
+
+    @property
+    def stats(self) -> Dict[str, CallStats]:
+        """The stats of each call made so far in this dispatch, by call name."""
+        return dict(self._stats)
+
+    def call(
+        self,
+        name: str,
+        func: Callable[..., _T],
+        *args: Any,
+        read_only: bool = False,
+        **kwargs: Any,
+    ) -> _T:
+        """Make the ``func(*args, **kwargs)`` call, accounted for as ``name``.
+
+        Coalesced calls return the very object the first one did: don't mutate it.
+        """
+        stats = self._stats.setdefault(name, CallStats())
+        key = _cache_key(name, args, kwargs) if self._coalesce and read_only else None
+        if key is not None and key in self._cache:
+            stats.coalesced += 1
+            return self._cache[key]
+
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            stats.calls += 1
+            stats.seconds += time.monotonic() - start
+
+        if key is not None:
+            self._cache[key] = result
+        elif not read_only:
+            self._cache.clear()
+        return result
+
+    def can_connect(self, container: ops.Container) -> bool:
+        """Whether we can connect to the Pebble of this container."""
+        return self.call(
+            f"pebble.{container.name}.can_connect", container.can_connect, read_only=True
+        )
+
+    def _on_commit(self, _: ops.EventBase):
+        used = {
+            name: stats for name, stats in self._stats.items() if stats.calls or stats.coalesced
+        }
+        if not used:
+            return
+        total_calls = sum(stats.calls for stats in used.values())
+        total_coalesced = sum(stats.coalesced for stats in used.values())
+        total_seconds = sum(stats.seconds for stats in used.values())
+        logger.debug(
+            "hook calls: %d made (%.3fs), %d coalesced; %s",
+            total_calls,
+            total_seconds,
+            total_coalesced,
+            ", ".join(
+                f"{name}={stats.calls}+{stats.coalesced} ({stats.seconds:.3f}s)"
+                for name, stats in sorted(
+                    used.items(), key=lambda item: item[1].seconds, reverse=True
+                )
+            ),
+        )
+        with tracer.start_as_current_span("hook calls") as span:
+            span.set_attribute("calls", total_calls)
+            span.set_attribute("coalesced", total_coalesced)
+            span.set_attribute("seconds", total_seconds)
+            for name, stats in used.items():
+                span.set_attribute(f"{name}.calls", stats.calls)
+                span.set_attribute(f"{name}.coalesced", stats.coalesced)
+                span.set_attribute(f"{name}.seconds", stats.seconds)
+
+
+def _cache_key(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[Hashable]:
+    """A hashable key for this call, or None if its arguments can't be hashed."""
+    key: Tuple[Any, ...] = (name, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
@@ -16,17 +16,39 @@ logger = logging.getLogger()
 
 @dataclass
 class Endpoint:
-    """User-facing data model representing a gRPC server endpoint."""
+    """User-facing data model representing a gRPC server endpoint.
+
+    ``grpc_server_host`` is the address of a service load balancing connections over all server
+    units. gRPC clients keep their connections open, so behind it each client sticks to a single
+    unit; if ``grpc_server_headless_host`` is also set, it resolves to the addresses of all units
+    instead (see ``grpc_dial_host``).
+
+    With gRPC's default ``pick_first`` policy, a client dialing the headless host still uses a
+    single connection, to one of the units. Only clients configured for the ``round_robin``
+    policy (e.g. ``{"loadBalancingConfig": [{"round_robin": {}}]}`` as their service config)
+    spread their calls over all the units.
+    """
 
     grpc_server_host: str
     grpc_server_port: int
     insecure: bool = False
+    grpc_server_headless_host: Optional[str] = None
+
+    @property
+    def grpc_dial_host(self) -> str:
+        """The host a gRPC client should dial, in gRPC name syntax."""
+        if self.grpc_server_headless_host:
+            # gRPC's DNS resolver knows all the A records: a round_robin client connects to all
+            # of them, a pick_first one to the first, as ordered by the cluster DNS
+            return f"dns:///{self.grpc_server_headless_host}"
+        return self.grpc_server_host
 
 
 class _EndpointModel(pydantic.BaseModel):
     grpc_server_host: str
     grpc_server_port: int
     insecure: bool = False
+    grpc_server_headless_host: Optional[str] = None
 
 
 class _LitmusAuthProviderAppDatabagModelV0(BaseVersionedModel, _EndpointModel):
@@ -97,6 +119,7 @@ class LitmusAuthProvider(SimpleEndpointWrapper):
                 grpc_server_host=data.grpc_server_host,
                 grpc_server_port=data.grpc_server_port,
                 insecure=data.insecure,
+                grpc_server_headless_host=data.grpc_server_headless_host,
             )
             if data
             else None
@@ -161,6 +184,7 @@ class LitmusAuthRequirer(SimpleEndpointWrapper):
                 grpc_server_host=data.grpc_server_host,
                 grpc_server_port=data.grpc_server_port,
                 insecure=data.insecure,
+                grpc_server_headless_host=data.grpc_server_headless_host,
             )
             if data
             else None
@@ -0,0 +1,237 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Kubernetes compute resource requests and limits of a charm's workload containers."""
+
+import hashlib
+import json
+import logging
+import re
+from dataclasses import asdict, dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Mapping, MutableMapping, Optional
+
+from lightkube import ApiError, Client
+from lightkube.core.exceptions import ConfigError
+from lightkube.resources.apps_v1 import StatefulSet
+from lightkube.types import PatchType
+
+logger = logging.getLogger(__name__)
+
+# https://kubernetes.io/docs/reference/kubernetes-api/common-definitions/quantity/
+_QUANTITY_RE = re.compile(r"^(?P<number>[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?P<suffix>[a-zA-Z]*)$")
+_QUANTITY_SUFFIXES = {
+    "": Decimal(1),
+    "m": Decimal("0.001"),
+    "k": Decimal(10) ** 3,
+    "M": Decimal(10) ** 6,
+    "G": Decimal(10) ** 9,
+    "T": Decimal(10) ** 12,
+    "Ki": Decimal(2) ** 10,
+    "Mi": Decimal(2) ** 20,
+    "Gi": Decimal(2) ** 30,
+    "Ti": Decimal(2) ** 40,
+}
+
+
+class InvalidResourcesError(ValueError):
+    """Raised if the configured resource requests and limits aren't valid."""
+
+
+def parse_quantity(value: str) -> Decimal:
+    """Parse a Kubernetes quantity, like '500m' or '1Gi', to its value in base units.
+
+    Raises:
+        InvalidResourcesError: If the value isn't a valid quantity.
+    """
+    match = _QUANTITY_RE.match(value.strip())
+    if not match or match.group("suffix") not in _QUANTITY_SUFFIXES:
+        raise InvalidResourcesError(f"{value!r} is not a valid Kubernetes quantity")
+    try:
+        return Decimal(match.group("number")) * _QUANTITY_SUFFIXES[match.group("suffix")]
+    except InvalidOperation as e:
+        raise InvalidResourcesError(f"{value!r} is not a valid Kubernetes quantity") from e
+
+
+@dataclass(frozen=True)
+class ContainerResources:
+    """CPU and memory requests and limits of a container, as Kubernetes quantities.
+
+    None means the container doesn't request, or isn't limited to, any specific amount.
+    """
+
+    cpu_request: Optional[str] = None
+    cpu_limit: Optional[str] = None
+    memory_request: Optional[str] = None
+    memory_limit: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], prefix: str = "") -> "ContainerResources":
+        """Build from the ``{prefix}cpu_request``, ``{prefix}cpu_limit``, ... charm config options.
+
+        Empty options are unset.
+
+        Raises:
+            InvalidResourcesError: If a value isn't a valid quantity, or a request exceeds its limit.
+        """
+        values: Dict[str, Optional[str]] = {}
+        for field in ("cpu_request", "cpu_limit", "memory_request", "memory_limit"):
+            value = str(config.get(f"{prefix}{field}") or "").strip()
+            if value:
+                try:
+                    parse_quantity(value)
+                except InvalidResourcesError as e:
+                    raise InvalidResourcesError(f"{prefix}{field}: {e}") from e
+            values[field] = value or None
+
+        resources = cls(**values)
+        for resource in ("cpu", "memory"):
+            request = getattr(resources, f"{resource}_request")
+            limit = getattr(resources, f"{resource}_limit")
+            if request and limit and parse_quantity(request) > parse_quantity(limit):
+                raise InvalidResourcesError(
+                    f"{prefix}{resource}_request ({request}) exceeds {prefix}{resource}_limit ({limit})"
+                )
+        return resources
+
+    def to_requirements(self) -> Dict[str, Dict[str, str]]:
+        """Convert to the ``resources`` field of a Kubernetes container spec."""
+        requirements: Dict[str, Dict[str, str]] = {}
+        for kind, cpu, memory in (
+            ("requests", self.cpu_request, self.memory_request),
+            ("limits", self.cpu_limit, self.memory_limit),
+        ):
+            quantities = {
+                name: value for name, value in (("cpu", cpu), ("memory", memory)) if value
+            }
+            if quantities:
+                requirements[kind] = quantities
+        return requirements
+
+
+def _same_requirements(current: Mapping[str, Any], desired: Mapping[str, Any]) -> bool:
+    """Compare two container ``resources`` fields, by value: Kubernetes normalizes quantities."""
+    for kind in ("requests", "limits"):
+        current_quantities: Mapping[str, Any] = current.get(kind) or {}
+        desired_quantities: Mapping[str, str] = desired.get(kind) or {}
+        if set(current_quantities) != set(desired_quantities):
+            return False
+        for name, value in desired_quantities.items():
+            if parse_quantity(str(current_quantities[name])) != parse_quantity(value):
+                return False
+    return True
+
+
+class StatefulSetResourcesPatch:
+    """Patch the StatefulSet of a charm, setting the resource requests and limits of its containers.
+
+    Kubernetes recreates the pods whenever their template changes, so the StatefulSet is only
+    patched if the resources actually differ from what it already has. Only the leader should
+    patch it, and the charm must be trusted (``juju deploy --trust``).
+
+    The StatefulSet is read back on every reconcile, since Juju rewrites it on ``juju refresh``
+    and may drop the resources set on it. Until some resources are configured, Kubernetes isn't
+    asked at all; whether they ever were is kept in ``state``, if given.
+
+    Usage:
+    >>> StatefulSetResourcesPatch(self.app.name, self.model.name, self._stored.resources).reconcile(
+    ...     {"workload": ContainerResources.from_config(self.config)}
+    ... )
+    """
+
+    def __init__(
+        self,
+        statefulset_name: str,
+        namespace: str,
+        state: Optional[MutableMapping[str, str]] = None,
+    ):
+        self._statefulset_name = statefulset_name
+        self._namespace = namespace
+        self._state: MutableMapping[str, str] = state if state is not None else {}
+
+    def reconcile(self, resources: Mapping[str, ContainerResources]) -> bool:
+        """Set the resources of the given containers, by name; return whether it patched anything."""
+        digest = hashlib.sha256(
+            json.dumps({name: asdict(r) for name, r in resources.items()}, sort_keys=True).encode()
+        ).hexdigest()
+        if "digest" not in self._state and not any(
+            r.to_requirements() for r in resources.values()
+        ):
+            # never configured: leave the resources Juju created the StatefulSet with alone
+            return False
+
+        patched = self._patch(resources)
+        if patched is not None:
+            self._state["digest"] = digest
+        return bool(patched)
+
+    def _patch(self, resources: Mapping[str, ContainerResources]) -> Optional[bool]:
+        """Patch the StatefulSet if needed; return whether it did, or None if it failed to."""
+        try:
+            client = Client(field_manager=self._statefulset_name)
+            statefulset = client.get(
+                StatefulSet, name=self._statefulset_name, namespace=self._namespace
+            )
+        except ConfigError as e:
+            logger.warning("cannot reach Kubernetes to set container resources: %s", e)
+            return None
+        except ApiError as e:
+            logger.warning(
+                "cannot get StatefulSet %s to set container resources (is the charm trusted?): %s",
+                self._statefulset_name,
+                e,
+            )
+            return None
+
+        current: Dict[str, Dict[str, Any]] = {
+            container.name: (container.resources.to_dict() if container.resources else {})
+            for container in statefulset.spec.template.spec.containers  # type: ignore[union-attr]
+        }
+        patches: List[Dict[str, Any]] = []
+        for name, container_resources in resources.items():
+            if name not in current:
+                logger.warning("no container %s in StatefulSet %s", name, self._statefulset_name)
+                continue
+            desired = container_resources.to_requirements()
+            if _same_requirements(current[name], desired):
+                continue
+            patches.append({"name": name, "resources": _strategic_merge(current[name], desired)})
+        if not patches:
+            return False
+
+        logger.info(
+            "setting resources of containers %s; pods will be restarted",
+            ", ".join(patch["name"] for patch in patches),
+        )
+        try:
+            # lightkube types the patch as a bare Dict
+            client.patch(  # pyright: ignore[reportUnknownMemberType]
+                StatefulSet,
+                name=self._statefulset_name,
+                namespace=self._namespace,
+                obj={"spec": {"template": {"spec": {"containers": patches}}}},
+                patch_type=PatchType.STRATEGIC,
+            )
+        except ApiError as e:
+            logger.warning("failed to patch StatefulSet %s: %s", self._statefulset_name, e)
+            return None
+        return True
+
+
+def _strategic_merge(current: Mapping[str, Any], desired: Mapping[str, Any]) -> Dict[str, Any]:
+    """Build a strategic merge patch turning the ``current`` resources into the ``desired`` ones.
+
+    Quantities that are no longer wanted are nulled, which deletes them.
+    """
+    patch: Dict[str, Any] = {}
+    for kind in ("requests", "limits"):
+        current_quantities: Mapping[str, Any] = current.get(kind) or {}
+        desired_quantities: Mapping[str, str] = desired.get(kind) or {}
+        if not desired_quantities:
+            patch[kind] = None
+            continue
+        patch[kind] = {
+            **{name: None for name in current_quantities if name not in desired_quantities},
+            **desired_quantities,
+        }
+    return patch
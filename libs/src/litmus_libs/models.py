@@ -4,6 +4,7 @@
 """Database Config class."""
 
 from dataclasses import dataclass
+from typing import Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -28,3 +29,25 @@ class TLSConfigData:
     server_cert: str
     private_key: str
     ca_cert: str
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """CPU and memory limits of a container; None means unlimited (or unknown)."""
+
+    cpu: Optional[float] = None
+    """Number of CPUs."""
+    memory: Optional[int] = None
+    """Bytes."""
+
+
+@dataclass(frozen=True)
+class GoRuntimeConfig:
+    """Go runtime tuning of a Go workload; zeroes mean "derive from the container's limits"."""
+
+    gomaxprocs: int = 0
+    """Number of OS threads running Go code; by default, the CPU limit rounded up."""
+    gomemlimit_percent: int = 90
+    """Soft memory limit, as a percentage of the memory limit; 0 to leave it unset."""
+    gogc: int = 0
+    """Garbage collection target percentage; 0 for the Go default, -1 to only collect at GOMEMLIMIT."""
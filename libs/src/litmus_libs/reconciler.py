@@ -0,0 +1,78 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Event-aware reconciler for Litmus charms."""
+
+import logging
+from typing import Callable, Iterable, Mapping, Optional, Type
+
+import ops
+from cosl.reconciler import all_events, observe_events
+
+from .caching import cache_stats, invalidate
+
+logger = logging.getLogger(__name__)
+
+
+class TieredReconciler(ops.Object):
+    """Route each event to the tier of reconcile logic that it can affect.
+
+    - update-status runs the ``light`` handler, if any: cheap health checks only.
+      Statuses are collected on every event regardless, by collect-status observers.
+    - relation events on an endpoint listed in ``relation_handlers`` run the matching handler.
+    - any other event (install, upgrade, leader changes, config changes, pebble events, ...)
+      runs the ``full`` reconcile.
+
+    Dispatch-cached charm properties are invalidated before each run, so that the handler sees
+    whatever the charm libraries' own observers changed earlier in the dispatch.
+
+    Like any ops.Object, it must be kept referenced by the charm, or it won't see any event.
+
+    Usage:
+    >>> class MyCharm(ops.CharmBase):
+    ...    def __init__(self, *args):
+    ...        super().__init__(*args)
+    ...        self._reconciler = TieredReconciler(
+    ...            self,
+    ...            full=self._reconcile,
+    ...            light=self._check_health,
+    ...            relation_handlers={"logging": self._reconcile_self_monitoring},
+    ...        )
+    """
+
+    def __init__(
+        self,
+        charm: ops.CharmBase,
+        full: Callable[[], None],
+        light: Optional[Callable[[], None]] = None,
+        relation_handlers: Optional[Mapping[str, Callable[[], None]]] = None,
+        events: Iterable[Type[ops.EventBase]] = all_events,
+    ):
+        super().__init__(charm, "tiered-reconciler")
+        self._charm = charm
+        self._full = full
+        self._light = light
+        self._relation_handlers = dict(relation_handlers or {})
+        for endpoint in self._relation_handlers:
+            if endpoint not in charm.meta.relations:
+                raise ValueError(f"Charm metadata has no endpoint named {endpoint!r}")
+        observe_events(charm, events, self._on_event)
+
+    def _handler_for(self, event: ops.EventBase) -> tuple[str, Optional[Callable[[], None]]]:
+        if isinstance(event, ops.UpdateStatusEvent):
+            return "light", self._light
+        if isinstance(event, ops.RelationEvent):
+            handler = self._relation_handlers.get(event.relation.name)
+            if handler is not None:
+                return f"{event.relation.name} relation", handler
+        return "full", self._full
+
+    def _on_event(self, event: ops.EventBase) -> None:
+        tier, handler = self._handler_for(event)
+        logger.debug("%s: running %s reconcile", type(event).__name__, tier)
+        if handler is None:
+            return
+        invalidate(self._charm)
+        handler()
+        for name, stats in cache_stats(self._charm).items():
+            logger.debug("%s: %d hits, %d misses", name, stats.hits, stats.misses)
@@ -4,11 +4,14 @@
 """Collection of helper functions used across the litmus charms."""
 
 import logging
+import math
 import socket
-from typing import Optional
+from typing import Dict, Optional
 
 from ops import Container
 
+from .models import GoRuntimeConfig, ResourceLimits
+
 logger = logging.getLogger()
 
 
@@ -32,6 +35,21 @@ def get_app_hostname(app_name: str, model_name: str) -> str:
     return f"{app_name}.{model_name}.{dns_name}"  # 'app.model.svc.cluster.local'
 
 
+def get_headless_hostname() -> str:
+    """Return the FQDN of the headless k8s service associated with this application.
+
+    It resolves to the addresses of all application units, rather than to a single virtual IP.
+    Falls back to this unit's DNS name if the hostname does not resolve to a Kubernetes-style fqdn.
+    """
+    hostname = socket.getfqdn()
+    # hostname is expected to look like: 'app-0.app-endpoints.default.svc.cluster.local'
+    hostname_parts = hostname.split(".")
+    if "svc" not in hostname_parts or hostname_parts.index("svc") < 3:
+        logger.debug(f"expected K8s-style fqdn, but got {hostname} instead")
+        return hostname
+    return ".".join(hostname_parts[1:])  # 'app-endpoints.default.svc.cluster.local'
+
+
 def get_litmus_version(container: Container) -> Optional[str]:
     """Get the running litmus version.
 
@@ -54,3 +72,72 @@ def get_litmus_version(container: Container) -> Optional[str]:
 
     logger.warning("Version not found at %s or %s", version_file_path, rock_metadata_path)
     return None
+
+
+# cgroup v2 files, then their cgroup v1 equivalents
+_CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+_CGROUP_V2_MEMORY_MAX = "/sys/fs/cgroup/memory.max"
+_CGROUP_V1_CPU_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+_CGROUP_V1_CPU_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+_CGROUP_V1_MEMORY_LIMIT = "/sys/fs/cgroup/memory/memory.limit_in_bytes"
+# cgroup v1 reports "no limit" as a huge number rather than "max"
+_CGROUP_V1_UNLIMITED_MEMORY = 1 << 62
+
+
+def get_container_resource_limits(container: Container) -> ResourceLimits:
+    """Get the CPU and memory limits Kubernetes put on a workload container.
+
+    Reads the container's cgroup (v2, or v1 as a fallback) through Pebble.
+    Limits that aren't set, or can't be read, are None.
+    """
+    if not container.can_connect():
+        return ResourceLimits()
+
+    def _read(path: str) -> Optional[str]:
+        try:
+            return container.pull(path, encoding="utf-8").read().strip()
+        except Exception:
+            return None
+
+    cpu: Optional[float] = None
+    memory: Optional[int] = None
+    try:
+        if (cpu_max := _read(_CGROUP_V2_CPU_MAX)) is not None:
+            quota, period = cpu_max.split()
+            if quota != "max":
+                cpu = int(quota) / int(period)
+        elif (quota := _read(_CGROUP_V1_CPU_QUOTA)) and int(quota) > 0:
+            cpu = int(quota) / int(_read(_CGROUP_V1_CPU_PERIOD) or 100000)
+
+        if (memory_max := _read(_CGROUP_V2_MEMORY_MAX)) is not None:
+            memory = None if memory_max == "max" else int(memory_max)
+        elif (limit := _read(_CGROUP_V1_MEMORY_LIMIT)) is not None:
+            memory = int(limit) if int(limit) < _CGROUP_V1_UNLIMITED_MEMORY else None
+    except ValueError:
+        logger.warning("unexpected cgroup contents in container %s", container.name)
+    return ResourceLimits(cpu=cpu, memory=memory)
+
+
+def go_runtime_env(config: GoRuntimeConfig, limits: ResourceLimits) -> Dict[str, str]:
+    """Get the environment variables tuning the Go runtime of a workload to its container limits.
+
+    Left alone, the Go runtime sizes itself to the whole node: it schedules goroutines on every
+    host core, exhausting the CFS quota early in each period, and only collects garbage once the
+    heap doubled, regardless of how close to the memory limit (and the OOM killer) that is.
+    """
+    env: Dict[str, str] = {}
+    if config.gomaxprocs > 0:
+        env["GOMAXPROCS"] = str(config.gomaxprocs)
+    elif limits.cpu:
+        env["GOMAXPROCS"] = str(max(1, math.ceil(limits.cpu)))
+
+    if limits.memory and config.gomemlimit_percent > 0:
+        # leave the rest of the limit to non-heap memory (stacks, cgo, the page cache, ...)
+        mib = limits.memory * min(config.gomemlimit_percent, 100) // 100 // 1024**2
+        env["GOMEMLIMIT"] = f"{max(1, mib)}MiB"
+
+    if config.gogc > 0:
+        env["GOGC"] = str(config.gogc)
+    elif config.gogc < 0:
+        env["GOGC"] = "off"
+    return env
@@ -0,0 +1,87 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+from unittest.mock import MagicMock
+
+from litmus_libs.caching import CacheStats, cache_stats, dispatch_cached, invalidate
+
+
+def _make(compute_a=None, compute_b=None):
+    compute_a = compute_a or MagicMock(return_value="a")
+    compute_b = compute_b or MagicMock(return_value="b")
+
+    class Foo:
+        @dispatch_cached
+        def a(self):
+            return compute_a()
+
+        @dispatch_cached
+        def b(self):
+            return compute_b()
+
+    return Foo(), compute_a, compute_b
+
+
+def test_value_computed_once_per_instance():
+    # GIVEN an object with a dispatch-cached property
+    foo, compute_a, _ = _make()
+
+    # WHEN the property is accessed several times
+    values = [foo.a for _ in range(3)]
+
+    # THEN it's only computed once
+    assert values == ["a", "a", "a"]
+    compute_a.assert_called_once()
+    # AND the counters reflect it
+    assert cache_stats(foo) == {"a": CacheStats(hits=2, misses=1)}
+
+
+def test_cache_not_shared_across_instances():
+    # GIVEN two instances of the same class (i.e. two dispatches)
+    compute_a = MagicMock(side_effect=["first", "second"])
+    foo, *_ = _make(compute_a=compute_a)
+    bar = type(foo)()
+
+    # WHEN the property is accessed on both
+    # THEN each computes its own value
+    assert foo.a == "first"
+    assert bar.a == "second"
+
+
+def test_invalidate_named_property():
+    # GIVEN two cached properties
+    compute_a = MagicMock(side_effect=["a1", "a2"])
+    foo, compute_a, compute_b = _make(compute_a=compute_a)
+    assert (foo.a, foo.b) == ("a1", "b")
+
+    # WHEN one of them is invalidated
+    invalidate(foo, "a")
+
+    # THEN only that one is recomputed on next access
+    assert (foo.a, foo.b) == ("a2", "b")
+    assert compute_a.call_count == 2
+    compute_b.assert_called_once()
+
+
+def test_invalidate_all():
+    # GIVEN two cached properties
+    foo, compute_a, compute_b = _make()
+    foo.a, foo.b  # noqa: B018
+
+    # WHEN the whole cache is invalidated
+    invalidate(foo)
+    foo.a, foo.b  # noqa: B018
+
+    # THEN both are recomputed
+    assert compute_a.call_count == 2
+    assert compute_b.call_count == 2
+
+
+def test_invalidate_before_any_access():
+    # GIVEN an object whose cached properties were never accessed
+    foo, *_ = _make()
+
+    # WHEN invalidating, THEN nothing breaks
+    invalidate(foo)
+    invalidate(foo, "a")
+    assert cache_stats(foo) == {}
@@ -0,0 +1,95 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import logging
+
+import ops
+import pytest
+from ops.testing import Container, Context, Secret, State
+
+from litmus_libs.hook_calls import HookCallAccounting
+
+META = {"name": "foo", "containers": {"workload": {}}}
+
+
+class MyCharm(ops.CharmBase):
+    coalesce = True
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.hook_calls = HookCallAccounting(self, coalesce=self.coalesce)
+        self.framework.observe(self.on.config_changed, self._on_config_changed)
+
+    def _on_config_changed(self, _):
+        secret_id = self.config.get("secret")
+        container = self.unit.get_container("workload")
+        for _ in range(3):
+            self.hook_calls.call("secret_get", self.model.get_secret, id=secret_id, read_only=True)
+            self.hook_calls.can_connect(container)
+            with pytest.raises(ops.pebble.PathError):
+                self.hook_calls.call("pull", container.pull, "/foo", read_only=True)
+        self.hook_calls.call("push", container.push, "/foo", "bar")
+        assert self.hook_calls.can_connect(container)
+
+
+@pytest.fixture
+def ctx():
+    return Context(
+        MyCharm,
+        meta=META,
+        config={"options": {"secret": {"type": "string"}}},
+    )
+
+
+@pytest.fixture
+def state():
+    secret = Secret(tracked_content={"a": "b"})
+    return State(
+        config={"secret": secret.id},
+        secrets={secret},
+        containers={Container("workload", can_connect=True)},
+    )
+
+
+def test_identical_reads_are_coalesced(ctx, state):
+    # WHEN the charm repeats the same read-only calls
+    with ctx(ctx.on.config_changed(), state) as mgr:
+        mgr.run()
+        stats = mgr.charm.hook_calls.stats
+
+    # THEN only the first of each is actually made
+    assert (stats["secret_get"].calls, stats["secret_get"].coalesced) == (1, 2)
+    # AND the push invalidated the cached reads
+    assert (
+        stats["pebble.workload.can_connect"].calls,
+        stats["pebble.workload.can_connect"].coalesced,
+    ) == (2, 2)
+    # AND the failed pulls of the missing file are all made
+    assert (stats["pull"].calls, stats["pull"].coalesced) == (3, 0)
+    # AND only the calls the charm routed through the accounting layer are accounted for
+    assert set(stats) == {"secret_get", "pebble.workload.can_connect", "pull", "push"}
+
+
+def test_coalescing_can_be_disabled(ctx, state):
+    # GIVEN the accounting layer with coalescing disabled
+    class NoCoalesceCharm(MyCharm):
+        coalesce = False
+
+    ctx = Context(NoCoalesceCharm, meta=META, config=ctx.charm_spec.config)
+
+    # WHEN the charm repeats the same read-only calls
+    with ctx(ctx.on.config_changed(), state) as mgr:
+        mgr.run()
+        stats = mgr.charm.hook_calls.stats
+
+    # THEN they're all made, and counted
+    assert (stats["secret_get"].calls, stats["secret_get"].coalesced) == (3, 0)
+
+
+def test_summary_logged_on_commit(ctx, state, caplog):
+    # WHEN a dispatch completes
+    with caplog.at_level(logging.DEBUG, logger="litmus_libs.hook_calls"):
+        ctx.run(ctx.on.config_changed(), state)
+
+    # THEN a summary of the calls made is logged
+    assert any("coalesced" in record.getMessage() for record in caplog.records)
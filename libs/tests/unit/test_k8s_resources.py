@@ -0,0 +1,183 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from lightkube.models.apps_v1 import StatefulSetSpec
+from lightkube.models.core_v1 import (
+    Container,
+    PodSpec,
+    PodTemplateSpec,
+    ResourceRequirements,
+)
+from lightkube.models.meta_v1 import LabelSelector
+from lightkube.resources.apps_v1 import StatefulSet
+
+from litmus_libs.k8s_resources import (
+    ContainerResources,
+    InvalidResourcesError,
+    StatefulSetResourcesPatch,
+    parse_quantity,
+)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    (
+        ("2", Decimal(2)),
+        ("500m", Decimal("0.5")),
+        ("0.25", Decimal("0.25")),
+        ("1Gi", Decimal(1024**3)),
+        ("128M", Decimal(128 * 10**6)),
+    ),
+)
+def test_parse_quantity(value, expected):
+    assert parse_quantity(value) == expected
+
+
+@pytest.mark.parametrize("value", ("", "1GB", "-1", "lots", "1.2.3"))
+def test_parse_invalid_quantity(value):
+    with pytest.raises(InvalidResourcesError):
+        parse_quantity(value)
+
+
+def test_resources_from_config():
+    # GIVEN a config with some resources set, under a prefix
+    config = {
+        "exporter_cpu_request": "100m",
+        "exporter_cpu_limit": "1",
+        "exporter_memory_limit": "64Mi",
+        "cpu_limit": "8",
+    }
+
+    # WHEN we build the container resources out of it
+    resources = ContainerResources.from_config(config, prefix="exporter_")
+
+    # THEN only the prefixed options are used, and empty ones are unset
+    assert resources.to_requirements() == {
+        "requests": {"cpu": "100m"},
+        "limits": {"cpu": "1", "memory": "64Mi"},
+    }
+
+
+@pytest.mark.parametrize(
+    "config",
+    (
+        {"cpu_limit": "two"},
+        {"memory_request": "1Gi", "memory_limit": "512Mi"},
+        {"cpu_request": "1500m", "cpu_limit": "1"},
+    ),
+)
+def test_invalid_resources_config(config):
+    with pytest.raises(InvalidResourcesError):
+        ContainerResources.from_config(config)
+
+
+def _statefulset(resources: dict) -> StatefulSet:
+    return StatefulSet(
+        spec=StatefulSetSpec(
+            selector=LabelSelector(),
+            serviceName="app-endpoints",
+            template=PodTemplateSpec(
+                spec=PodSpec(
+                    containers=[
+                        Container(name="charm"),
+                        Container(name="workload", resources=ResourceRequirements(**resources)),
+                    ]
+                )
+            ),
+        )
+    )
+
+
+@pytest.fixture
+def client():
+    with patch("litmus_libs.k8s_resources.Client") as client_cls:
+        yield client_cls.return_value
+
+
+def test_patches_changed_resources(client):
+    # GIVEN a workload container with a CPU request and limit
+    client.get.return_value = _statefulset({"requests": {"cpu": "500m"}, "limits": {"cpu": "1"}})
+
+    # WHEN we set a different limit, and drop the request
+    patched = StatefulSetResourcesPatch("app", "model").reconcile(
+        {"workload": ContainerResources(cpu_limit="2", memory_limit="1Gi")}
+    )
+
+    # THEN the StatefulSet is patched, deleting the request
+    assert patched
+    obj = client.patch.call_args.kwargs["obj"]
+    assert obj["spec"]["template"]["spec"]["containers"] == [
+        {
+            "name": "workload",
+            "resources": {"requests": None, "limits": {"cpu": "2", "memory": "1Gi"}},
+        }
+    ]
+
+
+def test_does_not_patch_equivalent_resources(client):
+    # GIVEN a workload container whose quantities Kubernetes normalized
+    client.get.return_value = _statefulset({"limits": {"cpu": "500m", "memory": "1Gi"}})
+
+    # WHEN we set the same quantities, spelled differently
+    patched = StatefulSetResourcesPatch("app", "model").reconcile(
+        {"workload": ContainerResources(cpu_limit="0.5", memory_limit="1024Mi")}
+    )
+
+    # THEN the pods aren't restarted for nothing
+    assert not patched
+    client.patch.assert_not_called()
+
+
+def test_resources_dropped_by_juju_are_set_again(client):
+    # GIVEN resources already applied once
+    client.get.return_value = _statefulset({})
+    state = {}
+    resources = {"workload": ContainerResources(memory_limit="1Gi")}
+    assert StatefulSetResourcesPatch("app", "model", state).reconcile(resources)
+    client.reset_mock()
+
+    # WHEN Juju rewrites the StatefulSet without them, e.g. on refresh
+    client.get.return_value = _statefulset({})
+    patched = StatefulSetResourcesPatch("app", "model", state).reconcile(resources)
+
+    # THEN the same resources are set again
+    assert patched
+    client.patch.assert_called_once()
+
+
+def test_resources_unset_after_being_configured_are_removed(client):
+    # GIVEN resources applied once, and still on the StatefulSet
+    client.get.return_value = _statefulset({})
+    state = {}
+    assert StatefulSetResourcesPatch("app", "model", state).reconcile(
+        {"workload": ContainerResources(memory_limit="1Gi")}
+    )
+    client.get.return_value = _statefulset({"limits": {"memory": "1Gi"}})
+    client.reset_mock()
+
+    # WHEN they're no longer configured
+    patched = StatefulSetResourcesPatch("app", "model", state).reconcile(
+        {"workload": ContainerResources()}
+    )
+
+    # THEN they're removed from the StatefulSet
+    assert patched
+    obj = client.patch.call_args.kwargs["obj"]
+    assert obj["spec"]["template"]["spec"]["containers"] == [
+        {"name": "workload", "resources": {"requests": None, "limits": None}}
+    ]
+
+
+def test_kubernetes_not_asked_if_never_configured(client):
+    # WHEN we reconcile resources that were never configured
+    patched = StatefulSetResourcesPatch("app", "model", {}).reconcile(
+        {"workload": ContainerResources()}
+    )
+
+    # THEN the StatefulSet is left alone
+    assert not patched
+    client.get.assert_not_called()
@@ -27,6 +27,7 @@ from litmus_libs.interfaces.litmus_auth import (
                 "grpc_server_host": json.dumps("host"),
                 "grpc_server_port": json.dumps(80),
                 "insecure": json.dumps(False),
+                "grpc_server_headless_host": json.dumps(None),
                 "version": json.dumps(0),
             },
         ),
@@ -40,6 +41,7 @@ from litmus_libs.interfaces.litmus_auth import (
                 "grpc_server_host": json.dumps("host"),
                 "grpc_server_port": json.dumps(80),
                 "insecure": json.dumps(True),
+                "grpc_server_headless_host": json.dumps(None),
                 "version": json.dumps(0),
             },
         ),
@@ -121,6 +123,7 @@ def test_provider_get_backend_grpc_endpoint(litmus_auth, remote_databag, expecte
                 "grpc_server_host": '"host"',
                 "grpc_server_port": "80",
                 "insecure": "false",
+                "grpc_server_headless_host": "null",
                 "version": "0",
             },
         ),
@@ -186,6 +189,20 @@ def test_requirer_publish_endpoint(litmus_auth, input, expected):
                 insecure=True,
             ),
         ),
+        (
+            {
+                "grpc_server_host": '"host"',
+                "grpc_server_port": "80",
+                "insecure": "false",
+                "grpc_server_headless_host": '"headless-host"',
+                "version": "0",
+            },
+            Endpoint(
+                grpc_server_host="host",
+                grpc_server_port=80,
+                grpc_server_headless_host="headless-host",
+            ),
+        ),
     ),
 )
 def test_requirer_get_auth_grpc_endpoint(litmus_auth, remote_databag, expected):
@@ -213,6 +230,19 @@ def test_requirer_get_auth_grpc_endpoint(litmus_auth, remote_databag, expected):
         assert endpoint == expected
 
 
+@pytest.mark.parametrize(
+    "headless_host, expected",
+    ((None, "host"), ("headless-host", "dns:///headless-host")),
+)
+def test_grpc_dial_host(headless_host, expected):
+    # GIVEN an endpoint with or without a headless host
+    endpoint = Endpoint(
+        grpc_server_host="host", grpc_server_port=80, grpc_server_headless_host=headless_host
+    )
+    # THEN gRPC clients resolve the headless host through DNS, if any
+    assert endpoint.grpc_dial_host == expected
+
+
 def test_fail_version_mismatch(litmus_auth):
     # GIVEN a charm that provides litmus-auth
     ctx = Context(
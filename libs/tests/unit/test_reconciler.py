@@ -0,0 +1,101 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+from unittest.mock import MagicMock
+
+import ops
+import pytest
+from ops.testing import Context, Relation, State
+from scenario.errors import UncaughtCharmError
+
+from litmus_libs.reconciler import TieredReconciler
+
+META = {
+    "name": "foo",
+    "requires": {
+        "logging": {"interface": "loki_push_api"},
+        "database": {"interface": "mongodb_client"},
+    },
+}
+
+
+def _charm_type(full, light, relation_handlers):
+    class MyCharm(ops.CharmBase):
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.reconciler = TieredReconciler(
+                self, full=full, light=light, relation_handlers=relation_handlers
+            )
+
+    return MyCharm
+
+
+@pytest.fixture
+def handlers():
+    return MagicMock(), MagicMock(), MagicMock()
+
+
+def _run(handlers, event_getter, state=None):
+    full, light, logging_handler = handlers
+    ctx = Context(
+        _charm_type(full, light, {"logging": logging_handler}),
+        meta=META,
+    )
+    ctx.run(event_getter(ctx), state or State())
+
+
+def test_update_status_runs_light_reconcile(handlers):
+    _run(handlers, lambda ctx: ctx.on.update_status())
+    full, light, logging_handler = handlers
+    light.assert_called_once()
+    full.assert_not_called()
+    logging_handler.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "event_getter",
+    (
+        lambda ctx: ctx.on.install(),
+        lambda ctx: ctx.on.upgrade_charm(),
+        lambda ctx: ctx.on.leader_elected(),
+        lambda ctx: ctx.on.config_changed(),
+    ),
+)
+def test_lifecycle_events_run_full_reconcile(handlers, event_getter):
+    _run(handlers, event_getter)
+    full, light, _ = handlers
+    full.assert_called_once()
+    light.assert_not_called()
+
+
+def test_mapped_relation_event_runs_its_handler(handlers):
+    relation = Relation("logging")
+    _run(
+        handlers,
+        lambda ctx: ctx.on.relation_changed(relation),
+        State(relations={relation}),
+    )
+    full, _, logging_handler = handlers
+    logging_handler.assert_called_once()
+    full.assert_not_called()
+
+
+def test_unmapped_relation_event_runs_full_reconcile(handlers):
+    relation = Relation("database")
+    _run(
+        handlers,
+        lambda ctx: ctx.on.relation_changed(relation),
+        State(relations={relation}),
+    )
+    full, _, logging_handler = handlers
+    full.assert_called_once()
+    logging_handler.assert_not_called()
+
+
+def test_unknown_endpoint_is_rejected():
+    ctx = Context(
+        _charm_type(MagicMock(), None, {"nope": MagicMock()}),
+        meta=META,
+    )
+    with pytest.raises(UncaughtCharmError, match="no endpoint named 'nope'"):
+        ctx.run(ctx.on.update_status(), State())
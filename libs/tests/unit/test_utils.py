@@ -2,15 +2,24 @@
 # See LICENSE file for licensing details.
 
 import io
+from unittest.mock import patch
 
 import pytest
 
-from litmus_libs.utils import get_litmus_version
+from litmus_libs.models import GoRuntimeConfig, ResourceLimits
+from litmus_libs.utils import (
+    get_container_resource_limits,
+    get_headless_hostname,
+    get_litmus_version,
+    go_runtime_env,
+)
 
 
 class MockContainer:
     """A lightweight mock of `ops.Container` used for testing."""
 
+    name = "workload"
+
     def __init__(self, can_connect=True, files: dict | None = None):
         self._can_connect = can_connect
         self._files: dict[str, str] = files or {}
@@ -22,6 +31,8 @@ class MockContainer:
         return path in self._files
 
     def pull(self, path, encoding=None):
+        if path not in self._files:
+            raise FileNotFoundError(path)
         return io.StringIO(self._files[path])
 
 
@@ -83,3 +94,109 @@ def test_litmus_version_not_empty():
 
     # THEN we get a non-empty version string
     assert version
+
+
+@pytest.mark.parametrize(
+    "files, expected",
+    (
+        # no cgroup files readable
+        ({}, ResourceLimits()),
+        # cgroup v2, no limits
+        (
+            {"/sys/fs/cgroup/cpu.max": "max 100000\n", "/sys/fs/cgroup/memory.max": "max\n"},
+            ResourceLimits(),
+        ),
+        # cgroup v2, with limits
+        (
+            {
+                "/sys/fs/cgroup/cpu.max": "250000 100000\n",
+                "/sys/fs/cgroup/memory.max": "536870912\n",
+            },
+            ResourceLimits(cpu=2.5, memory=512 * 1024**2),
+        ),
+        # cgroup v1, with limits
+        (
+            {
+                "/sys/fs/cgroup/cpu/cpu.cfs_quota_us": "50000",
+                "/sys/fs/cgroup/cpu/cpu.cfs_period_us": "100000",
+                "/sys/fs/cgroup/memory/memory.limit_in_bytes": "1073741824",
+            },
+            ResourceLimits(cpu=0.5, memory=1024**3),
+        ),
+        # cgroup v1, no limits
+        (
+            {
+                "/sys/fs/cgroup/cpu/cpu.cfs_quota_us": "-1",
+                "/sys/fs/cgroup/memory/memory.limit_in_bytes": "9223372036854771712",
+            },
+            ResourceLimits(),
+        ),
+        # garbage
+        ({"/sys/fs/cgroup/cpu.max": "foo"}, ResourceLimits()),
+    ),
+)
+def test_container_resource_limits(files, expected):
+    # GIVEN a container exposing the given cgroup files
+    test_container = MockContainer(files=files)
+
+    # WHEN get_container_resource_limits is called
+    # THEN we get the limits they describe
+    assert get_container_resource_limits(test_container) == expected
+
+
+def test_container_resource_limits_no_connection():
+    # GIVEN a container we can't connect to
+    test_container = MockContainer(can_connect=False)
+
+    # WHEN get_container_resource_limits is called
+    # THEN no limits are reported
+    assert get_container_resource_limits(test_container) == ResourceLimits()
+
+
+@pytest.mark.parametrize(
+    "fqdn, expected",
+    (
+        (
+            "app-0.app-endpoints.model.svc.cluster.local",
+            "app-endpoints.model.svc.cluster.local",
+        ),
+        ("localhost", "localhost"),
+        ("model.svc.cluster.local", "model.svc.cluster.local"),
+    ),
+)
+def test_headless_hostname(fqdn, expected):
+    # GIVEN a unit with this fqdn
+    with patch("socket.getfqdn", return_value=fqdn):
+        # THEN the headless service hostname is derived from it, if it's a K8s-style fqdn
+        assert get_headless_hostname() == expected
+
+
+@pytest.mark.parametrize(
+    "config, limits, expected",
+    (
+        # no limits, no config: the Go defaults
+        (GoRuntimeConfig(), ResourceLimits(), {}),
+        # limits: sized to them
+        (
+            GoRuntimeConfig(),
+            ResourceLimits(cpu=1.5, memory=1024**3),
+            {"GOMAXPROCS": "2", "GOMEMLIMIT": "921MiB"},
+        ),
+        # fractional CPU limits still get a thread
+        (GoRuntimeConfig(), ResourceLimits(cpu=0.25), {"GOMAXPROCS": "1"}),
+        # explicit config wins
+        (
+            GoRuntimeConfig(gomaxprocs=8, gomemlimit_percent=50, gogc=200),
+            ResourceLimits(cpu=2, memory=1024**3),
+            {"GOMAXPROCS": "8", "GOMEMLIMIT": "512MiB", "GOGC": "200"},
+        ),
+        # soft memory limit disabled, garbage collection only at the limit
+        (
+            GoRuntimeConfig(gomemlimit_percent=0, gogc=-1),
+            ResourceLimits(memory=1024**3),
+            {"GOGC": "off"},
+        ),
+    ),
+)
+def test_go_runtime_env(config, limits, expected):
+    assert go_runtime_env(config, limits) == expected